@@ -0,0 +1,53 @@
+from typing import Any
+import json
+import os
+
+
+
+# Metrics where a larger value is an improvement; every other metric is a latency.
+HIGHER_IS_BETTER: frozenset[str] = frozenset({"rps", "ops_per_second", "connects_per_second"})
+
+
+
+def save_baseline(path: str, results: dict[str, dict[str, float]], metadata: dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, mode="w", encoding="utf-8") as handle:
+        json.dump({"metadata": metadata, "results": results}, handle, indent=2, sort_keys=True)
+
+def load_baseline(path: str) -> dict[str, dict[str, float]]:
+    with open(path, mode="r", encoding="utf-8") as handle:
+        return json.load(handle)["results"]
+
+def compare_to_baseline(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    metrics: tuple[str, ...]
+) -> list[str]:
+    """
+    Return a line for every metric that regressed by more than `threshold`
+    (a fraction, 0.1 meaning 10%) relative to the baseline.
+    """
+    regressions: list[str] = list()
+    for name, measured in sorted(results.items()):
+        reference: dict[str, float]|None = baseline.get(name)
+        if reference is None:
+            continue
+        for metric in metrics:
+            if metric not in measured or not reference.get(metric):
+                continue
+            change: float = (measured[metric] - reference[metric]) / reference[metric]
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{name} {metric}: {reference[metric]:.3f} -> {measured[metric]:.3f} "
+                    f"({change:+.1%} worse)"
+                )
+    return regressions
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index: int = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
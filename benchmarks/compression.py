@@ -0,0 +1,209 @@
+"""
+Wire compression benchmark for search-heavy workloads.
+
+Runs tag, text and user searches through the model methods against a MongoDB
+filled by `benchmarks.generate_data`, once per compressor, with a client
+built from the app's own pool options. Reports throughput and the bytes sent
+over the network per search, taken from the server's `serverStatus` counters:
+
+    python -m benchmarks.compression --settings none,zlib,zstd --save-baseline
+    python -m benchmarks.compression --settings none,zlib,zstd --threshold 0.1
+
+The counters are server wide, so run it against a disposable mongod that
+serves nothing else. Text and name search use Atlas Search indexes; pass
+`--skip-atlas-search` when running against a plain mongod.
+"""
+from typing import Any, Awaitable, Callable
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import warnings
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from benchmarks.baseline import compare_to_baseline, load_baseline, save_baseline
+from benchmarks.generate_data import WORDS
+from src.dependencies.database import client_options
+from src.models.discussion import DBDiscussion
+from src.models.user import DBUser
+
+
+
+COMPRESSORS: tuple[str, ...] = ("none", "zlib", "snappy", "zstd")
+ATLAS_SEARCH_OPERATIONS: frozenset[str] = frozenset({"search_text", "search_users"})
+
+
+
+def search_operations(
+    db: AsyncIOMotorDatabase,
+    tags: int,
+    page_size: int,
+    skip_atlas_search: bool
+) -> list[Callable[[], Awaitable[Any]]]:
+    async def search_tags() -> None:
+        await DBDiscussion.search_discussions_based_on_tags(
+            search_tags=[f"tag{min(int(random.paretovariate(1.1)) - 1, tags - 1)}"],
+            skip=0,
+            limit=page_size,
+            db=db
+        )
+
+    async def search_text() -> None:
+        await DBDiscussion.search_discussions_based_on_text(
+            search_term=random.choice(WORDS),
+            skip=0,
+            limit=page_size,
+            db=db
+        )
+
+    async def search_users() -> None:
+        await DBUser.search_users_by_full_name(
+            search_term=random.choice(WORDS),
+            skip=0,
+            limit=page_size,
+            db=db
+        )
+
+    operations: dict[str, Callable[[], Awaitable[Any]]] = {
+        "search_tags": search_tags, "search_text": search_text, "search_users": search_users
+    }
+    return [
+        operation for name, operation in operations.items()
+        if not (skip_atlas_search and name in ATLAS_SEARCH_OPERATIONS)
+    ]
+
+async def network_counters(client: AsyncIOMotorClient) -> dict[str, int]:
+    network: dict[str, Any] = (await client.admin.command("serverStatus"))["network"]
+    return {
+        "physical_bytes_out": network.get("physicalBytesOut", network["bytesOut"]),
+        "physical_bytes_in": network.get("physicalBytesIn", network["bytesIn"]),
+        "logical_bytes_out": network["bytesOut"]
+    }
+
+async def run_setting(
+    mongo_uri: str,
+    database: str,
+    compressor: str,
+    tags: int,
+    page_size: int,
+    concurrency: int,
+    duration_seconds: float,
+    warmup_seconds: float,
+    skip_atlas_search: bool
+) -> dict[str, float]:
+    with warnings.catch_warnings():
+        # pymongo only warns and falls back to no compression when a compressor's package is missing.
+        warnings.simplefilter("error")
+        client: AsyncIOMotorClient = AsyncIOMotorClient(
+            host=mongo_uri,
+            **client_options(compressors="" if compressor == "none" else compressor)
+        )
+    db: AsyncIOMotorDatabase = client[database]
+    operations: list[Callable[[], Awaitable[Any]]] = search_operations(
+        db=db,
+        tags=tags,
+        page_size=page_size,
+        skip_atlas_search=skip_atlas_search
+    )
+    completed: int = 0
+
+    async def worker(stop_at: float, counted: bool) -> None:
+        nonlocal completed
+        while time.perf_counter() < stop_at:
+            await random.choice(operations)()
+            if counted:
+                completed += 1
+
+    try:
+        await client.admin.command("ping")
+        warmup_until: float = time.perf_counter() + warmup_seconds
+        await asyncio.gather(*(worker(stop_at=warmup_until, counted=False) for _ in range(concurrency)))
+        before: dict[str, int] = await network_counters(client=client)
+        started: float = time.perf_counter()
+        stop_at: float = started + duration_seconds
+        await asyncio.gather(*(worker(stop_at=stop_at, counted=True) for _ in range(concurrency)))
+        elapsed_seconds: float = time.perf_counter() - started
+        after: dict[str, int] = await network_counters(client=client)
+    finally:
+        client.close()
+    searches: int = max(completed, 1)
+    return {
+        "ops_per_second": completed / elapsed_seconds,
+        "bytes_out_per_op": (after["physical_bytes_out"] - before["physical_bytes_out"]) / searches,
+        "bytes_in_per_op": (after["physical_bytes_in"] - before["physical_bytes_in"]) / searches,
+        "compression_ratio": (
+            (after["logical_bytes_out"] - before["logical_bytes_out"])
+            / max(after["physical_bytes_out"] - before["physical_bytes_out"], 1)
+        )
+    }
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo-uri", default=os.environ.get("MONGO_CONNECTION_STRING", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default=os.environ.get("MONGO_DATABASE_NAME", "benchmark"))
+    parser.add_argument("--settings", default="none,zlib,zstd", help=f"comma separated, any of {', '.join(COMPRESSORS)}")
+    parser.add_argument("--tags", type=int, default=1_000, help="the --tags given to benchmarks.generate_data")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--skip-atlas-search", action="store_true")
+    parser.add_argument(
+        "--baseline",
+        default=os.path.join(os.path.dirname(__file__), "baselines", "compression.json")
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    settings: list[str] = [setting.strip() for setting in arguments.settings.split(",") if setting.strip()]
+    unknown: list[str] = [setting for setting in settings if setting not in COMPRESSORS]
+    if unknown:
+        parser.error(f"unknown compression settings: {', '.join(unknown)}")
+    random.seed(arguments.seed)
+    results: dict[str, dict[str, float]] = dict()
+    print(f"{'compressor':<12} {'ops/s':>10} {'B out/op':>12} {'B in/op':>10} {'ratio':>7}")
+    for setting in settings:
+        results[setting] = asyncio.run(run_setting(
+            mongo_uri=arguments.mongo_uri,
+            database=arguments.database,
+            compressor=setting,
+            tags=arguments.tags,
+            page_size=arguments.page_size,
+            concurrency=arguments.concurrency,
+            duration_seconds=arguments.duration,
+            warmup_seconds=arguments.warmup,
+            skip_atlas_search=arguments.skip_atlas_search
+        ))
+        stats: dict[str, float] = results[setting]
+        print(
+            f"{setting:<12} {stats['ops_per_second']:>10,.0f} {stats['bytes_out_per_op']:>12,.0f} "
+            f"{stats['bytes_in_per_op']:>10,.0f} {stats['compression_ratio']:>7.2f}"
+        )
+
+    if arguments.save_baseline:
+        save_baseline(
+            path=arguments.baseline,
+            results=results,
+            metadata={key: value for key, value in vars(arguments).items() if key not in ("save_baseline", "mongo_uri")}
+        )
+        print(f"baseline written to {arguments.baseline}")
+        return 0
+    if os.path.exists(arguments.baseline):
+        regressions: list[str] = compare_to_baseline(
+            results=results,
+            baseline=load_baseline(path=arguments.baseline),
+            threshold=arguments.threshold,
+            metrics=("ops_per_second", "bytes_out_per_op")
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
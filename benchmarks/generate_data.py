@@ -0,0 +1,264 @@
+"""
+Synthetic data generator and bulk loader.
+
+Fills a database with users, discussions with Zipf-distributed tags, comment
+trees, likes and a power-law follow graph, written with batched `insert_many`
+calls from parallel worker processes:
+
+    python -m benchmarks.generate_data --users 1000000 --discussions 2000000 \\
+        --comments 5000000 --likes 10000000 --follows 5000000 --workers 8 --drop
+
+Every document id is derived from the document's kind and index, so workers
+can reference users and discussions created by other workers without reading
+them back. All users share one password (`--password`), hashed once with the
+app's password hasher instead of once per user.
+"""
+from typing import Any, Callable, Iterator
+import argparse
+import datetime
+import itertools
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+
+import argon2
+from bson import ObjectId
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import BulkWriteError
+
+
+
+KIND_USER: int = 1
+KIND_DISCUSSION: int = 2
+KIND_COMMENT: int = 3
+KIND_LIKE: int = 4
+KIND_FOLLOWING: int = 5
+
+EPOCH: datetime.datetime = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+WORDS: list[str] = (
+    "the of and to in is you that it he was for on are as with his they at be this have from or "
+    "one had by word but not what all were we when your can said there use an each which she do "
+    "how their if will up other about out many then them these so some her would make like him "
+    "into time has look two more write go see number no way could people my than first water "
+    "been call who oil its now find long down day did get come made may part mongo python async"
+).split()
+FIRST_NAMES: list[str] = [
+    "Aarav", "Aditi", "Alex", "Ana", "Arjun", "Chen", "Diya", "Elena", "Fatima", "Hiro", "Isha",
+    "Jamal", "Kabir", "Lena", "Maya", "Nikhil", "Omar", "Priya", "Rahul", "Sara", "Tariq", "Zoe"
+]
+LAST_NAMES: list[str] = [
+    "Ahmed", "Bose", "Chopra", "Das", "Garcia", "Gupta", "Iyer", "Khan", "Kim", "Lee", "Mehta",
+    "Nair", "Patel", "Reddy", "Rao", "Sharma", "Singh", "Smith", "Tanaka", "Verma", "Wang"
+]
+
+
+
+def object_id(kind: int, index: int) -> ObjectId:
+    return ObjectId(struct.pack(">IQ", int(EPOCH.timestamp()), (kind << 56) | index))
+
+def zipf_cumulative_weights(size: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, size + 1)))
+
+
+class Generator:
+
+    def __init__(self, arguments: argparse.Namespace, pw_hash: str, seed: str):
+        self.arguments: argparse.Namespace = arguments
+        self.pw_hash: str = pw_hash
+        self.random: random.Random = random.Random(seed)
+        self.tags: list[str] = [f"tag{index}" for index in range(arguments.tags)]
+        self.__tag_weights: list[float] = zipf_cumulative_weights(arguments.tags, arguments.zipf_exponent)
+        self.__user_weights: list[float]|None = None
+        self.__discussion_weights: list[float]|None = None
+
+    def popular_user(self) -> int:
+        if self.__user_weights is None:
+            self.__user_weights = zipf_cumulative_weights(self.arguments.users, self.arguments.zipf_exponent)
+        return self.random.choices(range(self.arguments.users), cum_weights=self.__user_weights)[0]
+
+    def popular_discussion(self, rng: random.Random|None = None) -> int:
+        if self.__discussion_weights is None:
+            self.__discussion_weights = zipf_cumulative_weights(
+                self.arguments.discussions, self.arguments.zipf_exponent
+            )
+        return (rng or self.random).choices(
+            range(self.arguments.discussions),
+            cum_weights=self.__discussion_weights
+        )[0]
+
+    def text(self, words: int) -> str:
+        return " ".join(self.random.choices(WORDS, k=words))
+
+    def user(self, index: int) -> dict[str, Any]:
+        return {
+            "_id": object_id(KIND_USER, index),
+            "full_name": f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}",
+            "phone_number": f"+1650{2000000 + index:07d}",
+            "email": f"user{index}@example.com",
+            "pw_hash": self.pw_hash
+        }
+
+    def discussion(self, index: int) -> dict[str, Any]:
+        tag_count: int = self.random.randint(1, 5)
+        return {
+            "_id": object_id(KIND_DISCUSSION, index),
+            "user_id": object_id(KIND_USER, self.popular_user()),
+            "text": self.text(words=self.random.randint(10, 80)),
+            "tags": list(dict.fromkeys(
+                self.random.choices(self.tags, cum_weights=self.__tag_weights, k=tag_count)
+            )),
+            "image_link": None,
+            "created_on": EPOCH + datetime.timedelta(seconds=index * 15),
+            "version": 0
+        }
+
+    def comment(self, index: int) -> dict[str, Any]:
+        # Comments are laid out in threads of consecutive indexes, so a reply
+        # can point at an earlier comment of the same thread.
+        thread_size: int = self.arguments.comment_thread_size
+        thread_start: int = index - index % thread_size
+        discussion: int = self.popular_discussion(rng=random.Random(thread_start))
+        parent: ObjectId|None = None
+        if index > thread_start and self.random.random() < 0.7:
+            parent = object_id(KIND_COMMENT, self.random.randrange(thread_start, index))
+        return {
+            "_id": object_id(KIND_COMMENT, index),
+            "discussion_id": object_id(KIND_DISCUSSION, discussion),
+            "user_id": object_id(KIND_USER, self.random.randrange(self.arguments.users)),
+            "text": self.text(words=self.random.randint(3, 30)),
+            "parent_comment_id": parent
+        }
+
+    def like(self, index: int) -> dict[str, Any]:
+        if self.arguments.comments and self.random.random() < 0.2:
+            context, context_id = "COMMENT", object_id(KIND_COMMENT, self.random.randrange(self.arguments.comments))
+        else:
+            context, context_id = "DISCUSSION", object_id(KIND_DISCUSSION, self.popular_discussion())
+        return {
+            "_id": object_id(KIND_LIKE, index),
+            "context": context,
+            "context_id": context_id,
+            "user_id": object_id(KIND_USER, self.random.randrange(self.arguments.users))
+        }
+
+    def following(self, index: int) -> dict[str, Any]:
+        follower: int = self.random.randrange(self.arguments.users)
+        followee: int = self.popular_user()
+        if followee == follower:
+            followee = (followee + 1) % self.arguments.users
+        return {
+            "_id": object_id(KIND_FOLLOWING, index),
+            "follower_id": object_id(KIND_USER, follower),
+            "followee_id": object_id(KIND_USER, followee)
+        }
+
+COLLECTIONS: dict[str, tuple[str, Callable[[Generator, int], dict[str, Any]]]] = {
+    "users": ("users", Generator.user),
+    "discussions": ("discussions", Generator.discussion),
+    "comments": ("comments", Generator.comment),
+    "likes": ("likes", Generator.like),
+    "follows": ("followings", Generator.following)
+}
+
+INDEXES: dict[str, list[tuple[list[tuple[str, int]], dict[str, Any]]]] = {
+    "users": [([("email", ASCENDING)], {"unique": True}), ([("phone_number", ASCENDING)], {"unique": True})],
+    "discussions": [([("tags", ASCENDING)], {}), ([("user_id", ASCENDING)], {})],
+    "comments": [([("discussion_id", ASCENDING)], {})],
+    "likes": [([("context_id", ASCENDING), ("user_id", ASCENDING), ("context", ASCENDING)], {"unique": True})],
+    "followings": [([("follower_id", ASCENDING), ("followee_id", ASCENDING)], {"unique": True})]
+}
+
+
+
+def load_range(task: tuple[argparse.Namespace, str, str, int, int]) -> int:
+    arguments, pw_hash, kind, start, stop = task
+    collection_name, build = COLLECTIONS[kind]
+    generator: Generator = Generator(arguments=arguments, pw_hash=pw_hash, seed=f"{arguments.seed}-{kind}-{start}")
+    client: MongoClient = MongoClient(arguments.mongo_uri, w=arguments.write_concern)
+    collection = client[arguments.database][collection_name]
+    inserted: int = 0
+    try:
+        for batch_start in range(start, stop, arguments.batch_size):
+            batch: list[dict[str, Any]] = [
+                build(generator, index) for index in range(batch_start, min(stop, batch_start + arguments.batch_size))
+            ]
+            try:
+                inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                # Random likes and follows can collide with the unique indexes; those are skipped.
+                inserted += e.details["nInserted"]
+    finally:
+        client.close()
+    return inserted
+
+def chunks(total: int, chunk_size: int) -> Iterator[tuple[int, int]]:
+    for start in range(0, total, chunk_size):
+        yield start, min(total, start + chunk_size)
+
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo-uri", default=os.environ.get("MONGO_CONNECTION_STRING", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default=os.environ.get("MONGO_DATABASE_NAME", "benchmark"))
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--discussions", type=int, default=50_000)
+    parser.add_argument("--comments", type=int, default=100_000)
+    parser.add_argument("--likes", type=int, default=200_000)
+    parser.add_argument("--follows", type=int, default=100_000)
+    parser.add_argument("--tags", type=int, default=1_000)
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--comment-thread-size", type=int, default=8)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="documents per worker task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--write-concern", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="drop the collections first")
+    parser.add_argument("--create-indexes", action="store_true", help="create indexes after loading")
+    arguments: argparse.Namespace = parser.parse_args()
+
+    if arguments.users > 8_000_000:
+        parser.error("phone numbers are generated from a range of 8 million numbers")
+    if arguments.users < 2 or (arguments.discussions < 1 and (arguments.comments or arguments.likes)):
+        parser.error("at least two users and one discussion are needed to generate related documents")
+    pw_hash: str = argon2.PasswordHasher().hash(arguments.password)
+    client: MongoClient = MongoClient(arguments.mongo_uri)
+    database = client[arguments.database]
+    if arguments.drop:
+        for collection_name, _ in COLLECTIONS.values():
+            database.drop_collection(collection_name)
+    # Unique indexes are built before the load so that duplicate likes and follows are rejected.
+    for collection_name in ("likes", "followings"):
+        for keys, options in INDEXES[collection_name]:
+            database[collection_name].create_index(keys, **options)
+    client.close()
+
+    with multiprocessing.get_context("spawn").Pool(processes=arguments.workers) as pool:
+        for kind in COLLECTIONS:
+            total: int = getattr(arguments, kind)
+            if total <= 0:
+                continue
+            start_time: float = time.perf_counter()
+            inserted: int = sum(pool.imap_unordered(
+                load_range,
+                [(arguments, pw_hash, kind, start, stop) for start, stop in chunks(total, arguments.chunk_size)]
+            ))
+            elapsed: float = time.perf_counter() - start_time
+            print(f"{kind}: inserted {inserted} documents in {elapsed:.1f}s ({inserted / elapsed:,.0f}/s)")
+
+    if arguments.create_indexes:
+        client = MongoClient(arguments.mongo_uri)
+        for collection_name, indexes in INDEXES.items():
+            for keys, options in indexes:
+                client[arguments.database][collection_name].create_index(keys, **options)
+        client.close()
+        print("indexes created")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Import-time budget check for `import src`, based on `python -X importtime`.
+
+Imports the app in fresh interpreters, reports the slowest modules and fails
+when the import takes longer than the budget or the saved baseline allows, or
+when a module that should only be loaded lazily was imported at boot:
+
+    python -m benchmarks.import_time --save-baseline
+    python -m benchmarks.import_time --threshold 0.2
+    python -m benchmarks.import_time --module main --budget-ms 2000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.baseline import compare_to_baseline, load_baseline, save_baseline
+
+
+
+# Modules that are only needed after boot: they are imported on first use
+# (during the lifespan warm-up at the latest) rather than by `import src`.
+# email_validator is not listed: fastapi.openapi.models imports it when installed.
+LAZY_MODULES: tuple[str, ...] = ("argon2", "phonenumbers", "cProfile", "pstats")
+# Also enforced by tests/test_import_time.py for `import main`.
+IMPORT_TIME_BUDGET_MS: float = 2000
+
+_IMPORT_TIME_PATTERN: re.Pattern = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+
+# The cumulative import time in microseconds of every module imported with `module`.
+def measure_import(module: str) -> dict[str, int]:
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr}")
+    cumulative_us: dict[str, int] = dict()
+    for line in completed.stderr.splitlines():
+        match: re.Match|None = _IMPORT_TIME_PATTERN.match(line)
+        if match is not None:
+            cumulative_us[match.group(4)] = int(match.group(2))
+    return cumulative_us
+
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="src")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="how many of the slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument(
+        "--baseline",
+        default=os.path.join(os.path.dirname(__file__), "baselines", "import-time.json")
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    runs: list[dict[str, int]] = [measure_import(module=arguments.module) for _ in range(arguments.repeats)]
+    # The fastest run is the one least disturbed by other processes.
+    best_run: dict[str, int] = min(runs, key=lambda run: run[arguments.module])
+    total_ms: float = best_run[arguments.module] / 1000
+    print(f"import {arguments.module}: {total_ms:.1f} ms (best of {arguments.repeats})")
+    for name, cumulative in sorted(best_run.items(), key=lambda item: -item[1])[1:arguments.top + 1]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+    failures: list[str] = [
+        f"{name} is imported at boot but should be loaded lazily"
+        for name in LAZY_MODULES if name in best_run
+    ]
+    if total_ms > arguments.budget_ms:
+        failures.append(f"import took {total_ms:.1f} ms, over the budget of {arguments.budget_ms:.1f} ms")
+    results: dict[str, dict[str, float]] = {arguments.module: {"import_ms": total_ms}}
+    if arguments.save_baseline:
+        save_baseline(
+            path=arguments.baseline,
+            results=results,
+            metadata={"python": sys.version.split()[0], "platform": sys.platform}
+        )
+        print(f"baseline written to {arguments.baseline}")
+    elif os.path.exists(arguments.baseline):
+        failures.extend(compare_to_baseline(
+            results=results,
+            baseline=load_baseline(path=arguments.baseline),
+            threshold=arguments.threshold,
+            metrics=("import_ms",)
+        ))
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
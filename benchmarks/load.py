@@ -0,0 +1,434 @@
+"""
+HTTP load test for every API route.
+
+Drives the real FastAPI app over HTTP with a closed-loop pool of virtual users
+running a weighted mix of operations, then reports latency percentiles and
+throughput per route. Results can be stored as a JSON baseline and later runs
+diffed against it:
+
+    python -m benchmarks.load --scenario read-heavy --start-server --save-baseline
+    python -m benchmarks.load --scenario read-heavy --start-server --threshold 0.1
+
+With `--start-server` a uvicorn worker is launched with the current
+environment, so MONGO_CONNECTION_STRING should point at a disposable local
+mongod. Text and name search use Atlas Search indexes; pass
+`--skip-atlas-search` when running against a plain mongod.
+"""
+from typing import Awaitable, Callable
+import argparse
+import asyncio
+import base64
+import dataclasses
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.baseline import compare_to_baseline, load_baseline, percentile, save_baseline
+
+
+
+TAGS: list[str] = [f"tag{index}" for index in range(50)]
+WORDS: list[str] = [
+    "python", "mongo", "async", "latency", "cache", "index", "query", "shard", "replica",
+    "fastapi", "pydantic", "profile", "throughput", "backend", "socket", "thread"
+]
+IMAGE_BYTES: bytes = b"\x89PNG\r\n\x1a\n" + os.urandom(64 * 1024)
+
+SCENARIOS: dict[str, dict[str, int]] = {
+    "read-heavy": {
+        "search_tags": 50, "search_text": 20, "search_users": 20, "create_discussion": 5, "comment": 5
+    },
+    "like-storm": {
+        "like_hot_discussion": 80, "search_tags": 20
+    },
+    "auth-burst": {
+        "signup": 30, "login": 70
+    },
+    "polling": {
+        "poll_discussion": 90, "update_discussion": 10
+    },
+    "image-upload": {
+        "create_discussion_with_image": 70, "search_tags": 30
+    },
+    "mixed": {
+        "search_tags": 25, "search_text": 10, "search_users": 10, "create_discussion": 10,
+        "update_discussion": 5, "comment": 10, "like_hot_discussion": 15, "follow": 5,
+        "login": 5, "signup": 2, "create_discussion_with_image": 3
+    }
+}
+ATLAS_SEARCH_OPERATIONS: frozenset[str] = frozenset({"search_text", "search_users"})
+# Responses that seeding waits out for their Retry-After and repeats; a rejected request changed nothing.
+SEEDING_RETRY_STATUSES: frozenset[int] = frozenset({429, 503})
+
+
+
+@dataclasses.dataclass
+class VirtualUser:
+
+    email: str
+    password: str
+    full_name: str
+    token: str
+    user_id: str|None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclasses.dataclass
+class Sample:
+
+    route: str
+    status_code: int
+    latency: float
+    response_bytes: int
+
+
+class LoadTest:
+
+    def __init__(self, client: httpx.AsyncClient, users: list[VirtualUser], discussion_ids: list[str]):
+        self.client: httpx.AsyncClient = client
+        self.users: list[VirtualUser] = users
+        self.discussion_ids: list[str] = discussion_ids
+        self.discussion_owners: dict[str, VirtualUser] = dict()
+        self.discussion_etags: dict[str, str] = dict()
+        self.samples: list[Sample] = list()
+        self.retry_statuses: frozenset[int] = frozenset()
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        while True:
+            start: float = time.perf_counter()
+            response: httpx.Response = await self.client.request(method=method, url=url, **kwargs)
+            self.samples.append(
+                Sample(
+                    route=route,
+                    status_code=response.status_code,
+                    latency=time.perf_counter() - start,
+                    response_bytes=response.num_bytes_downloaded
+                )
+            )
+            if response.status_code not in self.retry_statuses:
+                return response
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+
+    async def signup(self) -> VirtualUser|None:
+        suffix: str = uuid.uuid4().hex
+        email: str = f"load-{suffix}@example.com"
+        full_name: str = f"{random.choice(WORDS).title()} {random.choice(WORDS).title()}"
+        response: httpx.Response = await self.request(
+            "POST /auth/signup", "POST", "/auth/signup",
+            json={
+                "full_name": full_name,
+                "phone_number": f"+1650{random.randint(2000000, 9999999)}",
+                "email": email,
+                "password": "load-test-password"
+            }
+        )
+        if response.status_code in (429, 503):
+            return None
+        response.raise_for_status()
+        token: str = response.json()["token"]
+        return VirtualUser(
+            email=email,
+            password="load-test-password",
+            full_name=full_name,
+            token=token,
+            user_id=_token_user_id(token=token)
+        )
+
+    async def op_signup(self) -> None:
+        user: VirtualUser|None = await self.signup()
+        if user is not None:
+            self.users.append(user)
+
+    async def op_login(self) -> None:
+        user: VirtualUser = random.choice(self.users)
+        await self.request(
+            "POST /auth/login", "POST", "/auth/login",
+            json={"email": user.email, "password": user.password}
+        )
+
+    async def op_search_tags(self) -> None:
+        await self.request(
+            "POST /discussion/search/tags", "POST", "/discussion/search/tags",
+            json={"hashtags": [_zipf_choice(TAGS)]},
+            params={"limit": 20}
+        )
+
+    async def op_search_text(self) -> None:
+        await self.request(
+            "POST /discussion/search", "POST", "/discussion/search",
+            json={"search_text": random.choice(WORDS)},
+            params={"limit": 20}
+        )
+
+    async def op_search_users(self) -> None:
+        await self.request(
+            "GET /user/search/{full_name}", "GET", f"/user/search/{random.choice(WORDS)}",
+            params={"limit": 20}
+        )
+
+    async def op_poll_discussion(self) -> None:
+        # Clients revalidate the discussions they show with the ETag of their last copy.
+        discussion_id: str = _zipf_choice(self.discussion_ids[:20])
+        etag: str|None = self.discussion_etags.get(discussion_id)
+        response: httpx.Response = await self.request(
+            "GET /discussion/{discussion_id}", "GET", f"/discussion/{discussion_id}",
+            headers={"If-None-Match": etag} if etag is not None else None
+        )
+        if response.status_code == 200:
+            self.discussion_etags[discussion_id] = response.headers["ETag"]
+
+    async def op_create_discussion(self, image: bool = False) -> None:
+        user: VirtualUser = random.choice(self.users)
+        response: httpx.Response = await self.request(
+            "POST /discussion/", "POST", "/discussion/",
+            headers=user.headers,
+            data={
+                "text": " ".join(random.choices(WORDS, k=30)),
+                "tags": ",".join({_zipf_choice(TAGS) for _ in range(3)})
+            },
+            files={"image": ("image.png", IMAGE_BYTES, "image/png")} if image else None
+        )
+        if response.status_code == 201:
+            discussion_id: str = response.json()["discussion_id"]
+            self.discussion_ids.append(discussion_id)
+            self.discussion_owners[discussion_id] = user
+
+    async def op_create_discussion_with_image(self) -> None:
+        await self.op_create_discussion(image=True)
+
+    async def op_update_discussion(self) -> None:
+        discussion_id: str = random.choice(self.discussion_ids)
+        await self.request(
+            "PATCH /discussion/{discussion_id}", "PATCH", f"/discussion/{discussion_id}",
+            headers=self.discussion_owners[discussion_id].headers,
+            data={"text": " ".join(random.choices(WORDS, k=30))}
+        )
+
+    async def op_comment(self) -> None:
+        user: VirtualUser = random.choice(self.users)
+        await self.request(
+            "POST /comment/", "POST", "/comment/",
+            headers=user.headers,
+            json={"discussion_id": random.choice(self.discussion_ids), "text": random.choice(WORDS)}
+        )
+
+    async def op_like_hot_discussion(self) -> None:
+        user: VirtualUser = random.choice(self.users)
+        response: httpx.Response = await self.request(
+            "POST /like/", "POST", "/like/",
+            headers=user.headers,
+            json={"like_context": "DISCUSSION", "context_id": _zipf_choice(self.discussion_ids[:20])}
+        )
+        if response.status_code == 201:
+            await self.request(
+                "DELETE /like/{like_id}", "DELETE", f"/like/{response.json()['like_id']}",
+                headers=user.headers
+            )
+
+    async def op_follow(self) -> None:
+        follower, followee = random.sample(self.users, k=2)
+        response: httpx.Response = await self.request(
+            "POST /following/", "POST", "/following/",
+            headers=follower.headers,
+            json={"followee_id": followee.user_id}
+        )
+        if response.status_code == 201:
+            await self.request(
+                "DELETE /following/{following_id}", "DELETE",
+                f"/following/{response.json()['following_id']}",
+                headers=follower.headers
+            )
+
+
+
+async def run_load_test(
+    base_url: str,
+    scenario: dict[str, int],
+    users: int,
+    discussions: int,
+    seed_concurrency: int,
+    concurrency: int,
+    duration_seconds: float,
+    warmup_seconds: float
+) -> tuple[list[Sample], float]:
+    limits: httpx.Limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        load_test: LoadTest = LoadTest(client=client, users=list(), discussion_ids=list())
+        print(f"seeding {users} users and {discussions} discussions", file=sys.stderr)
+        load_test.retry_statuses = SEEDING_RETRY_STATUSES
+        # Signups beyond the server's password hashing budget are shed with a 503 at once.
+        seeding: asyncio.Semaphore = asyncio.Semaphore(seed_concurrency)
+
+        async def seed_user() -> VirtualUser|None:
+            async with seeding:
+                return await load_test.signup()
+
+        load_test.users.extend(await asyncio.gather(*(seed_user() for _ in range(users))))
+        await asyncio.gather(*(load_test.op_create_discussion() for _ in range(discussions)))
+        load_test.retry_statuses = frozenset()
+        operations: list[Callable[[], Awaitable[None]]] = [
+            getattr(load_test, f"op_{name}") for name in scenario
+        ]
+        weights: list[int] = list(scenario.values())
+
+        async def virtual_user(stop_at: float) -> None:
+            while time.perf_counter() < stop_at:
+                try:
+                    await random.choices(operations, weights=weights)[0]()
+                except (httpx.HTTPError, IndexError, ValueError):
+                    pass
+
+        if warmup_seconds > 0:
+            await asyncio.gather(*(
+                virtual_user(stop_at=time.perf_counter() + warmup_seconds) for _ in range(concurrency)
+            ))
+        load_test.samples.clear()
+        start: float = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_user(stop_at=start + duration_seconds) for _ in range(concurrency)
+        ))
+        return load_test.samples, time.perf_counter() - start
+
+def summarize(samples: list[Sample], elapsed_seconds: float) -> dict[str, dict[str, float]]:
+    by_route: dict[str, list[Sample]] = dict()
+    for sample in samples:
+        by_route.setdefault(sample.route, list()).append(sample)
+    summary: dict[str, dict[str, float]] = dict()
+    for route, route_samples in sorted(by_route.items()):
+        latencies: list[float] = sorted(sample.latency * 1000 for sample in route_samples)
+        summary[route] = {
+            "requests": len(route_samples),
+            "errors": sum(1 for sample in route_samples if sample.status_code >= 500 and sample.status_code != 503),
+            "rate_limited": sum(1 for sample in route_samples if sample.status_code == 429),
+            "shed": sum(1 for sample in route_samples if sample.status_code == 503),
+            "rps": len(route_samples) / elapsed_seconds,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "bytes_per_request": sum(sample.response_bytes for sample in route_samples) / len(route_samples)
+        }
+    return summary
+
+def print_summary(summary: dict[str, dict[str, float]]) -> None:
+    print(
+        f"{'route':<40} {'requests':>9} {'errors':>7} {'429s':>7} {'503s':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'B/req':>9}"
+    )
+    for route, stats in summary.items():
+        print(
+            f"{route:<40} {stats['requests']:>9.0f} {stats['errors']:>7.0f} {stats['rate_limited']:>7.0f} {stats['shed']:>7.0f} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+            f"{stats['bytes_per_request']:>9.0f}"
+        )
+
+def start_server(port: int) -> subprocess.Popen:
+    # Every virtual user connects from 127.0.0.1, so the per-IP rate limits would answer most requests with a 429.
+    server: subprocess.Popen = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "RATE_LIMIT_ENABLED": "false"}
+    )
+    deadline: float = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1.0)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("the server did not start within 30 seconds")
+
+def _token_user_id(token: str) -> str|None:
+    payload: str = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))).get("user_id")
+
+def _zipf_choice(items: list[str], exponent: float = 1.1) -> str:
+    weights: list[float] = [1 / (rank ** exponent) for rank in range(1, len(items) + 1)]
+    return random.choices(items, weights=weights)[0]
+
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument(
+        "--seed-concurrency", type=int, default=4, help="at most the server's CONCURRENCY_PASSWORD_HASHING_LIMIT"
+    )
+    parser.add_argument("--discussions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--skip-atlas-search", action="store_true")
+    parser.add_argument("--baseline", default=None, help="defaults to benchmarks/baselines/load-<scenario>.json")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    random.seed(arguments.seed)
+    scenario: dict[str, int] = {
+        name: weight for name, weight in SCENARIOS[arguments.scenario].items()
+        if not (arguments.skip_atlas_search and name in ATLAS_SEARCH_OPERATIONS)
+    }
+    baseline_path: str = arguments.baseline or os.path.join(
+        os.path.dirname(__file__), "baselines", f"load-{arguments.scenario}.json"
+    )
+    server: subprocess.Popen|None = None
+    base_url: str = arguments.base_url
+    if arguments.start_server:
+        server = start_server(port=arguments.port)
+        base_url = f"http://127.0.0.1:{arguments.port}"
+    try:
+        samples, elapsed_seconds = asyncio.run(run_load_test(
+            base_url=base_url,
+            scenario=scenario,
+            users=arguments.users,
+            seed_concurrency=arguments.seed_concurrency,
+            discussions=arguments.discussions,
+            concurrency=arguments.concurrency,
+            duration_seconds=arguments.duration,
+            warmup_seconds=arguments.warmup
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    summary: dict[str, dict[str, float]] = summarize(samples=samples, elapsed_seconds=elapsed_seconds)
+    print_summary(summary=summary)
+    if arguments.save_baseline:
+        save_baseline(
+            path=baseline_path,
+            results=summary,
+            metadata={"scenario": arguments.scenario, **{
+                key: value for key, value in vars(arguments).items() if key != "save_baseline"
+            }}
+        )
+        print(f"baseline written to {baseline_path}")
+        return 0
+    if os.path.exists(baseline_path):
+        regressions: list[str] = compare_to_baseline(
+            results=summary,
+            baseline=load_baseline(path=baseline_path),
+            threshold=arguments.threshold,
+            metrics=("p50_ms", "p95_ms", "p99_ms", "rps")
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
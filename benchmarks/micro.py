@@ -0,0 +1,372 @@
+"""
+Microbenchmarks for the pure-Python costs paid on every request.
+
+Each case runs in isolation, with no network or database, and reports the best
+per-operation time over several repeats. Results can be stored as a JSON
+baseline and later runs diffed against it:
+
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --threshold 0.1
+    python -m benchmarks.micro -k hydration
+"""
+from typing import Any, Awaitable, Callable
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+for _name, _value in {
+    "MONGO_CONNECTION_STRING": "mongodb://localhost:27017",
+    "MONGO_DATABASE_NAME": "benchmark",
+    "JWT_SECRET": "benchmark-secret",
+    "JWT_VALIDITY_DAYS": "1",
+    "LOCAL_STORAGE_STATIC_FILES_PATH": os.path.dirname(os.path.abspath(__file__)),
+    "LOCAL_STORAGE_BASE_URL": "/static"
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from bson import ObjectId
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS, RawBSONDocument
+import bson
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import TypeAdapter
+
+from benchmarks.baseline import compare_to_baseline, load_baseline, save_baseline
+from src.api.discussion import discussion_router, split_tags
+from src.api.serialization import discussion_content, format_phone_number, user_self_content
+from src.dependencies.database import CODEC_OPTIONS
+from src.middleware.compression import ENCODING_LEVELS
+from src.models.discussion import DBDiscussion
+from src.models.user import DBUser
+from src.schemas.discussion import Discussion
+from src.schemas.types import PhoneNumber
+from src.schemas.user import UserSelf
+from src.utils.auth import HS256JWT
+from src.utils.compression import ENCODERS
+
+
+
+PAGE_SIZE: int = 20
+
+
+
+@dataclasses.dataclass
+class Case:
+
+    name: str
+    function: Callable[[], Any]|Callable[[], Awaitable[Any]]
+    is_async: bool = False
+    # How many documents or objects a single call handles, for per-item figures.
+    items: int = 1
+
+
+class _FakeCursor:
+
+    def __init__(self, documents: list[dict[str, Any]]):
+        self.__documents: list[dict[str, Any]] = documents
+
+    def skip(self, skip: int) -> "_FakeCursor":
+        return self
+
+    def limit(self, limit: int) -> "_FakeCursor":
+        return self
+
+    def __aiter__(self):
+        return self.__iterate()
+
+    async def __iterate(self):
+        for document in self.__documents:
+            yield document
+
+    async def to_list(self, length: int|None) -> list[dict[str, Any]]:
+        return self.__documents
+
+
+class _FakeDatabase:
+    """Serves canned documents to model query methods so that only hydration is measured."""
+
+    def __init__(self, documents: list[dict[str, Any]]):
+        self.__documents: list[dict[str, Any]] = documents
+
+    def __getitem__(self, name: str) -> "_FakeDatabase":
+        return self
+
+    def find(self, *args: Any, **kwargs: Any) -> _FakeCursor:
+        return _FakeCursor(documents=self.__documents)
+
+    def aggregate(self, *args: Any, **kwargs: Any) -> _FakeCursor:
+        return _FakeCursor(documents=self.__documents)
+
+
+
+def discussion_documents(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": ObjectId(),
+            "text": "a discussion about making python services fast " * 8,
+            "tags": ["python", "performance", "mongo"],
+            "image_link": None,
+            "created_on": datetime.datetime(2024, 6, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        } for _ in range(count)
+    ]
+
+def build_cases() -> list[Case]:
+    documents: list[dict[str, Any]] = discussion_documents(count=PAGE_SIZE)
+    database: _FakeDatabase = _FakeDatabase(documents=documents)
+    encoded_documents: list[bytes] = [bson.encode(document) for document in documents]
+    raw_codec_options = DEFAULT_RAW_BSON_OPTIONS.with_options(
+        tz_aware=CODEC_OPTIONS.tz_aware,
+        tzinfo=CODEC_OPTIONS.tzinfo
+    )
+    discussions: list[DBDiscussion] = [
+        DBDiscussion(
+            _id=document["_id"],
+            user_id=document["user_id"],
+            text=document["text"],
+            tags=document["tags"],
+            created_on=document["created_on"],
+            image_link=document["image_link"]
+        ) for document in documents
+    ]
+    response_models: list[Discussion] = [
+        Discussion(
+            discussion_id=str(discussion._id),
+            user_id=str(discussion.user_id),
+            text=discussion.text,
+            hashtags=discussion.tags,
+            created_on=str(discussion.created_on),
+            image_link=discussion.image_link
+        ) for discussion in discussions
+    ]
+    search_route: APIRoute = next(
+        route for route in discussion_router.routes
+        if isinstance(route, APIRoute) and route.path == "/discussion/search/tags"
+    )
+    user: DBUser = DBUser(
+        _id=ObjectId(),
+        full_name="Ada Lovelace",
+        phone_number="+16502000000",
+        email="ada@example.com",
+        pw_hash="unused"
+    )
+    phone_number_adapter: TypeAdapter = TypeAdapter(PhoneNumber)
+    token_generator: HS256JWT = HS256JWT(secret="benchmark-secret", token_validity_days=1)
+    claims: dict[str, Any] = {"user_id": str(user._id), "token_version": user.token_version}
+    token: str = asyncio.run(token_generator.create_token(payload=claims))
+    response_body: bytes = ORJSONResponse(
+        content=[discussion_content(discussion=discussion) for discussion in discussions]
+    ).body
+
+    return [
+        Case(
+            name="hydration.discussion_search_page",
+            function=lambda: DBDiscussion.search_discussions_based_on_tags(
+                search_tags=["python"], skip=0, limit=PAGE_SIZE, db=database
+            ),
+            is_async=True,
+            items=PAGE_SIZE
+        ),
+        Case(
+            name="hydration.discussion_page_decode_and_hydrate",
+            function=lambda: [
+                DBDiscussion.from_document(document=bson.decode(encoded, codec_options=CODEC_OPTIONS))
+                for encoded in encoded_documents
+            ],
+            items=PAGE_SIZE
+        ),
+        Case(
+            name="hydration.discussion_page_raw_bson_and_hydrate",
+            function=lambda: [
+                DBDiscussion.from_document(document=RawBSONDocument(encoded, codec_options=raw_codec_options))
+                for encoded in encoded_documents
+            ],
+            items=PAGE_SIZE
+        ),
+        Case(
+            name="schema.discussion_page_construction",
+            function=lambda: [
+                Discussion(
+                    discussion_id=str(discussion._id),
+                    user_id=str(discussion.user_id),
+                    text=discussion.text,
+                    hashtags=discussion.tags,
+                    created_on=str(discussion.created_on),
+                    image_link=discussion.image_link
+                ) for discussion in discussions
+            ],
+            items=PAGE_SIZE
+        ),
+        Case(
+            name="schema.discussion_page_response_serialization",
+            function=lambda: serialize_response(
+                field=search_route.response_field,
+                response_content=response_models
+            ),
+            is_async=True,
+            items=PAGE_SIZE
+        ),
+        Case(
+            name="serialization.discussion_page_orjson_response",
+            function=lambda: ORJSONResponse(
+                content=[discussion_content(discussion=discussion) for discussion in discussions]
+            ),
+            items=PAGE_SIZE
+        ),
+        Case(
+            name="schema.user_self_construction",
+            function=lambda: UserSelf(
+                user_id=str(user._id),
+                full_name=user.full_name,
+                phone_number=user.phone_number,
+                email=user.email
+            )
+        ),
+        Case(
+            name="schema.phone_number_parse",
+            function=lambda: phone_number_adapter.validate_python(user.phone_number)
+        ),
+        Case(
+            name="serialization.user_self_content",
+            function=lambda: user_self_content(user=user)
+        ),
+        Case(
+            name="serialization.phone_number_format_cached",
+            function=lambda: format_phone_number(phone_number=user.phone_number)
+        ),
+        Case(
+            name="auth.jwt_encode",
+            function=lambda: token_generator.create_token(payload=claims),
+            is_async=True
+        ),
+        Case(
+            name="auth.jwt_decode",
+            function=lambda: token_generator.decode_token(token=token),
+            is_async=True
+        ),
+        Case(
+            name="api.split_tags",
+            function=lambda: split_tags(tags="python, performance ,mongo,fastapi , pydantic")
+        ),
+        *(
+            Case(
+                name=f"compression.discussion_page_{encoding}_level_{level}",
+                function=lambda encoding=encoding, level=level: ENCODERS[encoding].compress(response_body, level),
+                items=PAGE_SIZE
+            )
+            for encoding in ENCODERS for level in sorted(set(ENCODING_LEVELS[encoding]))
+        )
+    ]
+
+
+
+def measure(case: Case, repeats: int, min_time_seconds: float, loop: asyncio.AbstractEventLoop) -> dict[str, float]:
+    if case.is_async:
+        async def run_batch(iterations: int) -> None:
+            for _ in range(iterations):
+                await case.function()
+
+        def timed(iterations: int) -> float:
+            start: float = time.perf_counter()
+            loop.run_until_complete(run_batch(iterations))
+            return time.perf_counter() - start
+    else:
+        def timed(iterations: int) -> float:
+            function: Callable[[], Any] = case.function
+            start: float = time.perf_counter()
+            for _ in range(iterations):
+                function()
+            return time.perf_counter() - start
+
+    iterations: int = 1
+    while (elapsed := timed(iterations)) < min_time_seconds / 10:
+        iterations *= 10
+    iterations = max(1, int(iterations * min_time_seconds / max(elapsed, 1e-9)))
+    best: float = min(timed(iterations) for _ in range(repeats)) / iterations
+
+    tracemalloc.start()
+    timed(1)
+    allocated_before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    timed(1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ns_per_op": best * 1e9,
+        "ns_per_item": best * 1e9 / case.items,
+        "ops_per_second": 1 / best,
+        "peak_bytes_per_item": max(0, peak - allocated_before) / case.items
+    }
+
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="filter", default=None, help="only run cases containing this text")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument(
+        "--baseline",
+        default=os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+    results: dict[str, dict[str, float]] = dict()
+    print(f"{'case':<50} {'ns/op':>12} {'ns/item':>12} {'ops/s':>12} {'peak B/item':>12}")
+    for case in build_cases():
+        if arguments.filter and arguments.filter not in case.name:
+            continue
+        results[case.name] = measure(
+            case=case,
+            repeats=arguments.repeats,
+            min_time_seconds=arguments.min_time,
+            loop=loop
+        )
+        stats: dict[str, float] = results[case.name]
+        print(
+            f"{case.name:<50} {stats['ns_per_op']:>12,.0f} {stats['ns_per_item']:>12,.0f} "
+            f"{stats['ops_per_second']:>12,.0f} {stats['peak_bytes_per_item']:>12,.0f}"
+        )
+    loop.close()
+
+    if arguments.save_baseline:
+        existing: dict[str, dict[str, float]] = (
+            load_baseline(path=arguments.baseline) if os.path.exists(arguments.baseline) else dict()
+        )
+        save_baseline(
+            path=arguments.baseline,
+            results={**existing, **results},
+            metadata={
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "repeats": arguments.repeats,
+                "min_time": arguments.min_time
+            }
+        )
+        print(f"baseline written to {arguments.baseline}")
+        return 0
+    if os.path.exists(arguments.baseline):
+        regressions: list[str] = compare_to_baseline(
+            results=results,
+            baseline=load_baseline(path=arguments.baseline),
+            threshold=arguments.threshold,
+            metrics=("ns_per_op",)
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Idle WebSocket connection benchmark for notification delivery.
+
+Opens many idle notification connections for one user against a single
+worker, holds them, then has a second user follow the first and times how
+long the notification takes to reach every connection. Reports the connect
+rate, the worker's resident memory per connection and the fan-out latency:
+
+    python -m benchmarks.websocket_idle --start-server --connections 10000 --save-baseline
+    python -m benchmarks.websocket_idle --start-server --connections 10000 --threshold 0.1
+
+Memory is read from /proc, so it is only reported on Linux for a worker
+started with `--start-server` or given with `--server-pid`. Each connection
+is a file descriptor on both ends; raise `ulimit -n` above the connection
+count in the shell that runs the benchmark.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+import websockets
+
+from benchmarks.baseline import compare_to_baseline, load_baseline, percentile, save_baseline
+from benchmarks.load import _token_user_id, start_server
+
+
+
+def resident_memory_bytes(pid: int) -> int|None:
+    try:
+        with open(f"/proc/{pid}/status", mode="r", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+async def signup(client: httpx.AsyncClient) -> str:
+    suffix: str = uuid.uuid4().hex
+    response: httpx.Response = await client.post(
+        "/auth/signup",
+        json={
+            "full_name": "Idle Listener",
+            "phone_number": f"+1650{int(suffix[:8], 16) % 8000000 + 2000000}",
+            "email": f"websocket-{suffix}@example.com",
+            "password": "websocket-test-password"
+        }
+    )
+    response.raise_for_status()
+    return response.json()["token"]
+
+async def run_benchmark(
+    base_url: str,
+    server_pid: int|None,
+    connections: int,
+    connect_concurrency: int,
+    hold_seconds: float
+) -> dict[str, float]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        listener_token: str = await signup(client=client)
+        actor_token: str = await signup(client=client)
+        listener_id: str = _token_user_id(token=listener_token)
+        websocket_url: str = f"{base_url.replace('http', 'ws', 1)}/notification/ws?token={listener_token}"
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(connect_concurrency)
+        sockets: list[websockets.WebSocketClientProtocol] = list()
+
+        async def connect() -> None:
+            async with semaphore:
+                # No keepalive pings, so that the connections stay truly idle.
+                sockets.append(await websockets.connect(websocket_url, ping_interval=None, max_queue=4))
+
+        memory_before: int|None = resident_memory_bytes(pid=server_pid) if server_pid is not None else None
+        started: float = time.perf_counter()
+        try:
+            await asyncio.gather(*(connect() for _ in range(connections)))
+            connect_seconds: float = time.perf_counter() - started
+            await asyncio.sleep(hold_seconds)
+            memory_after: int|None = resident_memory_bytes(pid=server_pid) if server_pid is not None else None
+
+            published: float = time.perf_counter()
+            received: list[float] = list()
+
+            async def receive(socket: websockets.WebSocketClientProtocol) -> None:
+                await socket.recv()
+                received.append(time.perf_counter() - published)
+
+            receivers: asyncio.Future = asyncio.gather(*(receive(socket=socket) for socket in sockets))
+            response: httpx.Response = await client.post(
+                "/following/",
+                json={"followee_id": listener_id},
+                headers={"Authorization": f"Bearer {actor_token}"}
+            )
+            response.raise_for_status()
+            await asyncio.wait_for(receivers, timeout=60.0)
+        finally:
+            await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+
+    received.sort()
+    results: dict[str, float] = {
+        "connections": float(connections),
+        "connects_per_second": connections / connect_seconds,
+        "fanout_p50_ms": percentile(sorted_values=received, fraction=0.5) * 1000,
+        "fanout_p99_ms": percentile(sorted_values=received, fraction=0.99) * 1000,
+        "fanout_max_ms": received[-1] * 1000
+    }
+    if memory_before is not None and memory_after is not None:
+        results["rss_mb"] = memory_after / 2 ** 20
+        results["kb_per_connection"] = (memory_after - memory_before) / connections / 1024
+    return results
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true")
+    parser.add_argument("--server-pid", type=int, default=None, help="the worker to measure without --start-server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--hold", type=float, default=10.0, help="seconds to hold the idle connections")
+    parser.add_argument(
+        "--baseline",
+        default=os.path.join(os.path.dirname(__file__), "baselines", "websocket-idle.json")
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    server: subprocess.Popen|None = None
+    base_url: str = arguments.base_url
+    server_pid: int|None = arguments.server_pid
+    if arguments.start_server:
+        server = start_server(port=arguments.port)
+        base_url = f"http://127.0.0.1:{arguments.port}"
+        server_pid = server.pid
+    try:
+        results: dict[str, float] = asyncio.run(run_benchmark(
+            base_url=base_url,
+            server_pid=server_pid,
+            connections=arguments.connections,
+            connect_concurrency=arguments.connect_concurrency,
+            hold_seconds=arguments.hold
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    for metric, value in results.items():
+        print(f"{metric:<22} {value:>12,.2f}")
+    if arguments.save_baseline:
+        save_baseline(
+            path=arguments.baseline,
+            results={"idle": results},
+            metadata={key: value for key, value in vars(arguments).items() if key != "save_baseline"}
+        )
+        print(f"baseline written to {arguments.baseline}")
+        return 0
+    if os.path.exists(arguments.baseline):
+        regressions: list[str] = compare_to_baseline(
+            results={"idle": results},
+            baseline=load_baseline(path=arguments.baseline),
+            threshold=arguments.threshold,
+            metrics=("connects_per_second", "kb_per_connection", "fanout_p99_ms")
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
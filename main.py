@@ -1 +1,47 @@
-from src import app
\ No newline at end of file
+"""
+Production entry point:
+
+    python main.py
+
+Server settings come from the SERVER_* environment variables (see README).
+`fastapi dev main.py` keeps working for development through the `app` import.
+"""
+import importlib.util
+import sys
+
+from src import app
+from src.config import (
+    DATA_BACKEND, SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_BACKLOG,
+    SERVER_KEEP_ALIVE_SECONDS, SERVER_LIMIT_CONCURRENCY, SERVER_GRACEFUL_SHUTDOWN_SECONDS
+)
+
+
+
+def main() -> int:
+    if DATA_BACKEND == "memory" and SERVER_WORKERS > 1:
+        print("DATA_BACKEND=memory keeps data per process and needs SERVER_WORKERS=1", file=sys.stderr)
+        return 2
+    # Imported here so that `fastapi dev main.py`, which only needs `app`, does not load the launcher.
+    import uvicorn
+
+    # Workers import the app themselves, so every process builds its own Mongo
+    # client in the lifespan instead of inheriting one. On SIGTERM uvicorn stops
+    # accepting connections, lets in-flight requests finish for up to the
+    # graceful shutdown timeout and then runs the lifespan shutdown.
+    uvicorn.run(
+        "src:app",
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        workers=SERVER_WORKERS,
+        loop="uvloop" if importlib.util.find_spec("uvloop") is not None else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") is not None else "h11",
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEP_ALIVE_SECONDS,
+        limit_concurrency=SERVER_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        lifespan="on"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,8 @@
+from contextlib import asynccontextmanager, suppress
+from logging.handlers import QueueListener
+from typing import AsyncIterator
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
@@ -7,11 +12,86 @@ from src.api.discussion import discussion_router
 from src.api.following import following_router
 from src.api.comment import comment_router
 from src.api.like import like_router
-from src.config import LOCAL_STORAGE_STATIC_FILES_PATH, LOCAL_STORAGE_BASE_URL
+from src.api.notification import notification_router
+from src.api.metrics import metrics_router
+from src.api.admin import admin_router
+from src.config import (
+    LOCAL_STORAGE_STATIC_FILES_PATH, LOCAL_STORAGE_BASE_URL, PROFILING_SECRET,
+    PROFILING_SAMPLE_RATE, PROFILING_DIRECTORY, PROFILING_MAX_FILES, LOG_LEVEL, LOG_JSON,
+    LOG_QUEUE_SIZE, LOG_RATE_LIMIT, LOG_RATE_LIMIT_WINDOW_SECONDS, WARMUP_ENABLED,
+    WARMUP_MONGO_CONNECTIONS, WARMUP_TIMEOUT_SECONDS, AUTH_MODE, AUTH_REVOCATION_REFRESH_SECONDS,
+    CONCURRENCY_LIMIT_ENABLED, CONCURRENCY_INITIAL_LIMIT, CONCURRENCY_MIN_LIMIT, CONCURRENCY_MAX_LIMIT,
+    CONCURRENCY_LATENCY_TARGET_MS, CONCURRENCY_READ_SHARE, CONCURRENCY_PASSWORD_HASHING_LIMIT,
+    CONCURRENCY_RETRY_AFTER_SECONDS, RATE_LIMIT_COMPACTION_SECONDS, DEADLINE_ENABLED, DEADLINE_DEFAULT_MS,
+    JWT_SECRET, CONSISTENCY_TOKEN_VALIDITY_SECONDS, COMPRESSION_ENABLED, COMPRESSION_ENCODINGS,
+    COMPRESSION_MINIMUM_SIZE, COMPRESSION_LARGE_BODY_SIZE
+)
+from src.dependencies.resources import Resources, close_resources, open_resources
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.concurrency import ConcurrencyLimitMiddleware
+from src.middleware.consistency import CausalConsistencyMiddleware
+from src.middleware.deadline import DeadlineMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.request_id import RequestIdMiddleware
+from src.middleware.tracing import TracingMiddleware
+from src.utils.concurrency import AIMDConcurrencyLimiter, ConcurrencyLimiter
+from src.utils.event_loop import monitor_event_loop_lag, _loop_watchdog
+from src.utils.slow_queries import _slow_query_recorder
+from src.utils.log import configure_logging
+from src.utils.tracing import _tracer
+from src.utils.warmup import warm_up
+
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    log_listener: QueueListener = configure_logging(
+        level=LOG_LEVEL,
+        json=LOG_JSON,
+        queue_size=LOG_QUEUE_SIZE,
+        rate_limit=LOG_RATE_LIMIT,
+        rate_limit_window_seconds=LOG_RATE_LIMIT_WINDOW_SECONDS
+    )
+    log_listener.start()
+    _tracer.start()
+    background_tasks: list[asyncio.Task] = [asyncio.create_task(monitor_event_loop_lag())]
+    if _loop_watchdog is not None:
+        background_tasks.append(asyncio.create_task(_loop_watchdog.run()))
+    resources: Resources = open_resources()
+    app.state.resources = resources
+    if resources.client is not None:
+        _slow_query_recorder.attach(client=resources.client, loop=asyncio.get_running_loop())
+    background_tasks.append(asyncio.create_task(
+        resources.rate_limit_repository.run_compaction(interval_seconds=RATE_LIMIT_COMPACTION_SECONDS)
+    ))
+    background_tasks.append(asyncio.create_task(resources.notification_hub.run()))
+    if AUTH_MODE == "stateless":
+        await resources.revocation_list.refresh()
+        background_tasks.append(asyncio.create_task(
+            resources.revocation_list.run(interval_seconds=AUTH_REVOCATION_REFRESH_SECONDS)
+        ))
+    if WARMUP_ENABLED:
+        await warm_up(
+            app=app,
+            client=resources.client,
+            password_hasher=resources.password_hasher,
+            mongo_connections=WARMUP_MONGO_CONNECTIONS,
+            timeout_seconds=WARMUP_TIMEOUT_SECONDS
+        )
+    yield
+    _slow_query_recorder.detach()
+    for background_task in background_tasks:
+        background_task.cancel()
+    for background_task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await background_task
+    close_resources(resources=resources)
+    _tracer.shutdown()
+    log_listener.stop()
 
 
-app: FastAPI = FastAPI()
+
+app: FastAPI = FastAPI(lifespan=lifespan)
 
 app.mount(LOCAL_STORAGE_BASE_URL, StaticFiles(directory=LOCAL_STORAGE_STATIC_FILES_PATH), name="static")
 
@@ -21,3 +101,51 @@ app.include_router(router=discussion_router)
 app.include_router(router=following_router)
 app.include_router(router=comment_router)
 app.include_router(router=like_router)
+app.include_router(router=notification_router)
+app.include_router(router=metrics_router)
+app.include_router(router=admin_router)
+
+if COMPRESSION_ENABLED:
+    # Innermost, so that the time spent compressing counts against the deadline and the concurrency limit.
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=COMPRESSION_ENCODINGS,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        large_body_size=COMPRESSION_LARGE_BODY_SIZE
+    )
+app.add_middleware(
+    CausalConsistencyMiddleware,
+    secret=JWT_SECRET,
+    validity_seconds=CONSISTENCY_TOKEN_VALIDITY_SECONDS
+)
+if DEADLINE_ENABLED:
+    app.add_middleware(DeadlineMiddleware, routes=app.routes, default_budget_ms=DEADLINE_DEFAULT_MS)
+if CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        routes=app.routes,
+        limiter=AIMDConcurrencyLimiter(
+            initial_limit=CONCURRENCY_INITIAL_LIMIT,
+            min_limit=CONCURRENCY_MIN_LIMIT,
+            max_limit=CONCURRENCY_MAX_LIMIT,
+            latency_target_seconds=CONCURRENCY_LATENCY_TARGET_MS / 1000
+        ),
+        password_hashing_limiter=ConcurrencyLimiter(limit=CONCURRENCY_PASSWORD_HASHING_LIMIT),
+        read_share=CONCURRENCY_READ_SHARE,
+        retry_after_seconds=CONCURRENCY_RETRY_AFTER_SECONDS
+    )
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+if _tracer.enabled:
+    app.add_middleware(TracingMiddleware, tracer=_tracer)
+app.add_middleware(RequestIdMiddleware)
+if PROFILING_SECRET is not None or PROFILING_SAMPLE_RATE > 0:
+    # cProfile and pstats are only imported when profiling is enabled.
+    from src.middleware.profiling import ProfilingMiddleware
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=PROFILING_DIRECTORY,
+        sample_rate=PROFILING_SAMPLE_RATE,
+        max_files=PROFILING_MAX_FILES,
+        secret=PROFILING_SECRET
+    )
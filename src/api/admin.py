@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+
+from src.dependencies.auth import authenticate_admin
+from src.schemas.admin import SlowQuery, EventLoopStall
+from src.utils.event_loop import _loop_watchdog
+from src.utils.slow_queries import _slow_query_recorder
+from src.utils.tracing import TracedAPIRoute
+
+
+
+admin_router: APIRouter = APIRouter(
+    prefix="/admin",
+    route_class=TracedAPIRoute,
+    dependencies=[Depends(authenticate_admin)]
+)
+
+
+
+@admin_router.get("/slow-queries")
+async def get_slow_queries() -> list[SlowQuery]:
+    return [
+        SlowQuery(
+            recorded_on=str(slow_query.recorded_on),
+            duration_ms=slow_query.duration_ms,
+            database=slow_query.database,
+            collection=slow_query.collection,
+            command_name=slow_query.command_name,
+            query_site=slow_query.query_site,
+            query_shape=slow_query.query_shape,
+            explained=slow_query.explained,
+            plan_summary=slow_query.plan_summary,
+            docs_examined=slow_query.docs_examined,
+            n_returned=slow_query.n_returned,
+            flags=list(slow_query.flags)
+        ) for slow_query in _slow_query_recorder.records()
+    ]
+
+
+@admin_router.get("/event-loop-stalls")
+async def get_event_loop_stalls() -> list[EventLoopStall]:
+    if _loop_watchdog is None:
+        return list()
+    return [
+        EventLoopStall(
+            call_site=site.call_site,
+            count=site.count,
+            total_seconds=site.total_seconds,
+            max_seconds=site.max_seconds,
+            last_stack=site.last_stack
+        ) for site in _loop_watchdog.stall_sites()
+    ]
@@ -1,19 +1,26 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from src.schemas.user import NewUser
 from src.schemas.auth import LoginInfo, AuthToken
-from src.dependencies.database import get_db
+from src.dependencies.repositories import get_user_repository
 from src.dependencies.auth import (
     AbstractPasswordHash, AbstractTokenGenerator, get_password_hasher, get_token_generator
 )
 from src.models.user import DBUser, DuplicateEmailOrPhone
+from src.repositories.user import AbstractUserRepository
+from src.dependencies.rate_limit import rate_limited_by_client_ip
+from src.utils.tracing import TracedAPIRoute
+from src.config import RATE_LIMIT_AUTH
 
 
 
-auth_router: APIRouter = APIRouter(prefix="/auth")
+auth_router: APIRouter = APIRouter(
+    prefix="/auth",
+    route_class=TracedAPIRoute,
+    dependencies=rate_limited_by_client_ip(bucket="auth", limit=RATE_LIMIT_AUTH)
+)
 
 
 
@@ -23,13 +30,12 @@ async def signup(
     response: Response,
     password_hasher: Annotated[AbstractPasswordHash, Depends(get_password_hasher)],
     token_generator: Annotated[AbstractTokenGenerator, Depends(get_token_generator)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)]
 ) -> AuthToken:
     try:
-        new_db_user: DBUser = await DBUser.create_new_user(
+        new_db_user: DBUser = await users.create_new_user(
             new_user=new_user,
-            hashed_password=await password_hasher.hash(password=new_user.password),
-            db=db
+            hashed_password=await password_hasher.hash(password=new_user.password)
         )
     except DuplicateEmailOrPhone:
         raise HTTPException(
@@ -40,7 +46,8 @@ async def signup(
     return AuthToken(
         token=await token_generator.create_token(
             payload={
-                "user_id": str(new_db_user._id)
+                "user_id": str(new_db_user._id),
+                "token_version": new_db_user.token_version
             }
         )
     )
@@ -51,11 +58,11 @@ async def login(
     login_info: LoginInfo,
     password_hasher: Annotated[AbstractPasswordHash, Depends(get_password_hasher)],
     token_generator: Annotated[AbstractTokenGenerator, Depends(get_token_generator)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)]
 ) -> AuthToken:
-    user: DBUser|None = await DBUser.get_user_by_email(
+    user: DBUser|None = await users.get_user_by_email(
         email=login_info.email,
-        db=db
+        fields=("pw_hash", "token_version")
     )
     if user is not None and await password_hasher.verify(
         password=login_info.password,
@@ -64,7 +71,8 @@ async def login(
         return AuthToken(
             token=await token_generator.create_token(
                 payload={
-                    "user_id": str(user._id)
+                    "user_id": str(user._id),
+                    "token_version": user.token_version
                 }
             )
         )
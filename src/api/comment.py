@@ -1,78 +1,111 @@
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.params import Depends as DependsParam
+from fastapi.responses import ORJSONResponse
 from bson import ObjectId
 
-from src.dependencies.database import get_db
+from src.dependencies.repositories import get_comment_repository, get_discussion_repository
 from src.dependencies.auth import authenticate_user
-from src.schemas.comment import NewComment, Comment, CommentUpdate
+from src.dependencies.ids import get_requested_ids
+from src.dependencies.notifications import get_notification_hub
+from src.schemas.comment import NewComment, Comment, CommentBatch, CommentUpdate
 from src.schemas.common import Message
 from src.models.user import DBUser
 from src.models.comment import DBComment
 from src.models.discussion import DBDiscussion
+from src.repositories.comment import AbstractCommentRepository
+from src.repositories.discussion import AbstractDiscussionRepository
+from src.utils.notifications import NotificationHub
+from src.api.serialization import comment_content, missing_ids
+from src.dependencies.rate_limit import rate_limited_by_client_ip, rate_limited_by_user
+from src.utils.tracing import TracedAPIRoute
+from src.config import RATE_LIMIT_COMMENT, RATE_LIMIT_COMMENT_READ
 
 
 
-comment_router: APIRouter = APIRouter(prefix="/comment")
+comment_router: APIRouter = APIRouter(prefix="/comment", route_class=TracedAPIRoute)
 
+# Reads are public and limited per client IP like the other multi-gets; writes are limited per user.
+COMMENT_READ_RATE_LIMIT: list[DependsParam] = rate_limited_by_client_ip(
+    bucket="comment-read",
+    limit=RATE_LIMIT_COMMENT_READ
+)
+COMMENT_WRITE_RATE_LIMIT: list[DependsParam] = rate_limited_by_user(bucket="comment", limit=RATE_LIMIT_COMMENT)
 
 
-@comment_router.post("/")
+
+@comment_router.get("", response_model=CommentBatch, dependencies=COMMENT_READ_RATE_LIMIT)
+async def get_comments(
+    ids: Annotated[list[ObjectId], Depends(get_requested_ids)],
+    comments: Annotated[AbstractCommentRepository, Depends(get_comment_repository)]
+) -> ORJSONResponse:
+    db_comments: list[DBComment|None] = await comments.get_comments_by_ids(ids=ids)
+    return ORJSONResponse(
+        content={
+            "comments": [comment_content(comment=comment) for comment in db_comments if comment is not None],
+            "missing_ids": missing_ids(ids=ids, models=db_comments)
+        }
+    )
+
+
+@comment_router.post("/", response_model=Comment, dependencies=COMMENT_WRITE_RATE_LIMIT)
 async def add_comment(
     new_comment: NewComment,
-    response: Response,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
-) -> Comment:
-    discussion: DBDiscussion|None = await DBDiscussion.get_discussion_by_id(
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
+    comments: Annotated[AbstractCommentRepository, Depends(get_comment_repository)],
+    notification_hub: Annotated[NotificationHub, Depends(get_notification_hub)]
+) -> ORJSONResponse:
+    discussion: DBDiscussion|None = await discussions.get_discussion_by_id(
         _id=new_comment.discussion_id,
-        db=db
+        fields=("user_id",)
     )
     if discussion is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="the discussion for which this comment was being added doesn't exist"
         )
+    recipient_ids: list[ObjectId] = [discussion.user_id]
     if new_comment.parent_comment_id is not None:
-        parent_comment: DBComment|None = await DBComment.get_comment_by_id(
+        parent_comment: DBComment|None = await comments.get_comment_by_id(
             comment_id=ObjectId(new_comment.parent_comment_id),
-            db=db
+            fields=("user_id",)
         )
         if parent_comment is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="the specified parent comment doesn't exist"
             )
-    new_db_comment: DBComment = await DBComment.add_comment(
-        db=db,
+        recipient_ids.append(parent_comment.user_id)
+    new_db_comment: DBComment = await comments.add_comment(
         discussion_id=discussion._id,
         user_id=user._id,
         text=new_comment.text,
         parent_comment_id=ObjectId(new_comment.parent_comment_id) if new_comment.parent_comment_id
                           is not None else None
     )
-    response.status_code = status.HTTP_201_CREATED
-    return Comment(
-        comment_id=str(new_db_comment._id),
-        discussion_id=str(new_db_comment.discussion_id),
-        user_id=str(new_db_comment.user_id),
-        text=new_db_comment.text,
-        parent_comment_id=str(new_db_comment.parent_comment_id) if new_db_comment.parent_comment_id
-                          is not None else None
+    content: dict[str, Any] = comment_content(comment=new_db_comment)
+    await notification_hub.publish(
+        recipient_ids=recipient_ids,
+        actor_id=user._id,
+        payload={"type": "comment", "comment": content}
+    )
+    return ORJSONResponse(
+        content=content,
+        status_code=status.HTTP_201_CREATED
     )
 
 
-@comment_router.patch("/{comment_id}")
+@comment_router.patch("/{comment_id}", response_model=Comment, dependencies=COMMENT_WRITE_RATE_LIMIT)
 async def update_comment(
     comment_id: str,
     comment_update: CommentUpdate,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
-) -> Comment:
-    comment: DBComment|None = await DBComment.get_comment_by_id(
-        comment_id=ObjectId(comment_id),
-        db=db
+    comments: Annotated[AbstractCommentRepository, Depends(get_comment_repository)]
+) -> ORJSONResponse:
+    comment: DBComment|None = await comments.get_comment_by_id(
+        comment_id=ObjectId(comment_id)
     )
     if comment is None:
         raise HTTPException(
@@ -84,30 +117,25 @@ async def update_comment(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="you do not have permission to update this comment"
         )
-    await comment.update_comment(
-        db=db,
+    await comments.update_comment(
+        comment=comment,
         text=comment_update.text
     )
-    return Comment(
-        comment_id=str(comment._id),
-        discussion_id=str(comment.discussion_id),
-        user_id=str(comment.user_id),
-        text=comment.text,
-        parent_comment_id=str(comment.parent_comment_id) if comment.parent_comment_id is not None
-                          else None
+    return ORJSONResponse(
+        content=comment_content(comment=comment)
     )
     
 
 
-@comment_router.delete("/{comment_id}")
+@comment_router.delete("/{comment_id}", dependencies=COMMENT_WRITE_RATE_LIMIT)
 async def delete_comment(
     comment_id: str,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+    comments: Annotated[AbstractCommentRepository, Depends(get_comment_repository)]
 ) -> Message:
-    comment: DBComment|None = await DBComment.get_comment_by_id(
+    comment: DBComment|None = await comments.get_comment_by_id(
         comment_id=ObjectId(comment_id),
-        db=db
+        fields=("user_id",)
     )
     if comment is None:
         raise HTTPException(
@@ -119,7 +147,7 @@ async def delete_comment(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="you do not have permission to delete that comment"
         )
-    await comment.delete_comment(db=db)
+    await comments.delete_comment(comment=comment)
     # TODO: Handle orphaned resources (replies)
     return Message(
         message="The comment was deleted successfully"
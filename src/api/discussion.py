@@ -1,40 +1,98 @@
 from typing import Annotated
 import datetime
 
+from bson import ObjectId
 from fastapi import (
-    APIRouter, Depends, Response, Form, UploadFile,
+    APIRouter, Depends, Form, Header, Query, UploadFile,
     HTTPException, status
 )
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi.responses import ORJSONResponse, Response
 
 from src.dependencies.auth import authenticate_user
-from src.dependencies.database import get_db
+from src.dependencies.ids import get_requested_ids
+from src.dependencies.repositories import get_discussion_repository
 from src.dependencies.files import AbstractFileStorage, get_file_storage
 from src.models.user import DBUser
 from src.models.discussion import DBDiscussion
 from src.models.common import NoChangeInResource
-from src.schemas.discussion import Discussion, DiscussionTextSearch, DiscussionTagSearch
+from src.repositories.discussion import AbstractDiscussionRepository
+from src.schemas.discussion import Discussion, DiscussionBatch, DiscussionTextSearch, DiscussionTagSearch
 from src.schemas.common import Message
+from src.api.serialization import discussion_content, missing_ids
+from src.dependencies.rate_limit import rate_limited_by_client_ip
+from src.utils.etag import if_none_match, strong_etag
+from src.utils.tracing import TracedAPIRoute
+from src.config import DISCUSSION_CACHE_MAX_AGE_SECONDS, RATE_LIMIT_DISCUSSION
 
 
 
-discussion_router: APIRouter = APIRouter(prefix="/discussion")
+discussion_router: APIRouter = APIRouter(
+    prefix="/discussion",
+    route_class=TracedAPIRoute,
+    dependencies=rate_limited_by_client_ip(bucket="discussion", limit=RATE_LIMIT_DISCUSSION)
+)
+
+
+
+def split_tags(tags: str) -> list[str]:
+    return [
+        tag.strip() for tag in tags.split(",")
+    ]
+
 
 
+@discussion_router.get("", response_model=DiscussionBatch)
+async def get_discussions(
+    ids: Annotated[list[ObjectId], Depends(get_requested_ids)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)]
+) -> ORJSONResponse:
+    db_discussions: list[DBDiscussion|None] = await discussions.get_discussions_by_ids(ids=ids)
+    return ORJSONResponse(
+        content={
+            "discussions": [
+                discussion_content(discussion=discussion) for discussion in db_discussions if discussion is not None
+            ],
+            "missing_ids": missing_ids(ids=ids, models=db_discussions)
+        }
+    )
+
+
+@discussion_router.get("/{discussion_id}", response_model=Discussion)
+async def get_discussion(
+    discussion_id: str,
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
+    if_none_match_header: Annotated[str|None, Header(alias="If-None-Match")] = None
+) -> Response:
+    discussion: DBDiscussion|None = (
+        await discussions.get_discussion_by_id(_id=discussion_id) if ObjectId.is_valid(discussion_id) else None
+    )
+    if discussion is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="the specified discussion does not exist"
+        )
+    headers: dict[str, str] = {
+        "ETag": strong_etag(discussion._id, discussion.version),
+        "Cache-Control": f"public, max-age={DISCUSSION_CACHE_MAX_AGE_SECONDS}"
+    }
+    if if_none_match_header is not None and if_none_match(header=if_none_match_header, etag=headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ORJSONResponse(
+        content=discussion_content(discussion=discussion),
+        headers=headers
+    )
+
 
-@discussion_router.post("/")
+@discussion_router.post("/", response_model=Discussion)
 async def create_discussion(
     user: Annotated[DBUser, Depends(authenticate_user)],
     text: Annotated[str, Form()],
-    response: Response,
     file_storage: Annotated[AbstractFileStorage, Depends(get_file_storage)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
     tags: str|None = Form(None),
     image: UploadFile|None = None
-) -> Discussion:
-    list_tags: list[str] = [
-        tag.strip() for tag in tags.split(",")
-    ] if tags is not None else list()
+) -> ORJSONResponse:
+    list_tags: list[str] = split_tags(tags=tags) if tags is not None else list()
     if image is not None:
         if image.content_type not in ["image/jpeg", "image/png"]:
             raise HTTPException(
@@ -48,38 +106,31 @@ async def create_discussion(
         )
     else:
         image_link = None
-    new_discussion: DBDiscussion = await DBDiscussion.create_discussion(
+    new_discussion: DBDiscussion = await discussions.create_discussion(
         user_id=user._id,
         text=text,
         tags=list_tags,
         created_on=datetime.datetime.now(tz=datetime.timezone.utc),
-        image_link=image_link,
-        db=db
+        image_link=image_link
     )
-    response.status_code = status.HTTP_201_CREATED
-    return Discussion(
-        discussion_id=str(new_discussion._id),
-        user_id=str(new_discussion.user_id),
-        text=new_discussion.text,
-        hashtags=new_discussion.tags,
-        created_on=str(new_discussion.created_on),
-        image_link=new_discussion.image_link
+    return ORJSONResponse(
+        content=discussion_content(discussion=new_discussion),
+        status_code=status.HTTP_201_CREATED
     )
 
 
-@discussion_router.patch("/{discussion_id}")
+@discussion_router.patch("/{discussion_id}", response_model=Discussion)
 async def update_discussion(
     discussion_id: str,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
     file_storage: Annotated[AbstractFileStorage, Depends(get_file_storage)],
     text: str|None = Form(None),
     tags: str|None = Form(None),
     image: UploadFile|None = None
-) -> Discussion:
-    discussion_to_update: DBDiscussion|None = await DBDiscussion.get_discussion_by_id(
-        _id=discussion_id,
-        db=db
+) -> ORJSONResponse:
+    discussion_to_update: DBDiscussion|None = await discussions.get_discussion_by_id(
+        _id=discussion_id
     )
     if discussion_to_update is None:
         raise HTTPException(
@@ -91,9 +142,7 @@ async def update_discussion(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="you don't have permission to update this discussion"
         )
-    list_tags: list[str]|None = [
-        tag.strip() for tag in tags.split(",")
-    ] if tags is not None else None
+    list_tags: list[str]|None = split_tags(tags=tags) if tags is not None else None
     if image is not None:
         if image.content_type not in ["image/jpeg", "image/png"]:
             raise HTTPException(
@@ -108,8 +157,8 @@ async def update_discussion(
     else:
         image_link = None
     try:
-        await discussion_to_update.update_discussion(
-            db=db,
+        await discussions.update_discussion(
+            discussion=discussion_to_update,
             text=text,
             tags=list_tags,
             image_link=image_link
@@ -119,13 +168,8 @@ async def update_discussion(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="at least one field must be updated"
         )
-    return Discussion(
-        discussion_id=str(discussion_to_update._id),
-        user_id=str(discussion_to_update.user_id),
-        text=discussion_to_update.text,
-        hashtags=discussion_to_update.tags,
-        created_on=str(discussion_to_update.created_on),
-        image_link=discussion_to_update.image_link
+    return ORJSONResponse(
+        content=discussion_content(discussion=discussion_to_update)
     )
 
 
@@ -133,11 +177,11 @@ async def update_discussion(
 async def delete_discussion(
     discussion_id: str,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
 ) -> Message:
-    discussion: DBDiscussion|None = await DBDiscussion.get_discussion_by_id(
+    discussion: DBDiscussion|None = await discussions.get_discussion_by_id(
         _id=discussion_id,
-        db=db
+        fields=("user_id",)
     )
     if discussion is None:
         raise HTTPException(
@@ -149,8 +193,8 @@ async def delete_discussion(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="you do not have permission to delete this discussion"
         )
-    await discussion.delete_discussion(
-        db=db
+    await discussions.delete_discussion(
+        discussion=discussion
     )
     # TODO: Handle orphaned resources such as likes and comments
     return Message(
@@ -158,53 +202,43 @@ async def delete_discussion(
     )
 
 
-@discussion_router.post(path="/search/tags")
+@discussion_router.post(path="/search/tags", response_model=list[Discussion])
 async def search_discussions_by_tags(
     search_tags: DiscussionTagSearch,
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
     skip: int = 0,
-    limit: int = 10
-) -> list[Discussion]:
-    db_search_results: list[DBDiscussion] = await DBDiscussion.search_discussions_based_on_tags(
+    limit: int = 10,
+    text_preview_length: Annotated[int|None, Query(ge=1)] = None
+) -> ORJSONResponse:
+    db_search_results: list[DBDiscussion] = await discussions.search_discussions_based_on_tags(
         search_tags=search_tags.hashtags,
         skip=skip,
         limit=limit,
-        db=db
+        text_preview_length=text_preview_length
+    )
+    return ORJSONResponse(
+        content=[
+            discussion_content(discussion=discussion) for discussion in db_search_results
+        ]
     )
-    search_results: list[Discussion] = [
-        Discussion(
-            discussion_id=str(discussion._id),
-            user_id=str(discussion.user_id),
-            text=discussion.text,
-            hashtags=discussion.tags,
-            created_on=str(discussion.created_on),
-            image_link=discussion.image_link
-        ) for discussion in db_search_results
-    ]
-    return search_results
 
 
-@discussion_router.post(path="/search")
+@discussion_router.post(path="/search", response_model=list[Discussion])
 async def search_discussions_by_content(
     search: DiscussionTextSearch,
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
     skip: int = 0,
-    limit: int = 10
-) -> list[Discussion]:
-    db_search_results: list[DBDiscussion] = await DBDiscussion.search_discussions_based_on_text(
+    limit: int = 10,
+    text_preview_length: Annotated[int|None, Query(ge=1)] = None
+) -> ORJSONResponse:
+    db_search_results: list[DBDiscussion] = await discussions.search_discussions_based_on_text(
         search_term=search.search_text,
         skip=skip,
         limit=limit,
-        db=db
+        text_preview_length=text_preview_length
+    )
+    return ORJSONResponse(
+        content=[
+            discussion_content(discussion=discussion) for discussion in db_search_results
+        ]
     )
-    search_results: list[Discussion] = [
-        Discussion(
-            discussion_id=str(discussion._id),
-            user_id=str(discussion.user_id),
-            text=discussion.text,
-            hashtags=discussion.tags,
-            created_on=str(discussion.created_on),
-            image_link=discussion.image_link
-        ) for discussion in db_search_results
-    ]
-    return search_results
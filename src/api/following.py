@@ -1,32 +1,45 @@
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from bson import ObjectId
 
-from src.dependencies.database import get_db
+from src.dependencies.repositories import get_following_repository, get_user_repository
 from src.dependencies.auth import authenticate_user
+from src.dependencies.notifications import get_notification_hub
 from src.schemas.following import FollowRequest, Following
 from src.schemas.common import Message
 from src.models.user import DBUser
 from src.models.following import DBFollowing, FollowingAlreadyExists
+from src.repositories.following import AbstractFollowingRepository
+from src.repositories.user import AbstractUserRepository
+from src.utils.notifications import NotificationHub
+from src.api.serialization import following_content
+from src.dependencies.rate_limit import rate_limited_by_user
+from src.utils.tracing import TracedAPIRoute
+from src.config import RATE_LIMIT_FOLLOWING
 
 
 
-following_router: APIRouter = APIRouter(prefix="/following")
+following_router: APIRouter = APIRouter(
+    prefix="/following",
+    route_class=TracedAPIRoute,
+    dependencies=rate_limited_by_user(bucket="following", limit=RATE_LIMIT_FOLLOWING)
+)
 
 
 
-@following_router.post("/")
+@following_router.post("/", response_model=Following)
 async def follow(
     follow_request: FollowRequest,
-    response: Response,
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)],
+    followings: Annotated[AbstractFollowingRepository, Depends(get_following_repository)],
     user: Annotated[DBUser, Depends(authenticate_user)],
-) -> Following:
-    followee: DBUser|None = await DBUser.get_user_by_id(
+    notification_hub: Annotated[NotificationHub, Depends(get_notification_hub)]
+) -> ORJSONResponse:
+    followee: DBUser|None = await users.get_user_by_id(
         _id=follow_request.followee_id,
-        db=db
+        fields=()
     )
     if followee is None:
         raise HTTPException(
@@ -39,8 +52,7 @@ async def follow(
             detail="you cant follow yourself"
         )
     try:
-        new_following: DBFollowing = await DBFollowing.create_following(
-            db=db,
+        new_following: DBFollowing = await followings.create_following(
             followee_id=followee._id,
             follower_id=user._id
         )
@@ -49,9 +61,15 @@ async def follow(
             status_code=status.HTTP_409_CONFLICT,
             detail="this following already exists"
         )
-    response.status_code = status.HTTP_201_CREATED
-    return Following(
-        following_id=str(new_following._id)
+    content: dict[str, Any] = following_content(following=new_following)
+    await notification_hub.publish(
+        recipient_ids=[followee._id],
+        actor_id=user._id,
+        payload={"type": "follow", "follower_id": str(user._id), "following": content}
+    )
+    return ORJSONResponse(
+        content=content,
+        status_code=status.HTTP_201_CREATED
     )
 
 
@@ -59,12 +77,12 @@ async def follow(
 @following_router.delete("/{following_id}")
 async def unfollow(
     following_id: str,
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    followings: Annotated[AbstractFollowingRepository, Depends(get_following_repository)],
     user: Annotated[DBUser, Depends(authenticate_user)],
 ) -> Message:
-    following_to_delete: DBFollowing|None = await DBFollowing.get_following_by_id(
+    following_to_delete: DBFollowing|None = await followings.get_following_by_id(
         following_id=ObjectId(following_id),
-        db=db
+        fields=("follower_id",)
     )
     if following_to_delete is None:
         raise HTTPException(
@@ -76,8 +94,8 @@ async def unfollow(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="you do not have permission to delete this following"
         )
-    await following_to_delete.delete_following(
-        db=db
+    await followings.delete_following(
+        following=following_to_delete
     )
     return Message(
         message="The following was deleted successfully"
@@ -1,60 +1,77 @@
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from bson import ObjectId
 
 from src.schemas.like import NewLike, Like
 from src.schemas.common import Message
 from src.dependencies.auth import authenticate_user
-from src.dependencies.database import get_db
+from src.dependencies.notifications import get_notification_hub
+from src.dependencies.repositories import (
+    get_comment_repository, get_discussion_repository, get_like_repository
+)
 from src.models.user import DBUser
 from src.models.comment import DBComment
 from src.models.discussion import DBDiscussion
 from src.models.like import DBLike, LikeAlreadyExists
+from src.repositories.comment import AbstractCommentRepository
+from src.repositories.discussion import AbstractDiscussionRepository
+from src.repositories.like import AbstractLikeRepository
+from src.utils.notifications import NotificationHub
+from src.api.serialization import like_content
+from src.dependencies.rate_limit import rate_limited_by_user
+from src.utils.tracing import TracedAPIRoute
+from src.config import RATE_LIMIT_LIKE
 
 
 
-like_router: APIRouter = APIRouter(prefix="/like")
+like_router: APIRouter = APIRouter(
+    prefix="/like",
+    route_class=TracedAPIRoute,
+    dependencies=rate_limited_by_user(bucket="like", limit=RATE_LIMIT_LIKE)
+)
 
 
 
-@like_router.post("/")
+@like_router.post("/", response_model=Like)
 async def like(
     like: NewLike,
-    response: Response,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
-) -> Like:
+    comments: Annotated[AbstractCommentRepository, Depends(get_comment_repository)],
+    discussions: Annotated[AbstractDiscussionRepository, Depends(get_discussion_repository)],
+    likes: Annotated[AbstractLikeRepository, Depends(get_like_repository)],
+    notification_hub: Annotated[NotificationHub, Depends(get_notification_hub)]
+) -> ORJSONResponse:
     if like.like_context == "COMMENT":
-        comment: DBComment|None = await DBComment.get_comment_by_id(
+        comment: DBComment|None = await comments.get_comment_by_id(
             comment_id=ObjectId(like.context_id),
-            db=db
+            fields=("user_id",)
         )
         if comment is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="The comment doesn't exist"
             )
+        author_id: ObjectId = comment.user_id
     elif like.like_context == "DISCUSSION":
-        discussion: DBDiscussion|None = await DBDiscussion.get_discussion_by_id(
+        discussion: DBDiscussion|None = await discussions.get_discussion_by_id(
             _id=like.context_id,
-            db=db
+            fields=("user_id",)
         )
         if discussion is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="The discussion doesn't exist"
             )
+        author_id = discussion.user_id
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="'like_context' should only be one of COMMENT or DISCUSSION"
         )
-    response.status_code = status.HTTP_201_CREATED
     try:
-        new_like: DBLike = await DBLike.add_like(
-            db=db,
+        new_like: DBLike = await likes.add_like(
             context=like.like_context,
             context_id=ObjectId(like.context_id),
             user_id=user._id
@@ -64,11 +81,15 @@ async def like(
             status_code=status.HTTP_409_CONFLICT,
             detail="this like already exists"
         )
-    return Like(
-        like_id=str(new_like._id),
-        like_context=new_like.context,
-        context_id=str(new_like.context_id),
-        user_id=str(new_like.user_id)
+    content: dict[str, Any] = like_content(like=new_like)
+    await notification_hub.publish(
+        recipient_ids=[author_id],
+        actor_id=user._id,
+        payload={"type": "like", "like": content}
+    )
+    return ORJSONResponse(
+        content=content,
+        status_code=status.HTTP_201_CREATED
     )
     
 
@@ -77,11 +98,11 @@ async def like(
 async def unlike(
     like_id: str,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+    likes: Annotated[AbstractLikeRepository, Depends(get_like_repository)]
 ) -> Message:
-    like: DBLike|None = await DBLike.get_like(
+    like: DBLike|None = await likes.get_like(
         _id=ObjectId(like_id),
-        db=db
+        fields=("user_id",)
     )
     if like is None:
         raise HTTPException(
@@ -93,8 +114,8 @@ async def unlike(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="you don't have permission to delete this like"
         )
-    await like.delete_like(
-        db=db
+    await likes.delete_like(
+        like=like
     )
     return Message(
         message="like deleted successfully"
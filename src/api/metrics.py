@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from src.utils.metrics import _metrics_registry
+
+
+
+metrics_router: APIRouter = APIRouter()
+
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(
+        content=_metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
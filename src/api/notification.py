@@ -0,0 +1,52 @@
+import asyncio
+
+from fastapi import APIRouter, WebSocket, status
+
+from src.dependencies.auth import user_from_token
+from src.dependencies.resources import Resources
+from src.models.user import DBUser
+from src.utils.metrics import websocket_connections
+from src.utils.notifications import NotificationHub, Subscription
+
+
+
+notification_router: APIRouter = APIRouter(prefix="/notification")
+
+
+
+# Browsers cannot set headers on a WebSocket handshake, so the token may also come as the `token` query parameter.
+@notification_router.websocket("/ws")
+async def notifications(websocket: WebSocket) -> None:
+    resources: Resources = websocket.app.state.resources
+    authorization: str = websocket.headers.get("authorization", "")
+    token: str|None = (
+        authorization.strip().split(" ")[-1] if authorization else websocket.query_params.get("token")
+    )
+    user: DBUser|None = None if not token else await user_from_token(
+        token=token,
+        token_generator=resources.token_generator,
+        users=resources.user_repository,
+        revocation_list=resources.revocation_list
+    )
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    hub: NotificationHub = resources.notification_hub
+    subscription: Subscription = hub.subscribe(user_id=user._id)
+    websocket_connections.inc()
+
+    async def forward() -> None:
+        while True:
+            await websocket.send_text(await subscription.get())
+
+    forward_task: asyncio.Task = asyncio.create_task(forward())
+    try:
+        # Clients only listen; reading is how the disconnect is noticed.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        forward_task.cancel()
+        await asyncio.gather(forward_task, return_exceptions=True)
+        hub.unsubscribe(subscription=subscription)
+        websocket_connections.dec()
@@ -0,0 +1,75 @@
+# Routes return these dicts in an ORJSONResponse. The schemas in src/schemas only document them through
+# each route's `response_model`, so both must list the same fields in the same format.
+from typing import Any, Sequence
+import functools
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from src.models.comment import DBComment
+from src.models.discussion import DBDiscussion
+from src.models.following import DBFollowing
+from src.models.like import DBLike
+from src.models.user import DBUser
+from src.schemas.types import PhoneNumber
+
+
+
+_phone_number_adapter: TypeAdapter[PhoneNumber] = TypeAdapter(PhoneNumber)
+
+
+
+@functools.lru_cache(maxsize=4096)
+def format_phone_number(phone_number: str) -> str:
+    return str(_phone_number_adapter.validate_python(phone_number))
+
+
+def discussion_content(discussion: DBDiscussion) -> dict[str, Any]:
+    return {
+        "discussion_id": str(discussion._id),
+        "user_id": str(discussion.user_id),
+        "text": discussion.text,
+        "hashtags": discussion.tags,
+        "image_link": discussion.image_link,
+        "created_on": str(discussion.created_on)
+    }
+
+def comment_content(comment: DBComment) -> dict[str, Any]:
+    return {
+        "comment_id": str(comment._id),
+        "discussion_id": str(comment.discussion_id),
+        "user_id": str(comment.user_id),
+        "text": comment.text,
+        "parent_comment_id": str(comment.parent_comment_id) if comment.parent_comment_id is not None
+                             else None
+    }
+
+def like_content(like: DBLike) -> dict[str, Any]:
+    return {
+        "like_id": str(like._id),
+        "like_context": like.context,
+        "context_id": str(like.context_id),
+        "user_id": str(like.user_id)
+    }
+
+def following_content(following: DBFollowing) -> dict[str, Any]:
+    return {
+        "following_id": str(following._id)
+    }
+
+def user_self_content(user: DBUser) -> dict[str, Any]:
+    return {
+        "user_id": str(user._id),
+        "full_name": user.full_name,
+        "phone_number": format_phone_number(phone_number=user.phone_number),
+        "email": user.email
+    }
+
+def user_public_content(user: DBUser) -> dict[str, Any]:
+    return {
+        "user_id": str(user._id),
+        "full_name": user.full_name
+    }
+
+def missing_ids(ids: Sequence[ObjectId], models: Sequence[Any|None]) -> list[str]:
+    return [str(_id) for _id, model in zip(ids, models) if model is None]
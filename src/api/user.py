@@ -1,31 +1,56 @@
 from typing import Annotated
 
+from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pydantic_extra_types.phone_numbers import PhoneNumber
+from fastapi.responses import ORJSONResponse
 
-from src.schemas.user import UserSelf, UserUpdate, UserPublic
+from src.schemas.user import UserSelf, UserUpdate, UserPublic, UserPublicBatch
 from src.schemas.common import Message
-from src.dependencies.auth import authenticate_user
-from src.dependencies.database import get_db
+from src.dependencies.auth import authenticate_user, get_revocation_list
+from src.dependencies.ids import get_requested_ids
+from src.dependencies.repositories import get_user_repository
 from src.models.user import DBUser
 from src.models.common import ResourceNotFound
+from src.repositories.user import AbstractUserRepository
+from src.api.serialization import missing_ids, user_public_content, user_self_content
+from src.utils.revocation import RevocationList
+from src.dependencies.rate_limit import rate_limited_by_client_ip
+from src.utils.tracing import TracedAPIRoute
+from src.config import RATE_LIMIT_USER
 
 
 
-user_router: APIRouter = APIRouter(prefix="/user")
+user_router: APIRouter = APIRouter(
+    prefix="/user",
+    route_class=TracedAPIRoute,
+    dependencies=rate_limited_by_client_ip(bucket="user", limit=RATE_LIMIT_USER)
+)
 
 
 
-@user_router.patch(path="/")
+@user_router.get(path="", response_model=UserPublicBatch)
+async def get_users(
+    ids: Annotated[list[ObjectId], Depends(get_requested_ids)],
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)]
+) -> ORJSONResponse:
+    db_users: list[DBUser|None] = await users.get_users_by_ids(ids=ids, fields=("full_name",))
+    return ORJSONResponse(
+        content={
+            "users": [user_public_content(user=user) for user in db_users if user is not None],
+            "missing_ids": missing_ids(ids=ids, models=db_users)
+        }
+    )
+
+
+@user_router.patch(path="/", response_model=UserSelf)
 async def update_user(
     user_update: UserUpdate,
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
-) -> UserSelf:
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)]
+) -> ORJSONResponse:
     try:
-        await user.update_user(
-            db=db,
+        await users.update_user(
+            user=user,
             new_full_name=user_update.full_name,
             new_phone_number=user_update.phone_number,
             new_email=user_update.email
@@ -35,20 +60,20 @@ async def update_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="at least one field must be updated"
         )
-    return UserSelf(
-        user_id=str(user._id),
-        full_name=user.full_name,
-        phone_number=PhoneNumber(user.phone_number),
-        email=user.email
+    return ORJSONResponse(
+        content=user_self_content(user=user)
     )
 
 
 @user_router.delete(path="/")
 async def delete_user(
     user: Annotated[DBUser, Depends(authenticate_user)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)],
+    revocation_list: Annotated[RevocationList, Depends(get_revocation_list)]
 ) -> Message:
-    await user.delete_user(db=db)
+    await users.delete_user(user=user)
+    # Stateless authentication never loads the user, so the deleted user's tokens are revoked explicitly.
+    await revocation_list.revoke(user_id=user._id, token_version=user.token_version + 1)
     # TODO: Handle orphaned resources like discussions, likes
     # comments, followings, etc.
     return Message(
@@ -56,23 +81,21 @@ async def delete_user(
     )
     
 
-@user_router.get(path="/search/{full_name}")
+@user_router.get(path="/search/{full_name}", response_model=list[UserPublic])
 async def search_users_by_name(
     full_name: str,
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)],
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)],
     skip: int = 0,
     limit: int = 10
-) -> list[UserPublic]:
-    db_search_results: list[DBUser] = await DBUser.search_users_by_full_name(
+) -> ORJSONResponse:
+    db_search_results: list[DBUser] = await users.search_users_by_full_name(
         search_term=full_name,
         skip=skip,
         limit=limit,
-        db=db
+        fields=("full_name",)
+    )
+    return ORJSONResponse(
+        content=[
+            user_public_content(user=user) for user in db_search_results
+        ]
     )
-    search_results: list[UserPublic] = [
-        UserPublic(
-            user_id=str(user._id),
-            full_name=user.full_name
-        ) for user in db_search_results
-    ]
-    return search_results
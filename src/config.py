@@ -9,10 +9,126 @@ load_dotenv()
 
 MONGO_CONNECTION_STRING: str = env["MONGO_CONNECTION_STRING"]
 MONGO_DATABASE_NAME: str = env["MONGO_DATABASE_NAME"]
+# MongoClient options; they take precedence over the same options in the connection string.
+MONGO_APP_NAME: str = env.get("MONGO_APP_NAME", "discussions-api")
+MONGO_MAX_POOL_SIZE: int = int(env.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE: int = int(env.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_CONNECTING: int = int(env.get("MONGO_MAX_CONNECTING", "2"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS: int|None = (
+    int(env["MONGO_WAIT_QUEUE_TIMEOUT_MS"]) if env.get("MONGO_WAIT_QUEUE_TIMEOUT_MS") else None
+)
+MONGO_MAX_IDLE_TIME_MS: int|None = int(env["MONGO_MAX_IDLE_TIME_MS"]) if env.get("MONGO_MAX_IDLE_TIME_MS") else None
+MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(env.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGO_CONNECT_TIMEOUT_MS: int = int(env.get("MONGO_CONNECT_TIMEOUT_MS", "20000"))
+# Comma separated in order of preference: zstd, snappy or zlib.
+MONGO_COMPRESSORS: str = env.get("MONGO_COMPRESSORS", "")
+MONGO_ZLIB_COMPRESSION_LEVEL: int = int(env.get("MONGO_ZLIB_COMPRESSION_LEVEL", "-1"))
+# "<collection>=<value>" pairs; collections not listed use the connection string's defaults.
+MONGO_WRITE_CONCERNS: str = env.get(
+    "MONGO_WRITE_CONCERNS",
+    "likes=1,rate_limits=1,notifications=1,users=majority,token_revocations=majority"
+)
+MONGO_READ_CONCERNS: str = env.get("MONGO_READ_CONCERNS", "")
+# Read preference of the search endpoints; they may lag behind the primary by up to the max staleness.
+MONGO_SEARCH_READ_PREFERENCE: str = env.get("MONGO_SEARCH_READ_PREFERENCE", "secondaryPreferred")
+MONGO_SEARCH_MAX_STALENESS_SECONDS: int = int(env.get("MONGO_SEARCH_MAX_STALENESS_SECONDS", "90"))
+CONSISTENCY_TOKEN_VALIDITY_SECONDS: int = int(env.get("CONSISTENCY_TOKEN_VALIDITY_SECONDS", "120"))
+# "mongo" or "memory"; the in-memory backend keeps all data in the process and loses it on restart.
+DATA_BACKEND: str = env.get("DATA_BACKEND", "mongo")
+# How long caches may serve GET /discussion/{discussion_id} before revalidating it with its ETag.
+DISCUSSION_CACHE_MAX_AGE_SECONDS: int = int(env.get("DISCUSSION_CACHE_MAX_AGE_SECONDS", "10"))
+# Most ids one multi-get request (GET /discussion, /comment or /user with ?ids=) may resolve.
+MULTI_GET_MAX_IDS: int = int(env.get("MULTI_GET_MAX_IDS", "100"))
 
 JWT_SECRET: str = env["JWT_SECRET"]
 JWT_VALIDITY_DAYS: int = int(env["JWT_VALIDITY_DAYS"])
+# "lookup" loads the user on every authenticated request; "stateless" trusts the token's claims and
+# only checks them against the revocation list, which is re-read every AUTH_REVOCATION_REFRESH_SECONDS.
+AUTH_MODE: str = env.get("AUTH_MODE", "lookup")
+AUTH_REVOCATION_REFRESH_SECONDS: float = float(env.get("AUTH_REVOCATION_REFRESH_SECONDS", "30"))
 
 
 LOCAL_STORAGE_STATIC_FILES_PATH: str = env["LOCAL_STORAGE_STATIC_FILES_PATH"]
 LOCAL_STORAGE_BASE_URL: str = env["LOCAL_STORAGE_BASE_URL"]
+
+ADMIN_TOKEN: str|None = env.get("ADMIN_TOKEN")
+
+SLOW_QUERY_THRESHOLD_MS: float = float(env.get("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(env.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.1"))
+SLOW_QUERY_LOG_SIZE: int = int(env.get("SLOW_QUERY_LOG_SIZE", "200"))
+SLOW_QUERY_DOCS_EXAMINED_RATIO: float = float(env.get("SLOW_QUERY_DOCS_EXAMINED_RATIO", "100"))
+
+LOOP_WATCHDOG_THRESHOLD_MS: float = float(env.get("LOOP_WATCHDOG_THRESHOLD_MS", "100"))
+
+PROFILING_SECRET: str|None = env.get("PROFILING_SECRET")
+PROFILING_SAMPLE_RATE: float = float(env.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIRECTORY: str = env.get("PROFILING_DIRECTORY", "profiles")
+PROFILING_MAX_FILES: int = int(env.get("PROFILING_MAX_FILES", "100"))
+
+LOG_LEVEL: str = env.get("LOG_LEVEL", "INFO")
+LOG_JSON: bool = env.get("LOG_JSON", "true").lower() == "true"
+LOG_QUEUE_SIZE: int = int(env.get("LOG_QUEUE_SIZE", "10000"))
+LOG_RATE_LIMIT: int = int(env.get("LOG_RATE_LIMIT", "20"))
+LOG_RATE_LIMIT_WINDOW_SECONDS: float = float(env.get("LOG_RATE_LIMIT_WINDOW_SECONDS", "10"))
+
+TRACING_EXPORTER: str = env.get("TRACING_EXPORTER", "none")
+TRACING_FILE_PATH: str = env.get("TRACING_FILE_PATH", "traces.jsonl")
+TRACING_SAMPLE_RATE: float = float(env.get("TRACING_SAMPLE_RATE", "1"))
+
+RATE_LIMIT_ENABLED: bool = env.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "memory" keeps the buckets in each worker; "mongo" shares them between all workers.
+RATE_LIMIT_BACKEND: str = env.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_COMPACTION_SECONDS: float = float(env.get("RATE_LIMIT_COMPACTION_SECONDS", "60"))
+# "<requests>/<seconds>" per client IP (auth, discussion, user) or per user (comment, like, following);
+# an empty value disables the router's limit.
+RATE_LIMIT_AUTH: str = env.get("RATE_LIMIT_AUTH", "10/60")
+RATE_LIMIT_DISCUSSION: str = env.get("RATE_LIMIT_DISCUSSION", "120/60")
+RATE_LIMIT_USER: str = env.get("RATE_LIMIT_USER", "120/60")
+RATE_LIMIT_COMMENT: str = env.get("RATE_LIMIT_COMMENT", "30/60")
+RATE_LIMIT_COMMENT_READ: str = env.get("RATE_LIMIT_COMMENT_READ", "120/60")
+RATE_LIMIT_LIKE: str = env.get("RATE_LIMIT_LIKE", "60/60")
+RATE_LIMIT_FOLLOWING: str = env.get("RATE_LIMIT_FOLLOWING", "30/60")
+
+# "memory" delivers notifications within the worker that published them; "mongo" fans them out to every
+# worker through a capped collection of NOTIFICATIONS_CAPPED_SIZE_BYTES.
+NOTIFICATIONS_BACKEND: str = env.get("NOTIFICATIONS_BACKEND", "memory")
+NOTIFICATIONS_CAPPED_SIZE_BYTES: int = int(env.get("NOTIFICATIONS_CAPPED_SIZE_BYTES", str(16 * 1024 * 1024)))
+# Notifications queued per WebSocket connection before the oldest are dropped.
+NOTIFICATIONS_QUEUE_SIZE: int = int(env.get("NOTIFICATIONS_QUEUE_SIZE", "100"))
+
+DEADLINE_ENABLED: bool = env.get("DEADLINE_ENABLED", "true").lower() == "true"
+# Latency budget of routes without their own budget in src/middleware/deadline.py.
+DEADLINE_DEFAULT_MS: float = float(env.get("DEADLINE_DEFAULT_MS", "5000"))
+
+COMPRESSION_ENABLED: bool = env.get("COMPRESSION_ENABLED", "true").lower() == "true"
+# Comma separated in order of preference: zstd, br or gzip.
+COMPRESSION_ENCODINGS: list[str] = [
+    encoding.strip() for encoding in env.get("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if encoding.strip()
+]
+COMPRESSION_MINIMUM_SIZE: int = int(env.get("COMPRESSION_MINIMUM_SIZE", "1024"))
+# Bodies of at least this many bytes are compressed at a cheaper level in a worker thread.
+COMPRESSION_LARGE_BODY_SIZE: int = int(env.get("COMPRESSION_LARGE_BODY_SIZE", "65536"))
+
+CONCURRENCY_LIMIT_ENABLED: bool = env.get("CONCURRENCY_LIMIT_ENABLED", "true").lower() == "true"
+CONCURRENCY_INITIAL_LIMIT: int = int(env.get("CONCURRENCY_INITIAL_LIMIT", "100"))
+CONCURRENCY_MIN_LIMIT: int = int(env.get("CONCURRENCY_MIN_LIMIT", "10"))
+CONCURRENCY_MAX_LIMIT: int = int(env.get("CONCURRENCY_MAX_LIMIT", "1000"))
+CONCURRENCY_LATENCY_TARGET_MS: float = float(env.get("CONCURRENCY_LATENCY_TARGET_MS", "250"))
+# Reads are shed once this fraction of the limit is in flight, writes only at the full limit.
+CONCURRENCY_READ_SHARE: float = float(env.get("CONCURRENCY_READ_SHARE", "0.8"))
+CONCURRENCY_PASSWORD_HASHING_LIMIT: int = int(env.get("CONCURRENCY_PASSWORD_HASHING_LIMIT", "4"))
+CONCURRENCY_RETRY_AFTER_SECONDS: int = int(env.get("CONCURRENCY_RETRY_AFTER_SECONDS", "1"))
+
+WARMUP_ENABLED: bool = env.get("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_MONGO_CONNECTIONS: int = int(env.get("WARMUP_MONGO_CONNECTIONS", "10"))
+WARMUP_TIMEOUT_SECONDS: float = float(env.get("WARMUP_TIMEOUT_SECONDS", "10"))
+
+SERVER_HOST: str = env.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT: int = int(env.get("SERVER_PORT", "8000"))
+SERVER_WORKERS: int = int(env.get("SERVER_WORKERS", "1"))
+SERVER_BACKLOG: int = int(env.get("SERVER_BACKLOG", "2048"))
+SERVER_KEEP_ALIVE_SECONDS: int = int(env.get("SERVER_KEEP_ALIVE_SECONDS", "5"))
+SERVER_LIMIT_CONCURRENCY: int|None = (
+    int(env["SERVER_LIMIT_CONCURRENCY"]) if env.get("SERVER_LIMIT_CONCURRENCY") else None
+)
+SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = int(env.get("SERVER_GRACEFUL_SHUTDOWN_SECONDS", "30"))
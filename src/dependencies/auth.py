@@ -1,27 +1,35 @@
 from typing import Any, Annotated
+import hmac
 
-from fastapi import Depends, Header, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import Depends, Header, HTTPException, Request, status
 
-from src.utils.auth import (
-    AbstractPasswordHash, _password_hasher, AbstractTokenGenerator, InvalidToken,
-    _token_generator
-)
+from src.utils.auth import AbstractPasswordHash, AbstractTokenGenerator, InvalidToken
+from src.utils.revocation import RevocationList
 from src.models.user import DBUser
-from src.dependencies.database import get_db
+from src.repositories.user import AbstractUserRepository
+from src.dependencies.repositories import get_user_repository
+from src.config import ADMIN_TOKEN, AUTH_MODE
+from src.utils.tracing import traced
 
 
 
-async def get_password_hasher() -> AbstractPasswordHash:
-    return _password_hasher
+async def get_password_hasher(request: Request) -> AbstractPasswordHash:
+    return request.app.state.resources.password_hasher
 
-async def get_token_generator() -> AbstractTokenGenerator:
-    return _token_generator
+async def get_token_generator(request: Request) -> AbstractTokenGenerator:
+    return request.app.state.resources.token_generator
 
+async def get_revocation_list(request: Request) -> RevocationList:
+    return request.app.state.resources.revocation_list
+
+@traced(name="dependency.authenticate_user")
 async def authenticate_user(
     authorization: Annotated[str, Header()],
     token_generator: Annotated[AbstractTokenGenerator, Depends(get_token_generator)],
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+    users: Annotated[AbstractUserRepository, Depends(get_user_repository)],
+    revocation_list: Annotated[RevocationList, Depends(get_revocation_list)]
 ) -> DBUser:
     try:
         auth_token: str = authorization.strip().split(" ")[1]
@@ -29,25 +37,64 @@ async def authenticate_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
         )
+    user: DBUser|None = await user_from_token(
+        token=auth_token,
+        token_generator=token_generator,
+        users=users,
+        revocation_list=revocation_list
+    )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+        )
+    return user
+
+async def user_from_token(
+    token: str,
+    token_generator: AbstractTokenGenerator,
+    users: AbstractUserRepository,
+    revocation_list: RevocationList
+) -> DBUser|None:
     try:
         token_payload: dict[str, Any] = await token_generator.decode_token(
-            token=auth_token
+            token=token
         )
     except InvalidToken:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-        )
-    if "user_id" not in token_payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+        return None
+    try:
+        user_id: ObjectId = ObjectId(token_payload["user_id"])
+        # Tokens issued before token versions were introduced carry version 0.
+        token_version: int = int(token_payload.get("token_version", 0))
+    except (KeyError, InvalidId, TypeError, ValueError):
+        return None
+    if AUTH_MODE == "stateless":
+        if revocation_list.is_revoked(user_id=user_id, token_version=token_version):
+            return None
+        # Routes only need the caller's id and token version, both of which the token carries.
+        return DBUser.hydrate(
+            document={
+                "_id": user_id,
+                "token_version": token_version
+            },
+            fields=("token_version",)
         )
-    user_id: str = token_payload["user_id"]
-    user: DBUser|None = await DBUser.get_user_by_id(
-        _id=user_id,
-        db=db
+    # Routes only need the caller's id; update_user loads the remaining fields itself.
+    user: DBUser|None = await users.get_user_by_id(
+        _id=str(user_id),
+        fields=("token_version",)
     )
-    if user is not None:
+    if user is not None and user.token_version == token_version:
         return user
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-    )
+    return None
+
+async def authenticate_admin(
+    x_admin_token: Annotated[str|None, Header()] = None
+) -> None:
+    if (
+        ADMIN_TOKEN is None
+        or x_admin_token is None
+        or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
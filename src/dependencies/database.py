@@ -1,13 +1,103 @@
+from typing import Any
+import datetime
+
+from bson.codec_options import CodecOptions
+from fastapi import Request
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from pymongo.write_concern import WriteConcern
+
+from src.config import (
+    MONGO_APP_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_CONNECTING, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_MAX_IDLE_TIME_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_COMPRESSORS,
+    MONGO_ZLIB_COMPRESSION_LEVEL, MONGO_WRITE_CONCERNS, MONGO_READ_CONCERNS, MONGO_SEARCH_READ_PREFERENCE,
+    MONGO_SEARCH_MAX_STALENESS_SECONDS
+)
+from src.utils.mongo_monitoring import (
+    MongoCommandMetricsListener, MongoPoolMetricsListener, MongoTracingListener
+)
+from src.utils.slow_queries import _slow_query_recorder
+from src.utils.tracing import _tracer
+
+
+
+# Datetimes are decoded as aware UTC datetimes by the driver, so models don't convert them.
+CODEC_OPTIONS: CodecOptions = CodecOptions(tz_aware=True, tzinfo=datetime.timezone.utc)
+
+_SECONDARY_READ_PREFERENCES: dict[str, type] = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
+
+def client_options(compressors: str = MONGO_COMPRESSORS) -> dict[str, Any]:
+    return {
+        "appname": MONGO_APP_NAME,
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxConnecting": MONGO_MAX_CONNECTING,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        **({"compressors": compressors, "zlibCompressionLevel": MONGO_ZLIB_COMPRESSION_LEVEL} if compressors else {})
+    }
+
+def create_client(connection_string: str) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        host=connection_string,
+        event_listeners=[
+            MongoCommandMetricsListener(),
+            MongoPoolMetricsListener(),
+            _slow_query_recorder,
+            *([MongoTracingListener(tracer=_tracer)] if _tracer.enabled else [])
+        ],
+        **client_options()
+    )
+
+def create_database(client: AsyncIOMotorClient, name: str) -> AsyncIOMotorDatabase:
+    return AsyncIOMotorDatabase(
+        client=client,
+        name=name,
+        codec_options=CODEC_OPTIONS
+    )
 
-from src.config import MONGO_CONNECTION_STRING, MONGO_DATABASE_NAME
 
+# Searches tolerate reading from a lagging secondary.
+def create_search_database(db: AsyncIOMotorDatabase) -> AsyncIOMotorDatabase:
+    if MONGO_SEARCH_READ_PREFERENCE == "primary":
+        return db.with_options(read_preference=Primary())
+    if MONGO_SEARCH_READ_PREFERENCE not in _SECONDARY_READ_PREFERENCES:
+        raise ValueError(f"unknown MONGO_SEARCH_READ_PREFERENCE '{MONGO_SEARCH_READ_PREFERENCE}'")
+    return db.with_options(
+        read_preference=_SECONDARY_READ_PREFERENCES[MONGO_SEARCH_READ_PREFERENCE](
+            max_staleness=MONGO_SEARCH_MAX_STALENESS_SECONDS
+        )
+    )
 
+def with_collection_concerns(db: AsyncIOMotorDatabase, collection: str) -> AsyncIOMotorDatabase:
+    write_concern: str|None = parse_collection_settings(settings=MONGO_WRITE_CONCERNS).get(collection)
+    read_concern: str|None = parse_collection_settings(settings=MONGO_READ_CONCERNS).get(collection)
+    return db.with_options(
+        write_concern=None if write_concern is None else WriteConcern(
+            w=int(write_concern) if write_concern.isdigit() else write_concern
+        ),
+        read_concern=None if read_concern is None else ReadConcern(level=read_concern)
+    )
 
-client: AsyncIOMotorClient = AsyncIOMotorClient(host=MONGO_CONNECTION_STRING)
-db: AsyncIOMotorDatabase = AsyncIOMotorDatabase(client=client, name=MONGO_DATABASE_NAME)
+def parse_collection_settings(settings: str) -> dict[str, str]:
+    return dict(
+        setting.strip().split("=", 1) for setting in settings.split(",") if setting.strip()
+    )
 
 
 
-def get_db() -> AsyncIOMotorDatabase:
+async def get_db(request: Request) -> AsyncIOMotorDatabase:
+    db: AsyncIOMotorDatabase|None = request.app.state.resources.db
+    if db is None:
+        raise RuntimeError("there is no database with DATA_BACKEND=memory")
     return db
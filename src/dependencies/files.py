@@ -1,6 +1,8 @@
-from src.utils.file_storage import AbstractFileStorage, _file_storage
+from fastapi import Request
 
+from src.utils.file_storage import AbstractFileStorage
 
 
-async def get_file_storage() -> AbstractFileStorage:
-    return _file_storage
+
+async def get_file_storage(request: Request) -> AbstractFileStorage:
+    return request.app.state.resources.file_storage
@@ -0,0 +1,33 @@
+from typing import Annotated
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Query, status
+
+from src.config import MULTI_GET_MAX_IDS
+
+
+
+async def get_requested_ids(
+    ids: Annotated[str, Query(description=f"comma separated ids, at most {MULTI_GET_MAX_IDS}")]
+) -> list[ObjectId]:
+    try:
+        requested_ids: list[ObjectId] = list(dict.fromkeys(
+            ObjectId(_id.strip()) for _id in ids.split(",") if _id.strip()
+        ))
+    except InvalidId:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'ids' must be a comma separated list of valid ids"
+        )
+    if not requested_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'ids' must have at least one id in it"
+        )
+    if len(requested_ids) > MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"at most {MULTI_GET_MAX_IDS} ids can be requested at once"
+        )
+    return requested_ids
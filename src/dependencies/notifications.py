@@ -0,0 +1,8 @@
+from fastapi import Request
+
+from src.utils.notifications import NotificationHub
+
+
+
+async def get_notification_hub(request: Request) -> NotificationHub:
+    return request.app.state.resources.notification_hub
@@ -0,0 +1,64 @@
+from typing import Annotated
+import math
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.params import Depends as DependsParam
+
+from src.config import RATE_LIMIT_ENABLED
+from src.dependencies.auth import authenticate_user
+from src.models.user import DBUser
+from src.repositories.rate_limit import AbstractRateLimitRepository, RateLimit, parse_rate_limit
+from src.utils.tracing import traced
+
+
+
+async def get_rate_limit_repository(request: Request) -> AbstractRateLimitRepository:
+    return request.app.state.resources.rate_limit_repository
+
+@traced(name="dependency.rate_limit")
+async def enforce_rate_limit(rate_limits: AbstractRateLimitRepository, key: str, limit: RateLimit) -> None:
+    retry_after: float = await rate_limits.take(key=key, limit=limit)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+
+def rate_limited_by_client_ip(bucket: str, limit: str) -> list[DependsParam]:
+    rate_limit: RateLimit|None = parse_rate_limit(limit=limit)
+    if not RATE_LIMIT_ENABLED or rate_limit is None:
+        return []
+
+    async def limit_client_ip(
+        request: Request,
+        rate_limits: Annotated[AbstractRateLimitRepository, Depends(get_rate_limit_repository)]
+    ) -> None:
+        # Requests without a client address only come from the startup warm-up.
+        if request.client is not None:
+            await enforce_rate_limit(
+                rate_limits=rate_limits,
+                key=f"{bucket}:ip:{request.client.host}",
+                limit=rate_limit
+            )
+
+    return [Depends(limit_client_ip)]
+
+def rate_limited_by_user(bucket: str, limit: str) -> list[DependsParam]:
+    rate_limit: RateLimit|None = parse_rate_limit(limit=limit)
+    if not RATE_LIMIT_ENABLED or rate_limit is None:
+        return []
+
+    async def limit_user(
+        user: Annotated[DBUser, Depends(authenticate_user)],
+        rate_limits: Annotated[AbstractRateLimitRepository, Depends(get_rate_limit_repository)]
+    ) -> None:
+        await enforce_rate_limit(
+            rate_limits=rate_limits,
+            key=f"{bucket}:user:{user._id}",
+            limit=rate_limit
+        )
+
+    return [Depends(limit_user)]
@@ -0,0 +1,24 @@
+from fastapi import Request
+
+from src.repositories.comment import AbstractCommentRepository
+from src.repositories.discussion import AbstractDiscussionRepository
+from src.repositories.following import AbstractFollowingRepository
+from src.repositories.like import AbstractLikeRepository
+from src.repositories.user import AbstractUserRepository
+
+
+
+async def get_user_repository(request: Request) -> AbstractUserRepository:
+    return request.app.state.resources.user_repository
+
+async def get_discussion_repository(request: Request) -> AbstractDiscussionRepository:
+    return request.app.state.resources.discussion_repository
+
+async def get_comment_repository(request: Request) -> AbstractCommentRepository:
+    return request.app.state.resources.comment_repository
+
+async def get_like_repository(request: Request) -> AbstractLikeRepository:
+    return request.app.state.resources.like_repository
+
+async def get_following_repository(request: Request) -> AbstractFollowingRepository:
+    return request.app.state.resources.following_repository
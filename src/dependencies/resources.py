@@ -0,0 +1,146 @@
+import dataclasses
+import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from src.config import (
+    DATA_BACKEND, MONGO_CONNECTION_STRING, MONGO_DATABASE_NAME, JWT_SECRET, JWT_VALIDITY_DAYS, AUTH_MODE,
+    RATE_LIMIT_BACKEND, LOCAL_STORAGE_STATIC_FILES_PATH, LOCAL_STORAGE_BASE_URL, NOTIFICATIONS_BACKEND,
+    NOTIFICATIONS_CAPPED_SIZE_BYTES, NOTIFICATIONS_QUEUE_SIZE
+)
+from src.dependencies.database import (
+    create_client, create_database, create_search_database, with_collection_concerns
+)
+from src.repositories.comment import (
+    AbstractCommentRepository, InMemoryCommentRepository, MotorCommentRepository
+)
+from src.repositories.discussion import (
+    AbstractDiscussionRepository, InMemoryDiscussionRepository, MotorDiscussionRepository
+)
+from src.repositories.following import (
+    AbstractFollowingRepository, InMemoryFollowingRepository, MotorFollowingRepository
+)
+from src.repositories.like import AbstractLikeRepository, InMemoryLikeRepository, MotorLikeRepository
+from src.repositories.notification import InMemoryNotificationRepository, MotorNotificationRepository
+from src.repositories.rate_limit import (
+    AbstractRateLimitRepository, InMemoryRateLimitRepository, MotorRateLimitRepository
+)
+from src.repositories.revocation import (
+    AbstractRevocationRepository, InMemoryRevocationRepository, MotorRevocationRepository
+)
+from src.repositories.user import AbstractUserRepository, InMemoryUserRepository, MotorUserRepository
+from src.utils.auth import AbstractPasswordHash, AbstractTokenGenerator, Argon2PasswordHash, HS256JWT
+from src.utils.file_storage import AbstractFileStorage, LocalFileStorage
+from src.utils.notifications import NotificationHub
+from src.utils.revocation import RevocationList
+
+
+
+@dataclasses.dataclass
+class Resources:
+
+    client: AsyncIOMotorClient|None
+    db: AsyncIOMotorDatabase|None
+    user_repository: AbstractUserRepository
+    discussion_repository: AbstractDiscussionRepository
+    comment_repository: AbstractCommentRepository
+    like_repository: AbstractLikeRepository
+    following_repository: AbstractFollowingRepository
+    revocation_list: RevocationList
+    rate_limit_repository: AbstractRateLimitRepository
+    notification_hub: NotificationHub
+    file_storage: AbstractFileStorage
+    password_hasher: AbstractPasswordHash
+    token_generator: AbstractTokenGenerator
+
+
+
+def open_resources() -> Resources:
+    if AUTH_MODE not in ("lookup", "stateless"):
+        raise ValueError(f"AUTH_MODE must be 'lookup' or 'stateless', not '{AUTH_MODE}'")
+    if RATE_LIMIT_BACKEND not in ("memory", "mongo"):
+        raise ValueError(f"RATE_LIMIT_BACKEND must be 'memory' or 'mongo', not '{RATE_LIMIT_BACKEND}'")
+    if NOTIFICATIONS_BACKEND not in ("memory", "mongo"):
+        raise ValueError(f"NOTIFICATIONS_BACKEND must be 'memory' or 'mongo', not '{NOTIFICATIONS_BACKEND}'")
+    file_storage: AbstractFileStorage = LocalFileStorage(
+        root=LOCAL_STORAGE_STATIC_FILES_PATH,
+        base_url=LOCAL_STORAGE_BASE_URL
+    )
+    password_hasher: AbstractPasswordHash = Argon2PasswordHash()
+    token_generator: AbstractTokenGenerator = HS256JWT(
+        secret=JWT_SECRET,
+        token_validity_days=JWT_VALIDITY_DAYS
+    )
+    if DATA_BACKEND == "memory":
+        if RATE_LIMIT_BACKEND == "mongo":
+            raise ValueError("RATE_LIMIT_BACKEND=mongo needs DATA_BACKEND=mongo")
+        if NOTIFICATIONS_BACKEND == "mongo":
+            raise ValueError("NOTIFICATIONS_BACKEND=mongo needs DATA_BACKEND=mongo")
+        return Resources(
+            client=None,
+            db=None,
+            user_repository=InMemoryUserRepository(),
+            discussion_repository=InMemoryDiscussionRepository(),
+            comment_repository=InMemoryCommentRepository(),
+            like_repository=InMemoryLikeRepository(),
+            following_repository=InMemoryFollowingRepository(),
+            revocation_list=create_revocation_list(revocations=InMemoryRevocationRepository()),
+            rate_limit_repository=InMemoryRateLimitRepository(),
+            notification_hub=NotificationHub(
+                notifications=InMemoryNotificationRepository(),
+                queue_size=NOTIFICATIONS_QUEUE_SIZE
+            ),
+            file_storage=file_storage,
+            password_hasher=password_hasher,
+            token_generator=token_generator
+        )
+    if DATA_BACKEND != "mongo":
+        raise ValueError(f"DATA_BACKEND must be 'mongo' or 'memory', not '{DATA_BACKEND}'")
+    client: AsyncIOMotorClient = create_client(connection_string=MONGO_CONNECTION_STRING)
+    db: AsyncIOMotorDatabase = create_database(client=client, name=MONGO_DATABASE_NAME)
+    search_db: AsyncIOMotorDatabase = create_search_database(db=db)
+    return Resources(
+        client=client,
+        db=db,
+        user_repository=MotorUserRepository(
+            db=with_collection_concerns(db=db, collection="users"),
+            search_db=with_collection_concerns(db=search_db, collection="users")
+        ),
+        discussion_repository=MotorDiscussionRepository(
+            db=with_collection_concerns(db=db, collection="discussions"),
+            search_db=with_collection_concerns(db=search_db, collection="discussions")
+        ),
+        comment_repository=MotorCommentRepository(db=with_collection_concerns(db=db, collection="comments")),
+        like_repository=MotorLikeRepository(db=with_collection_concerns(db=db, collection="likes")),
+        following_repository=MotorFollowingRepository(
+            db=with_collection_concerns(db=db, collection="followings")
+        ),
+        revocation_list=create_revocation_list(
+            revocations=MotorRevocationRepository(db=with_collection_concerns(db=db, collection="token_revocations"))
+        ),
+        rate_limit_repository=(
+            MotorRateLimitRepository(db=with_collection_concerns(db=db, collection="rate_limits"))
+            if RATE_LIMIT_BACKEND == "mongo" else InMemoryRateLimitRepository()
+        ),
+        notification_hub=NotificationHub(
+            notifications=(
+                MotorNotificationRepository(
+                    db=with_collection_concerns(db=db, collection="notifications"),
+                    capped_size_bytes=NOTIFICATIONS_CAPPED_SIZE_BYTES
+                )
+                if NOTIFICATIONS_BACKEND == "mongo" else InMemoryNotificationRepository()
+            ),
+            queue_size=NOTIFICATIONS_QUEUE_SIZE
+        ),
+        file_storage=file_storage,
+        password_hasher=password_hasher,
+        token_generator=token_generator
+    )
+
+def create_revocation_list(revocations: AbstractRevocationRepository) -> RevocationList:
+    # A revocation is only needed until the newest token it revokes has expired.
+    return RevocationList(revocations=revocations, retention=datetime.timedelta(days=JWT_VALIDITY_DAYS))
+
+def close_resources(resources: Resources) -> None:
+    if resources.client is not None:
+        resources.client.close()
@@ -0,0 +1,131 @@
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.compression import ENCODERS, Encoder, StreamEncoder, negotiate_encoding
+from src.utils.etag import decoded_etag, encoded_etag
+
+
+
+# Media types worth compressing besides text/*. Images on the static mount are already compressed.
+COMPRESSIBLE_MEDIA_TYPES: frozenset[str] = frozenset({
+    "application/json", "application/x-ndjson", "application/problem+json", "application/javascript",
+    "application/xml", "image/svg+xml"
+})
+# (level for bodies below the large body size, level for larger bodies and streams) of each coding.
+ENCODING_LEVELS: dict[str, tuple[int, int]] = {
+    "gzip": (6, 4),
+    "br": (5, 4),
+    "zstd": (6, 3)
+}
+
+
+
+# Small bodies are sent as they are, large ones are compressed in a worker thread and streams are flushed
+# chunk by chunk.
+class CompressionMiddleware:
+
+    def __init__(self, app: ASGIApp, encodings: list[str], minimum_size: int, large_body_size: int):
+        self.app: ASGIApp = app
+        unknown_encodings: list[str] = [encoding for encoding in encodings if encoding not in ENCODERS]
+        if unknown_encodings:
+            raise ValueError(
+                f"COMPRESSION_ENCODINGS may only list {', '.join(ENCODERS)}, not {', '.join(unknown_encodings)}"
+            )
+        self.__encodings: list[str] = encodings
+        self.__minimum_size: int = minimum_size
+        self.__large_body_size: int = large_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding: str|None = negotiate_encoding(
+            accept_encoding=Headers(scope=scope).get("accept-encoding", ""),
+            encodings=self.__encodings
+        )
+        # Routes compare If-None-Match with the ETags they set, so encoded ETags are mapped back to those.
+        encoded_etags: dict[str, str] = dict()
+        if_none_match_header: str|None = Headers(scope=scope).get("if-none-match")
+        if if_none_match_header is not None:
+            tags: list[str] = list()
+            for tag in (tag.strip() for tag in if_none_match_header.split(",")):
+                etag: str|None = decoded_etag(etag=tag, encodings=list(ENCODERS))
+                if etag is not None:
+                    encoded_etags.setdefault(etag.removeprefix("W/"), tag.removeprefix("W/"))
+                    tag = etag
+                tags.append(tag)
+            if encoded_etags:
+                scope = {
+                    **scope,
+                    "headers": [(name, value) for name, value in scope["headers"] if name != b"if-none-match"]
+                    + [(b"if-none-match", ", ".join(tags).encode("latin-1"))]
+                }
+        start_message: Message|None = None
+        stream_encoder: StreamEncoder|None = None
+        passthrough: bool = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, stream_encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers: MutableHeaders = MutableHeaders(scope=message)
+                media_type: str = headers.get("content-type", "").partition(";")[0].strip().lower()
+                compressible: bool = media_type.startswith("text/") or media_type in COMPRESSIBLE_MEDIA_TYPES
+                if compressible or message["status"] == 304:
+                    headers.add_vary_header("Accept-Encoding")
+                etag: str|None = headers.get("etag")
+                if message["status"] == 304 and etag in encoded_etags:
+                    # The client revalidated an encoded representation, so the 304 repeats its ETag.
+                    headers["etag"] = encoded_etags[etag]
+                if (
+                    encoding is None
+                    or not compressible
+                    or "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if stream_encoder is not None:
+                compressed_body: bytes = stream_encoder.compress(data=body)
+                if not more_body:
+                    compressed_body += stream_encoder.finish()
+                await send({"type": "http.response.body", "body": compressed_body, "more_body": more_body})
+                return
+            encoder: Encoder = ENCODERS[encoding]
+            small_body_level, large_body_level = ENCODING_LEVELS[encoding]
+            headers = MutableHeaders(scope=start_message)
+            if more_body:
+                stream_encoder = encoder.stream(level=large_body_level)
+                compressed_body = stream_encoder.compress(data=body)
+                del headers["content-length"]
+            else:
+                if len(body) < self.__minimum_size:
+                    await send(start_message)
+                    await send(message)
+                    return
+                if len(body) >= self.__large_body_size:
+                    compressed_body = await anyio.to_thread.run_sync(encoder.compress, body, large_body_level)
+                else:
+                    compressed_body = encoder.compress(data=body, level=small_body_level)
+                if len(compressed_body) >= len(body):
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers["content-length"] = str(len(compressed_body))
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                # The encoded body is a different representation, so it needs an ETag of its own.
+                headers["etag"] = encoded_etag(etag=etag, encoding=encoding)
+            headers["content-encoding"] = encoding
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed_body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,87 @@
+import enum
+import time
+
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.middleware.metrics import route_template
+from src.utils.concurrency import ConcurrencyLimiter
+from src.utils.metrics import http_concurrency_limit, http_requests_shed_total
+
+
+
+class Priority(enum.Enum):
+
+    # Shed first: admitted only while the in-flight requests are below the read share of the limit.
+    READ = "read"
+    WRITE = "write"
+    # Admitted against their own, smaller budget because Argon2 keeps a worker thread's CPU busy for every request.
+    PASSWORD_HASHING = "password_hashing"
+    # Never shed, so that the service can still be observed while it is overloaded.
+    EXEMPT = "exempt"
+
+# Routes whose priority does not follow from their method: GET requests are reads, everything else a write.
+ROUTE_PRIORITIES: dict[tuple[str, str], Priority] = {
+    ("POST", "/discussion/search"): Priority.READ,
+    ("POST", "/discussion/search/tags"): Priority.READ,
+    ("POST", "/auth/login"): Priority.PASSWORD_HASHING,
+    ("POST", "/auth/signup"): Priority.PASSWORD_HASHING,
+    ("GET", "/metrics"): Priority.EXEMPT,
+    ("GET", "/admin/slow-queries"): Priority.EXEMPT,
+    ("GET", "/admin/event-loop-stalls"): Priority.EXEMPT
+}
+
+
+
+# Requests over the limit are rejected at once with 503 and Retry-After, never queued.
+class ConcurrencyLimitMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: list[BaseRoute],
+        limiter: ConcurrencyLimiter,
+        password_hashing_limiter: ConcurrencyLimiter,
+        read_share: float,
+        retry_after_seconds: int
+    ):
+        self.app: ASGIApp = app
+        self.routes: list[BaseRoute] = routes
+        self.__limiter: ConcurrencyLimiter = limiter
+        self.__password_hashing_limiter: ConcurrencyLimiter = password_hashing_limiter
+        self.__read_share: float = read_share
+        self.__retry_after_seconds: int = retry_after_seconds
+        self.__limit_gauge = http_concurrency_limit.labels(limiter="requests")
+        http_concurrency_limit.labels(limiter="password_hashing").set(password_hashing_limiter.limit)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route: str = route_template(routes=self.routes, scope=scope)
+        priority: Priority = ROUTE_PRIORITIES.get(
+            (scope["method"], route),
+            Priority.READ if scope["method"] in ("GET", "HEAD") else Priority.WRITE
+        )
+        if priority == Priority.EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        limiter: ConcurrencyLimiter = (
+            self.__password_hashing_limiter if priority == Priority.PASSWORD_HASHING else self.__limiter
+        )
+        if not limiter.try_acquire(share=self.__read_share if priority == Priority.READ else 1.0):
+            http_requests_shed_total.labels(route=route, priority=priority.value).inc()
+            response: JSONResponse = JSONResponse(
+                content={"detail": "the server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.__retry_after_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+        start: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(started=start, latency_seconds=time.perf_counter() - start)
+            self.__limit_gauge.set(self.__limiter.limit)
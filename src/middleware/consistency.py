@@ -0,0 +1,77 @@
+from typing import Any, Mapping
+import hashlib
+import hmac
+
+from bson.timestamp import Timestamp
+from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.models.common import current_session
+from src.utils.consistency import caller_digest, create_consistency_token, read_consistency_token
+
+
+
+CONSISTENCY_TOKEN_HEADER: bytes = b"x-consistency-token"
+AUTHORIZATION_HEADER: bytes = b"authorization"
+
+
+
+# Writes, and reads that send an X-Consistency-Token, run in a causally consistent session. Responses carry
+# a fresh token so that the client's next reads see its own writes.
+class CausalConsistencyMiddleware:
+
+    def __init__(self, app: ASGIApp, secret: str, validity_seconds: int):
+        self.app: ASGIApp = app
+        self.__key: bytes = hmac.new(key=secret.encode(), msg=b"consistency-token", digestmod=hashlib.sha256).digest()
+        self.__validity_seconds: int = validity_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        client: AsyncIOMotorClient|None = (
+            scope["app"].state.resources.client if scope["type"] == "http" else None
+        )
+        if client is None:
+            await self.app(scope, receive, send)
+            return
+        token: str|None = None
+        authorization: bytes|None = None
+        for name, value in scope["headers"]:
+            if name == CONSISTENCY_TOKEN_HEADER:
+                token = value.decode("latin-1")
+            elif name == AUTHORIZATION_HEADER:
+                authorization = value
+        caller: bytes = caller_digest(authorization=authorization)
+        times: tuple[Timestamp, Mapping[str, Any]]|None = (
+            None if token is None else read_consistency_token(token=token, caller=caller, key=self.__key)
+        )
+        if times is None and scope["method"] in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        async with await client.start_session(causal_consistency=True) as session:
+            if times is not None:
+                session.advance_operation_time(times[0])
+                session.advance_cluster_time(times[1])
+
+            async def send_wrapper(message: Message) -> None:
+                if (
+                    message["type"] == "http.response.start"
+                    and session.operation_time is not None
+                    and session.cluster_time is not None
+                    and (times is None or session.operation_time != times[0])
+                ):
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (CONSISTENCY_TOKEN_HEADER, create_consistency_token(
+                            operation_time=session.operation_time,
+                            cluster_time=session.cluster_time,
+                            caller=caller,
+                            key=self.__key,
+                            validity_seconds=self.__validity_seconds
+                        ).encode("latin-1"))
+                    ]
+                await send(message)
+
+            session_token = current_session.set(session)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                current_session.reset(session_token)
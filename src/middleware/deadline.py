@@ -0,0 +1,65 @@
+import logging
+
+import anyio
+import pymongo
+from pymongo.errors import PyMongoError
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.middleware.metrics import route_template
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Latency budgets of the routes that should not use the default budget, in milliseconds.
+ROUTE_BUDGETS_MS: dict[tuple[str, str], float] = {
+    ("POST", "/discussion/search"): 2000,
+    ("POST", "/discussion/search/tags"): 2000,
+    ("GET", "/user/search/{full_name}"): 2000,
+    # Image uploads are written to the file storage before the discussion is saved.
+    ("POST", "/discussion/"): 10000,
+    ("PATCH", "/discussion/{discussion_id}"): 10000
+}
+
+
+
+# MongoDB commands get a maxTimeMS from the time left; a request past its deadline is cancelled with 504.
+class DeadlineMiddleware:
+
+    def __init__(self, app: ASGIApp, routes: list[BaseRoute], default_budget_ms: float):
+        self.app: ASGIApp = app
+        self.routes: list[BaseRoute] = routes
+        self.__default_budget_ms: float = default_budget_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route: str = route_template(routes=self.routes, scope=scope)
+        budget_seconds: float = ROUTE_BUDGETS_MS.get((scope["method"], route), self.__default_budget_ms) / 1000
+        response_started: bool = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            with pymongo.timeout(budget_seconds):
+                with anyio.fail_after(budget_seconds):
+                    await self.app(scope, receive, send_wrapper)
+        except (TimeoutError, PyMongoError) as e:
+            if isinstance(e, PyMongoError) and not e.timeout:
+                raise
+            if response_started:
+                # The status line is already sent, so the client only sees the response being cut short.
+                logger.warning("%s %s exceeded its deadline while sending the response", scope["method"], route)
+                raise
+            response: JSONResponse = JSONResponse(
+                content={"detail": "the request did not complete within its time budget"},
+                status_code=504
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,57 @@
+import time
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.metrics import http_request_duration_seconds, http_requests_in_flight
+
+
+
+UNMATCHED_ROUTE: str = "<unmatched>"
+
+
+
+class MetricsMiddleware:
+
+    def __init__(self, app: ASGIApp, routes: list[BaseRoute]):
+        self.app: ASGIApp = app
+        self.routes: list[BaseRoute] = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route: str = route_template(routes=self.routes, scope=scope)
+        method: str = scope["method"]
+        status_code: int = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels(route=route, method=method)
+        in_flight.inc()
+        start: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            http_request_duration_seconds.labels(
+                route=route,
+                method=method,
+                status=status_code
+            ).observe(time.perf_counter() - start)
+
+
+
+def route_template(routes: list[BaseRoute], scope: Scope) -> str:
+    partial_match: str|None = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial_match is None:
+            partial_match = getattr(route, "path", UNMATCHED_ROUTE)
+    return partial_match or UNMATCHED_ROUTE
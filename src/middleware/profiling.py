@@ -0,0 +1,92 @@
+import cProfile
+import hashlib
+import hmac
+import os
+import pstats
+import random
+import re
+import time
+
+import anyio
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+
+PROFILE_HEADER: bytes = b"x-debug-profile"
+
+
+
+# cProfile sees every coroutine on the event loop, so only one request is profiled at a time, best effort.
+class ProfilingMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        sample_rate: float,
+        max_files: int,
+        secret: str|None = None
+    ):
+        self.app: ASGIApp = app
+        self.__directory: str = directory
+        self.__sample_rate: float = sample_rate
+        self.__max_files: int = max_files
+        self.__secret: str|None = secret
+        self.__profiling: bool = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.__profiling or not self.__should_profile(scope=scope):
+            await self.app(scope, receive, send)
+            return
+        self.__profiling = True
+        profiler: cProfile.Profile = cProfile.Profile()
+        start: float = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            latency_ms: float = (time.perf_counter() - start) * 1000
+            self.__profiling = False
+            route = scope.get("route")
+            file_name: str = "{}_{}_{}_{}ms.prof".format(
+                int(time.time() * 1000),
+                scope["method"],
+                _slugify(getattr(route, "name", None) or scope["path"]),
+                int(latency_ms)
+            )
+            await anyio.to_thread.run_sync(self.__write_profile, profiler, file_name)
+
+    def __should_profile(self, scope: Scope) -> bool:
+        if self.__secret is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return verify_profiling_header(value=value.decode("latin-1"), secret=self.__secret)
+        return self.__sample_rate > 0 and random.random() < self.__sample_rate
+
+    def __write_profile(self, profiler: cProfile.Profile, file_name: str) -> None:
+        os.makedirs(self.__directory, exist_ok=True)
+        pstats.Stats(profiler).dump_stats(os.path.join(self.__directory, file_name))
+        profiles: list[str] = sorted(
+            name for name in os.listdir(self.__directory) if name.endswith(".prof")
+        )
+        for stale_profile in profiles[:max(0, len(profiles) - self.__max_files)]:
+            os.remove(os.path.join(self.__directory, stale_profile))
+
+
+
+def create_profiling_header(secret: str, validity_seconds: int = 300) -> str:
+    expires: str = str(int(time.time()) + validity_seconds)
+    return f"{expires}.{_sign(message=expires, secret=secret)}"
+
+def verify_profiling_header(value: str, secret: str) -> bool:
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(message=expires, secret=secret))
+
+def _sign(message: str, secret: str) -> str:
+    return hmac.new(key=secret.encode(), msg=message.encode(), digestmod=hashlib.sha256).hexdigest()
+
+def _slugify(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-") or "root"
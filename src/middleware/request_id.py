@@ -0,0 +1,41 @@
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.log import request_id
+
+
+
+REQUEST_ID_HEADER: bytes = b"x-request-id"
+
+
+
+class RequestIdMiddleware:
+
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        current_request_id: str = uuid4().hex
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                current_request_id = value.decode("latin-1")[:128]
+                break
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (REQUEST_ID_HEADER, current_request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = request_id.set(current_request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,58 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.tracing import Span, Tracer, current_span
+
+
+
+TRACEPARENT_HEADER: bytes = b"traceparent"
+
+
+
+class TracingMiddleware:
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app: ASGIApp = app
+        self.tracer: Tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent: str|None = None
+        for name, value in scope["headers"]:
+            if name == TRACEPARENT_HEADER:
+                traceparent = value.decode("latin-1")
+                break
+        span: Span = self.tracer.start_span(
+            name=f"{scope['method']} {scope['path']}",
+            attributes={
+                "http.method": scope["method"],
+                "http.target": scope["path"]
+            },
+            traceparent=traceparent
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = "ERROR"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (TRACEPARENT_HEADER, span.traceparent().encode("latin-1"))
+                ]
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_error(error=e)
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
+            self.tracer.end_span(span=span)
@@ -1,3 +1,4 @@
+from typing import Any, Collection, Mapping
 import dataclasses
 
 from bson import ObjectId
@@ -5,12 +6,12 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
 from typing_extensions import Self
 
-from src.models.common import ResourceNotFound
+from src.models.common import current_session, find_by_ids, ResourceNotFound, PartialModel, query_site
 
 
 
-@dataclasses.dataclass
-class DBComment:
+@dataclasses.dataclass(slots=True)
+class DBComment(PartialModel):
 
     _id: ObjectId
     discussion_id: ObjectId
@@ -19,27 +20,46 @@ class DBComment:
     parent_comment_id: ObjectId|None = None
 
     @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            discussion_id=document["discussion_id"],
+            user_id=document["user_id"],
+            text=document["text"],
+            parent_comment_id=document["parent_comment_id"]
+        )
+
+    @classmethod
+    @query_site
     async def get_comment_by_id(
         cls,
         comment_id: ObjectId,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> Self|None:
         comment: dict|None = await db["comments"].find_one(
             filter={
                 "_id": comment_id
-            }
+            },
+            projection=cls.projection(fields=fields),
+            session=current_session.get()
         )
         if comment is not None:
-            return cls(
-                _id=comment["_id"],
-                discussion_id=comment["discussion_id"],
-                user_id=comment["user_id"],
-                text=comment["text"],
-                parent_comment_id=comment["parent_comment_id"]
-            )
+            return cls.hydrate(document=comment, fields=fields)
         return None
 
     @classmethod
+    @query_site
+    async def get_comments_by_ids(
+        cls,
+        ids: list[ObjectId],
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
+    ) -> list[Self|None]:
+        return await find_by_ids(model=cls, collection=db["comments"], ids=ids, fields=fields)
+
+    @classmethod
+    @query_site
     async def add_comment(
         cls,
         db: AsyncIOMotorDatabase,
@@ -54,7 +74,8 @@ class DBComment:
                 "user_id": user_id,
                 "text": text,
                 "parent_comment_id": parent_comment_id
-            }
+            },
+            session=current_session.get()
         )
         return cls(
             _id=new_comment.inserted_id,
@@ -64,6 +85,7 @@ class DBComment:
             parent_comment_id=parent_comment_id
         )
 
+    @query_site
     async def update_comment(
         self,
         db: AsyncIOMotorDatabase,
@@ -78,13 +100,15 @@ class DBComment:
                     "text": text
                 }
             },
-            return_document=ReturnDocument.AFTER
+            return_document=ReturnDocument.AFTER,
+            session=current_session.get()
         )
         if updated_comment is None:
             raise ResourceNotFound()
         self.text = updated_comment["text"]
         return None
 
+    @query_site
     async def delete_comment(
         self,
         db: AsyncIOMotorDatabase
@@ -92,6 +116,7 @@ class DBComment:
         await db["comments"].delete_one(
             filter={
                 "_id": self._id
-            }
+            },
+            session=current_session.get()
         )
         return None
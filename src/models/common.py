@@ -1,3 +1,30 @@
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Collection, Mapping, Sequence, TypeVar
+import dataclasses
+import functools
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from typing_extensions import Self
+
+
+
+current_query_site: ContextVar[str|None] = ContextVar("current_query_site", default=None)
+# The causally consistent session of the current request, passed to every query when set.
+current_session: ContextVar[AsyncIOMotorClientSession|None] = ContextVar("current_session", default=None)
+
+_Return = TypeVar("_Return")
+
+# Tags the Mongo commands a model method issues with its qualified name.
+def query_site(method: Callable[..., Awaitable[_Return]]) -> Callable[..., Awaitable[_Return]]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> _Return:
+        token = current_query_site.set(method.__qualname__)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_query_site.reset(token)
+    return wrapper
 
 
 
@@ -6,3 +33,69 @@ class ResourceNotFound(Exception):
 
 class NoChangeInResource(Exception):
     pass
+
+class FieldNotLoaded(AttributeError):
+
+    def __init__(self, model: str, field: str):
+        super().__init__(f"'{model}.{field}' was not loaded by the query's projection")
+
+
+
+# Fields left out of a projection stay unset, and reading one raises FieldNotLoaded.
+class PartialModel:
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        if name in type(self).__dataclass_fields__:
+            raise FieldNotLoaded(model=type(self).__name__, field=name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @classmethod
+    def projection(cls, fields: Collection[str]|None) -> dict[str, Any]|None:
+        if fields is None:
+            return None
+        unknown_fields: set[str] = set(fields) - cls.__dataclass_fields__.keys()
+        if unknown_fields:
+            raise ValueError(f"{cls.__name__} has no fields {sorted(unknown_fields)}")
+        return {
+            "_id": 1,
+            **{field: 1 for field in fields}
+        }
+
+    @classmethod
+    def hydrate(cls, document: Mapping[str, Any], fields: Collection[str]|None) -> Self:
+        if fields is None:
+            return cls.from_document(document=document)
+        instance: Self = object.__new__(cls)
+        for field in ("_id", *fields):
+            if field in document:
+                setattr(instance, field, document[field])
+            elif cls.__dataclass_fields__[field].default is not dataclasses.MISSING:
+                setattr(instance, field, cls.__dataclass_fields__[field].default)
+        return instance
+
+
+
+_Model = TypeVar("_Model", bound=PartialModel)
+
+# In the order of `ids`, with None for every id that was not found.
+async def find_by_ids(
+    model: type[_Model],
+    collection: AsyncIOMotorCollection,
+    ids: Sequence[ObjectId],
+    fields: Collection[str]|None
+) -> list[_Model|None]:
+    documents: list[dict] = await collection.find(
+        filter={
+            "_id": {
+                "$in": list(dict.fromkeys(ids))
+            }
+        },
+        projection=model.projection(fields=fields),
+        session=current_session.get()
+    ).to_list(length=None)
+    models: dict[ObjectId, _Model] = {
+        document["_id"]: model.hydrate(document=document, fields=fields) for document in documents
+    }
+    return [models.get(_id) for _id in ids]
@@ -1,6 +1,7 @@
 import dataclasses
-from typing import Any
+from typing import Any, Collection, Mapping
 import datetime
+import logging
 
 from bson import ObjectId
 from motor.motor_asyncio import (
@@ -10,12 +11,18 @@ from motor.motor_asyncio import (
 from pymongo import ReturnDocument
 from typing_extensions import Self
 
-from src.models.common import NoChangeInResource, ResourceNotFound
+from src.models.common import (
+    current_session, find_by_ids, NoChangeInResource, ResourceNotFound, PartialModel, query_site
+)
+
+
 
+logger: logging.Logger = logging.getLogger(__name__)
 
 
-@dataclasses.dataclass
-class DBDiscussion:
+
+@dataclasses.dataclass(slots=True)
+class DBDiscussion(PartialModel):
 
     _id: ObjectId
     user_id: ObjectId
@@ -23,34 +30,72 @@ class DBDiscussion:
     tags: list[str]
     created_on: datetime.datetime
     image_link: str|None = None
+    # Incremented by every update; the single-discussion endpoint's ETag is derived from it.
+    version: int = 0
     
     def __post_init__(self) -> None:
         if self.created_on.tzinfo != datetime.timezone.utc:
             raise ValueError("'creation_date_utc' must have UTC as its timezone")
 
     @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            user_id=document["user_id"],
+            text=document["text"],
+            tags=document["tags"],
+            created_on=document["created_on"],
+            image_link=document["image_link"],
+            version=document.get("version", 0)
+        )
+
+    @classmethod
+    def search_projection(
+        cls,
+        fields: Collection[str]|None,
+        text_preview_length: int|None
+    ) -> dict[str, Any]|None:
+        if text_preview_length is None:
+            return cls.projection(fields=fields)
+        # The preview is cut on the server so the full text never leaves the database.
+        return {
+            **cls.projection(fields=fields if fields is not None else cls.__dataclass_fields__.keys()),
+            "text": {
+                "$substrCP": ["$text", 0, text_preview_length]
+            }
+        }
+
+    @classmethod
+    @query_site
     async def get_discussion_by_id(
         cls,
         _id: str,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> Self|None:
         discussion: dict|None = await db["discussions"].find_one(
             filter={
                 "_id": ObjectId(_id)
-            }
+            },
+            projection=cls.projection(fields=fields),
+            session=current_session.get()
         )
         if discussion is not None:
-            return cls(
-                _id=discussion["_id"],
-                user_id=discussion["user_id"],
-                text=discussion["text"],
-                tags=discussion["tags"],
-                created_on=discussion["created_on"].astimezone(tz=datetime.timezone.utc),
-                image_link=discussion["image_link"]
-            )
+            return cls.hydrate(document=discussion, fields=fields)
         return None
 
     @classmethod
+    @query_site
+    async def get_discussions_by_ids(
+        cls,
+        ids: list[ObjectId],
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
+    ) -> list[Self|None]:
+        return await find_by_ids(model=cls, collection=db["discussions"], ids=ids, fields=fields)
+
+    @classmethod
+    @query_site
     async def create_discussion(
         cls,
         user_id: ObjectId,
@@ -66,8 +111,10 @@ class DBDiscussion:
                 "text": text,
                 "tags": tags,
                 "image_link": image_link,
-                "created_on": created_on
-            }
+                "created_on": created_on,
+                "version": 0
+            },
+            session=current_session.get()
         )
         return cls(
             _id=inserted_discussion.inserted_id,
@@ -79,13 +126,20 @@ class DBDiscussion:
         )
 
     @classmethod
+    @query_site
     async def search_discussions_based_on_text(
         cls,
         search_term: str,
         skip: int,
         limit: int,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
     ) -> list[Self]:
+        projection: dict[str, Any]|None = cls.search_projection(
+            fields=fields,
+            text_preview_length=text_preview_length
+        )
         search_results: AsyncIOMotorCommandCursor = db["discussions"].aggregate(
             pipeline=[
                 {
@@ -102,52 +156,43 @@ class DBDiscussion:
                 },
                 {
                     "$limit": limit
-                }
-            ]
+                },
+                *([{"$project": projection}] if projection is not None else [])
+            ],
+            session=current_session.get()
         )
-        discussions: list[Self] = list()
-        for doc in await search_results.to_list(length=None):
-            discussions.append(
-                cls(
-                    _id=doc["_id"],
-                    user_id=doc["user_id"],
-                    text=doc["text"],
-                    tags=doc["tags"],
-                    created_on=doc["created_on"].astimezone(tz=datetime.timezone.utc),
-                    image_link=doc["image_link"]
-                )
-            )
-        return discussions
+        return [
+            cls.hydrate(document=doc, fields=fields) for doc in await search_results.to_list(length=None)
+        ]
 
     @classmethod
+    @query_site
     async def search_discussions_based_on_tags(
         cls,
         search_tags: list[str],
         skip: int,
         limit: int,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
     ) -> list[Self]:
         search_results: AsyncIOMotorCursor = db["discussions"].find(
             filter={
                 "tags": {
                     "$all": search_tags
                 }
-            }
+            },
+            projection=cls.search_projection(
+                fields=fields,
+                text_preview_length=text_preview_length
+            ),
+            session=current_session.get()
         ).skip(skip=skip).limit(limit=limit)
-        discussions: list[Self] = list()
-        async for doc in search_results:
-            discussions.append(
-                cls(
-                    _id=doc["_id"],
-                    user_id=doc["user_id"],
-                    text=doc["text"],
-                    tags=doc["tags"],
-                    created_on=doc["created_on"].astimezone(tz=datetime.timezone.utc),
-                    image_link=doc["image_link"]
-                )
-            )
-        return discussions
+        return [
+            cls.hydrate(document=doc, fields=fields) for doc in await search_results.to_list(length=None)
+        ]
 
+    @query_site
     async def update_discussion(
         self,
         db: AsyncIOMotorDatabase,
@@ -162,7 +207,7 @@ class DBDiscussion:
             update_dict["tags"] = tags
         if image_link is not None:
             update_dict["image_link"] = image_link
-        print(update_dict)
+        logger.debug("updating discussion %s with %s", self._id, update_dict)
         if not update_dict:
             raise NoChangeInResource()
         updated_discussion: dict|None = await db["discussions"].find_one_and_update(
@@ -170,17 +215,23 @@ class DBDiscussion:
                 "_id": self._id
             },
             update={
-                "$set": update_dict
+                "$set": update_dict,
+                "$inc": {
+                    "version": 1
+                }
             },
-            return_document=ReturnDocument.AFTER
+            return_document=ReturnDocument.AFTER,
+            session=current_session.get()
         )
         if updated_discussion is not None:
             self.text = updated_discussion["text"]
             self.tags = updated_discussion["tags"]
             self.image_link = updated_discussion["image_link"]
+            self.version = updated_discussion["version"]
         else:
             ResourceNotFound()
 
+    @query_site
     async def delete_discussion(
         self,
         db: AsyncIOMotorDatabase
@@ -188,6 +239,7 @@ class DBDiscussion:
         await db["discussions"].delete_one(
             filter={
                 "_id": self._id
-            }
+            },
+            session=current_session.get()
         )
         return None
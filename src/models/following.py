@@ -1,3 +1,4 @@
+from typing import Any, Collection, Mapping
 import dataclasses
 
 from bson import ObjectId
@@ -5,35 +6,46 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo.errors import DuplicateKeyError
 from typing_extensions import Self
 
+from src.models.common import current_session, PartialModel, query_site
 
 
-@dataclasses.dataclass
-class DBFollowing:
+
+@dataclasses.dataclass(slots=True)
+class DBFollowing(PartialModel):
 
     _id: ObjectId
     follower_id: ObjectId
     followee_id: ObjectId
 
     @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            follower_id=document["follower_id"],
+            followee_id=document["followee_id"]
+        )
+
+    @classmethod
+    @query_site
     async def get_following_by_id(
         cls,
         following_id: ObjectId,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> Self|None:
         following: dict|None = await db["followings"].find_one(
             filter={
                 "_id": following_id
-            }
+            },
+            projection=cls.projection(fields=fields),
+            session=current_session.get()
         )
         if following is not None:
-            return cls(
-                _id=following["_id"],
-                follower_id=following["follower_id"],
-                followee_id=following["followee_id"]
-            )
+            return cls.hydrate(document=following, fields=fields)
         return None
 
     @classmethod
+    @query_site
     async def create_following(
         cls,
         db: AsyncIOMotorDatabase,
@@ -45,7 +57,8 @@ class DBFollowing:
                 document={
                     "followee_id": followee_id,
                     "follower_id": follower_id
-                }
+                },
+                session=current_session.get()
             )
         except DuplicateKeyError:
             raise FollowingAlreadyExists()
@@ -56,6 +69,7 @@ class DBFollowing:
                 follower_id=follower_id
             )
 
+    @query_site
     async def delete_following(
         self,
         db: AsyncIOMotorDatabase
@@ -63,7 +77,8 @@ class DBFollowing:
         await db["followings"].delete_one(
             filter={
                 "_id": self._id
-            }
+            },
+            session=current_session.get()
         )
         return None
 
@@ -1,3 +1,4 @@
+from typing import Any, Collection, Mapping
 import dataclasses
 
 from bson import ObjectId
@@ -5,12 +6,12 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo.errors import DuplicateKeyError
 from typing_extensions import Self
 
-from src.models.common import ResourceNotFound
+from src.models.common import current_session, ResourceNotFound, PartialModel, query_site
 
 
 
-@dataclasses.dataclass
-class DBLike:
+@dataclasses.dataclass(slots=True)
+class DBLike(PartialModel):
 
     _id: ObjectId
     context: str
@@ -18,26 +19,35 @@ class DBLike:
     user_id: ObjectId
 
     @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            context=document["context"],
+            context_id=document["context_id"],
+            user_id=document["user_id"]
+        )
+
+    @classmethod
+    @query_site
     async def get_like(
         cls,
         _id:ObjectId,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> Self|None:
         like: dict|None = await db["likes"].find_one(
             filter={
                 "_id": _id
-            }
+            },
+            projection=cls.projection(fields=fields),
+            session=current_session.get()
         )
         if like is not None:
-            return cls(
-                _id=like["_id"],
-                context=like["context"],
-                context_id=like["context_id"],
-                user_id=like["user_id"]
-            )
+            return cls.hydrate(document=like, fields=fields)
         return None
 
     @classmethod
+    @query_site
     async def add_like(
         cls,
         db: AsyncIOMotorDatabase,
@@ -51,7 +61,8 @@ class DBLike:
                     "context": context,
                     "context_id": context_id,
                     "user_id": user_id
-                }
+                },
+                session=current_session.get()
             )
         except DuplicateKeyError:
             raise LikeAlreadyExists()
@@ -62,6 +73,7 @@ class DBLike:
             user_id=user_id
         )
 
+    @query_site
     async def delete_like(
         self,
         db: AsyncIOMotorDatabase
@@ -69,7 +81,8 @@ class DBLike:
         await db["likes"].delete_one(
             filter={
                 "_id": self._id
-            }
+            },
+            session=current_session.get()
         )
         return None
 
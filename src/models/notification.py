@@ -0,0 +1,70 @@
+from typing import Any, Mapping
+import dataclasses
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCursor, AsyncIOMotorDatabase
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from typing_extensions import Self
+
+from src.models.common import current_session, PartialModel, query_site
+
+
+
+@dataclasses.dataclass(slots=True)
+class DBNotification(PartialModel):
+
+    _id: ObjectId
+    recipient_id: ObjectId
+    payload: dict[str, Any]
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            recipient_id=document["recipient_id"],
+            payload=document["payload"]
+        )
+
+    @classmethod
+    async def create_capped_collection(cls, size_bytes: int, db: AsyncIOMotorDatabase) -> None:
+        # Tailable cursors need a capped collection; the oldest notifications are overwritten once it is full.
+        try:
+            await db.create_collection("notifications", capped=True, size=size_bytes)
+        except CollectionInvalid:
+            pass
+
+    @classmethod
+    @query_site
+    async def publish_notifications(
+        cls,
+        recipient_ids: list[ObjectId],
+        payload: dict[str, Any],
+        db: AsyncIOMotorDatabase
+    ) -> None:
+        await db["notifications"].insert_many(
+            documents=[
+                {
+                    "recipient_id": recipient_id,
+                    "payload": payload
+                } for recipient_id in recipient_ids
+            ],
+            session=current_session.get()
+        )
+
+    @classmethod
+    @query_site
+    async def get_latest_notification_id(cls, db: AsyncIOMotorDatabase) -> ObjectId|None:
+        notification: dict|None = await db["notifications"].find_one(
+            filter={},
+            projection={"_id": 1},
+            sort=[("$natural", -1)]
+        )
+        return notification["_id"] if notification is not None else None
+
+    @classmethod
+    def tail_notifications(cls, after: ObjectId|None, db: AsyncIOMotorDatabase) -> AsyncIOMotorCursor:
+        return db["notifications"].find(
+            filter={"_id": {"$gt": after}} if after is not None else {},
+            cursor_type=CursorType.TAILABLE_AWAIT
+        )
@@ -0,0 +1,88 @@
+from typing import Any, Mapping
+import dataclasses
+import datetime
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from typing_extensions import Self
+
+from src.models.common import current_session, PartialModel, query_site
+
+
+
+# Refilled on the database server's clock, so that every worker agrees.
+@dataclasses.dataclass(slots=True)
+class DBRateLimitBucket(PartialModel):
+
+    _id: str
+    tokens: float
+    taken: bool
+    updated_on: datetime.datetime
+    expires_on: datetime.datetime
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            tokens=document["tokens"],
+            taken=document["taken"],
+            updated_on=document["updated_on"],
+            expires_on=document["expires_on"]
+        )
+
+    @classmethod
+    @query_site
+    async def take_token(
+        cls,
+        key: str,
+        rate_per_second: float,
+        burst: int,
+        db: AsyncIOMotorDatabase
+    ) -> Self:
+        refilled_tokens: dict[str, Any] = {
+            "$min": [
+                burst,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {
+                            "$multiply": [
+                                {"$subtract": ["$$NOW", {"$ifNull": ["$updated_on", "$$NOW"]}]},
+                                rate_per_second / 1000
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
+        bucket: dict = await db["rate_limits"].find_one_and_update(
+            filter={
+                "_id": key
+            },
+            update=[
+                {
+                    "$set": {
+                        "tokens": refilled_tokens,
+                        "updated_on": "$$NOW"
+                    }
+                },
+                {
+                    "$set": {
+                        "taken": {"$gte": ["$tokens", 1]},
+                        "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]}
+                    }
+                },
+                {
+                    # A TTL index on expires_on removes the bucket once it would be full again.
+                    "$set": {
+                        "expires_on": {
+                            "$add": ["$$NOW", {"$multiply": [{"$subtract": [burst, "$tokens"]}, 1000 / rate_per_second]}]
+                        }
+                    }
+                }
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            session=current_session.get()
+        )
+        return cls.from_document(document=bucket)
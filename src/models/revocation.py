@@ -0,0 +1,69 @@
+from typing import Any, Mapping
+import dataclasses
+import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing_extensions import Self
+
+from src.models.common import current_session, PartialModel, query_site
+
+
+
+# Tokens of the user `_id` with a version below `token_version` are revoked.
+@dataclasses.dataclass(slots=True)
+class DBTokenRevocation(PartialModel):
+
+    _id: ObjectId
+    token_version: int
+    revoked_on: datetime.datetime
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            token_version=document["token_version"],
+            revoked_on=document["revoked_on"]
+        )
+
+    @classmethod
+    @query_site
+    async def revoke_tokens(
+        cls,
+        user_id: ObjectId,
+        token_version: int,
+        revoked_on: datetime.datetime,
+        db: AsyncIOMotorDatabase
+    ) -> None:
+        await db["token_revocations"].update_one(
+            filter={
+                "_id": user_id
+            },
+            update={
+                "$max": {
+                    "token_version": token_version
+                },
+                "$set": {
+                    "revoked_on": revoked_on
+                }
+            },
+            upsert=True,
+            session=current_session.get()
+        )
+
+    @classmethod
+    @query_site
+    async def get_revocations_since(
+        cls,
+        since: datetime.datetime,
+        db: AsyncIOMotorDatabase
+    ) -> list[Self]:
+        revocations: list[dict] = await db["token_revocations"].find(
+            filter={
+                "revoked_on": {
+                    "$gte": since
+                }
+            },
+            session=current_session.get()
+        ).to_list(length=None)
+        return [cls.from_document(document=revocation) for revocation in revocations]
@@ -1,3 +1,4 @@
+from typing import Any, Collection, Mapping
 import dataclasses
 
 from bson import ObjectId
@@ -7,20 +8,36 @@ from pymongo import ReturnDocument
 from typing_extensions import Self
 
 from src.schemas.user import NewUser
-from src.models.common import NoChangeInResource, ResourceNotFound
+from src.models.common import (
+    current_session, find_by_ids, NoChangeInResource, ResourceNotFound, PartialModel, query_site
+)
 
 
 
-@dataclasses.dataclass
-class DBUser:
+@dataclasses.dataclass(slots=True)
+class DBUser(PartialModel):
 
     _id: ObjectId
     full_name: str
     phone_number: str
     email: str
     pw_hash: str
+    # Embedded in the user's tokens; bumping it invalidates every token issued before.
+    token_version: int = 0
 
     @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> Self:
+        return cls(
+            _id=document["_id"],
+            full_name=document["full_name"],
+            phone_number=document["phone_number"],
+            email=document["email"],
+            pw_hash=document["pw_hash"],
+            token_version=document.get("token_version", 0)
+        )
+
+    @classmethod
+    @query_site
     async def create_new_user(
         cls,
         new_user: NewUser,
@@ -31,10 +48,12 @@ class DBUser:
             inserted_user = await db["users"].insert_one(
                 document={
                     "full_name": new_user.full_name,
-                    "phone_number": new_user.phone_number.format()[4:].replace("-", ""),
+                    "phone_number": stored_phone_number(phone_number=new_user.phone_number),
                     "email": new_user.email,
-                    "pw_hash": hashed_password
-                }
+                    "pw_hash": hashed_password,
+                    "token_version": 0
+                },
+                session=current_session.get()
             )
         except DuplicateKeyError as e:
             raise DuplicateEmailOrPhone(str(e))
@@ -48,47 +67,54 @@ class DBUser:
             )
 
     @classmethod
+    @query_site
     async def get_user_by_email(
         cls,
         email: str,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> Self|None:
         user: dict|None = await db["users"].find_one(
             filter={
                 "email": email
-            }
+            },
+            projection=cls.projection(fields=fields),
+            session=current_session.get()
         )
         if user is not None:
-            return cls(
-                _id=user["_id"],
-                full_name=user["full_name"],
-                phone_number=user["phone_number"],
-                email=user["email"],
-                pw_hash=user["pw_hash"]
-            )
+            return cls.hydrate(document=user, fields=fields)
         return None
 
     @classmethod
+    @query_site
     async def get_user_by_id(
         cls,
         _id: str,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> Self|None:
         user: dict|None = await db["users"].find_one(
             filter={
                 "_id": ObjectId(_id)
-            }
+            },
+            projection=cls.projection(fields=fields),
+            session=current_session.get()
         )
         if user is not None:
-            return cls(
-                _id=user["_id"],
-                full_name=user["full_name"],
-                phone_number=user["phone_number"],
-                email=user["email"],
-                pw_hash=user["pw_hash"]
-            )
+            return cls.hydrate(document=user, fields=fields)
         return None
 
+    @classmethod
+    @query_site
+    async def get_users_by_ids(
+        cls,
+        ids: list[ObjectId],
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
+    ) -> list[Self|None]:
+        return await find_by_ids(model=cls, collection=db["users"], ids=ids, fields=fields)
+
+    @query_site
     async def update_user(
         self,
         db: AsyncIOMotorDatabase,
@@ -108,30 +134,38 @@ class DBUser:
             update_dict["pw_hash"] = new_pw_hash
         if not update_dict:
             raise NoChangeInResource()
+        update: dict[str, Any] = {
+            "$set": update_dict
+        }
+        if new_pw_hash is not None:
+            # A password change revokes the tokens issued with the old password.
+            update["$inc"] = {"token_version": 1}
         updated_user: dict|None = await db["users"].find_one_and_update(
             filter={
                 "_id": self._id
             },
-            update={
-                "$set": update_dict
-            },
-            return_document=ReturnDocument.AFTER
+            update=update,
+            return_document=ReturnDocument.AFTER,
+            session=current_session.get()
         )
         if updated_user is not None:
             self.full_name = updated_user["full_name"]
             self.phone_number = updated_user["phone_number"]
             self.email = updated_user["email"]
             self.pw_hash = updated_user["pw_hash"]
+            self.token_version = updated_user.get("token_version", 0)
         else:
             raise ResourceNotFound()
 
     @classmethod
+    @query_site
     async def search_users_by_full_name(
         cls,
         search_term: str,
         skip: int,
         limit: int,
-        db: AsyncIOMotorDatabase
+        db: AsyncIOMotorDatabase,
+        fields: Collection[str]|None = None
     ) -> list[Self]:
         search_results: AsyncIOMotorCommandCursor = db["users"].aggregate(
             pipeline=[
@@ -149,22 +183,16 @@ class DBUser:
                 },
                 {
                     "$limit": limit
-                }
-            ]
+                },
+                *([{"$project": cls.projection(fields=fields)}] if fields is not None else [])
+            ],
+            session=current_session.get()
         )
-        users: list[Self] = list()
-        for doc in await search_results.to_list(length=None):
-            users.append(
-                cls(
-                    _id=doc["_id"],
-                    full_name=doc["full_name"],
-                    phone_number=doc["phone_number"],
-                    email=doc["email"],
-                    pw_hash=doc["pw_hash"]
-                )
-            )
-        return users
+        return [
+            cls.hydrate(document=doc, fields=fields) for doc in await search_results.to_list(length=None)
+        ]
 
+    @query_site
     async def delete_user(
         self,
         db: AsyncIOMotorDatabase
@@ -172,10 +200,14 @@ class DBUser:
         await db["users"].delete_one(
             filter={
                 "_id": self._id
-            }
+            },
+            session=current_session.get()
         )
         return None
 
+def stored_phone_number(phone_number: str) -> str:
+    return phone_number.format()[4:].replace("-", "")
+
 class DuplicateEmailOrPhone(Exception):
 
     def __init__(self, message: str):
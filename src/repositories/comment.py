@@ -0,0 +1,133 @@
+from abc import ABC, abstractmethod
+from typing import Any, Collection
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.comment import DBComment
+from src.models.common import ResourceNotFound
+from src.repositories.common import SortedIndex
+
+
+
+class AbstractCommentRepository(ABC):
+
+    @abstractmethod
+    async def get_comment_by_id(self, comment_id: ObjectId, fields: Collection[str]|None = None) -> DBComment|None:
+        pass
+
+    @abstractmethod
+    async def get_comments_by_ids(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None = None
+    ) -> list[DBComment|None]:
+        pass
+
+    @abstractmethod
+    async def add_comment(
+        self,
+        discussion_id: ObjectId,
+        user_id: ObjectId,
+        text: str,
+        parent_comment_id: ObjectId|None = None
+    ) -> DBComment:
+        pass
+
+    @abstractmethod
+    async def update_comment(self, comment: DBComment, text: str) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_comment(self, comment: DBComment) -> None:
+        pass
+
+
+class MotorCommentRepository(AbstractCommentRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+
+    async def get_comment_by_id(self, comment_id: ObjectId, fields: Collection[str]|None = None) -> DBComment|None:
+        return await DBComment.get_comment_by_id(comment_id=comment_id, db=self.__db, fields=fields)
+
+    async def get_comments_by_ids(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None = None
+    ) -> list[DBComment|None]:
+        return await DBComment.get_comments_by_ids(ids=ids, db=self.__db, fields=fields)
+
+    async def add_comment(
+        self,
+        discussion_id: ObjectId,
+        user_id: ObjectId,
+        text: str,
+        parent_comment_id: ObjectId|None = None
+    ) -> DBComment:
+        return await DBComment.add_comment(
+            db=self.__db,
+            discussion_id=discussion_id,
+            user_id=user_id,
+            text=text,
+            parent_comment_id=parent_comment_id
+        )
+
+    async def update_comment(self, comment: DBComment, text: str) -> None:
+        await comment.update_comment(db=self.__db, text=text)
+
+    async def delete_comment(self, comment: DBComment) -> None:
+        await comment.delete_comment(db=self.__db)
+
+
+class InMemoryCommentRepository(AbstractCommentRepository):
+
+    def __init__(self):
+        self.__comments: dict[ObjectId, dict[str, Any]] = dict()
+        self.__discussion_index: SortedIndex = SortedIndex()
+
+    async def get_comment_by_id(self, comment_id: ObjectId, fields: Collection[str]|None = None) -> DBComment|None:
+        comment: dict[str, Any]|None = self.__comments.get(comment_id)
+        if comment is None:
+            return None
+        return DBComment.hydrate(document=comment, fields=fields)
+
+    async def get_comments_by_ids(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None = None
+    ) -> list[DBComment|None]:
+        return [
+            DBComment.hydrate(document=self.__comments[_id], fields=fields) if _id in self.__comments else None
+            for _id in ids
+        ]
+
+    async def add_comment(
+        self,
+        discussion_id: ObjectId,
+        user_id: ObjectId,
+        text: str,
+        parent_comment_id: ObjectId|None = None
+    ) -> DBComment:
+        comment: dict[str, Any] = {
+            "_id": ObjectId(),
+            "discussion_id": discussion_id,
+            "user_id": user_id,
+            "text": text,
+            "parent_comment_id": parent_comment_id
+        }
+        self.__comments[comment["_id"]] = comment
+        self.__discussion_index.add(key=discussion_id, _id=comment["_id"])
+        return DBComment.from_document(document=comment)
+
+    async def update_comment(self, comment: DBComment, text: str) -> None:
+        current_comment: dict[str, Any]|None = self.__comments.get(comment._id)
+        if current_comment is None:
+            raise ResourceNotFound()
+        self.__comments[comment._id] = {**current_comment, "text": text}
+        comment.text = text
+
+    async def delete_comment(self, comment: DBComment) -> None:
+        current_comment: dict[str, Any]|None = self.__comments.pop(comment._id, None)
+        if current_comment is not None:
+            self.__discussion_index.remove(key=current_comment["discussion_id"], _id=comment._id)
@@ -0,0 +1,90 @@
+from typing import Any, Collection, Hashable, Iterable, Iterator
+import bisect
+import itertools
+import re
+
+from bson import ObjectId
+
+
+
+_TOKEN_PATTERN: re.Pattern = re.compile(r"\w+")
+
+
+
+# Ids in ascending, that is creation, order per key, so pages can be cut by position or by id.
+class SortedIndex:
+
+    def __init__(self):
+        self.__ids: dict[Hashable, list[ObjectId]] = dict()
+
+    def add(self, key: Hashable, _id: ObjectId) -> None:
+        ids: list[ObjectId] = self.__ids.setdefault(key, list())
+        position: int = bisect.bisect_left(ids, _id)
+        if position == len(ids) or ids[position] != _id:
+            ids.insert(position, _id)
+
+    def remove(self, key: Hashable, _id: ObjectId) -> None:
+        ids: list[ObjectId]|None = self.__ids.get(key)
+        if ids is None:
+            return
+        position: int = bisect.bisect_left(ids, _id)
+        if position < len(ids) and ids[position] == _id:
+            del ids[position]
+        if not ids:
+            del self.__ids[key]
+
+    def contains(self, key: Hashable, _id: ObjectId) -> bool:
+        ids: list[ObjectId] = self.__ids.get(key, [])
+        position: int = bisect.bisect_left(ids, _id)
+        return position < len(ids) and ids[position] == _id
+
+    def ids(self, key: Hashable, after: ObjectId|None = None) -> list[ObjectId]:
+        ids: list[ObjectId] = self.__ids.get(key, [])
+        if after is None:
+            return ids
+        return ids[bisect.bisect_right(ids, after):]
+
+    def ids_with_all(self, keys: Collection[Hashable], after: ObjectId|None = None) -> Iterator[ObjectId]:
+        if not keys:
+            return iter(())
+        # Walk the shortest list and probe the others with binary searches.
+        keys_by_size: list[Hashable] = sorted(set(keys), key=lambda key: len(self.__ids.get(key, [])))
+        return (
+            _id for _id in self.ids(key=keys_by_size[0], after=after)
+            if all(self.contains(key=key, _id=_id) for key in keys_by_size[1:])
+        )
+
+
+# Stands in for Atlas Search: ranked by the number of distinct query words matched, then by id.
+class TokenIndex:
+
+    def __init__(self):
+        self.__ids: dict[str, set[ObjectId]] = dict()
+
+    def add(self, text: str, _id: ObjectId) -> None:
+        for token in tokenize(text=text):
+            self.__ids.setdefault(token, set()).add(_id)
+
+    def remove(self, text: str, _id: ObjectId) -> None:
+        for token in tokenize(text=text):
+            ids: set[ObjectId]|None = self.__ids.get(token)
+            if ids is not None:
+                ids.discard(_id)
+                if not ids:
+                    del self.__ids[token]
+
+    def search(self, query: str) -> list[ObjectId]:
+        scores: dict[ObjectId, int] = dict()
+        for token in tokenize(text=query):
+            for _id in self.__ids.get(token, ()):
+                scores[_id] = scores.get(_id, 0) + 1
+        return sorted(scores, key=lambda _id: (-scores[_id], _id))
+
+
+
+def tokenize(text: str) -> set[str]:
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+def page(ids: Iterable[Any], skip: int, limit: int) -> list[Any]:
+    # A limit of 0 means no limit, as with Mongo cursors.
+    return list(itertools.islice(ids, skip, skip + limit if limit > 0 else None))
@@ -0,0 +1,284 @@
+from abc import ABC, abstractmethod
+from typing import Any, Collection
+import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.common import NoChangeInResource, ResourceNotFound
+from src.models.discussion import DBDiscussion
+from src.repositories.common import SortedIndex, TokenIndex, page
+
+
+
+class AbstractDiscussionRepository(ABC):
+
+    @abstractmethod
+    async def get_discussion_by_id(self, _id: str, fields: Collection[str]|None = None) -> DBDiscussion|None:
+        pass
+
+    @abstractmethod
+    async def get_discussions_by_ids(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None = None
+    ) -> list[DBDiscussion|None]:
+        pass
+
+    @abstractmethod
+    async def create_discussion(
+        self,
+        user_id: ObjectId,
+        text: str,
+        tags: list[str],
+        created_on: datetime.datetime,
+        image_link: str|None = None
+    ) -> DBDiscussion:
+        pass
+
+    @abstractmethod
+    async def search_discussions_based_on_text(
+        self,
+        search_term: str,
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
+    ) -> list[DBDiscussion]:
+        pass
+
+    @abstractmethod
+    async def search_discussions_based_on_tags(
+        self,
+        search_tags: list[str],
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
+    ) -> list[DBDiscussion]:
+        pass
+
+    @abstractmethod
+    async def update_discussion(
+        self,
+        discussion: DBDiscussion,
+        text: str|None = None,
+        tags: list[str]|None = None,
+        image_link: str|None = None
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_discussion(self, discussion: DBDiscussion) -> None:
+        pass
+
+
+class MotorDiscussionRepository(AbstractDiscussionRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase, search_db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+        self.__search_db: AsyncIOMotorDatabase = search_db
+
+    async def get_discussion_by_id(self, _id: str, fields: Collection[str]|None = None) -> DBDiscussion|None:
+        return await DBDiscussion.get_discussion_by_id(_id=_id, db=self.__db, fields=fields)
+
+    async def get_discussions_by_ids(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None = None
+    ) -> list[DBDiscussion|None]:
+        return await DBDiscussion.get_discussions_by_ids(ids=ids, db=self.__db, fields=fields)
+
+    async def create_discussion(
+        self,
+        user_id: ObjectId,
+        text: str,
+        tags: list[str],
+        created_on: datetime.datetime,
+        image_link: str|None = None
+    ) -> DBDiscussion:
+        return await DBDiscussion.create_discussion(
+            user_id=user_id,
+            text=text,
+            tags=tags,
+            created_on=created_on,
+            db=self.__db,
+            image_link=image_link
+        )
+
+    async def search_discussions_based_on_text(
+        self,
+        search_term: str,
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
+    ) -> list[DBDiscussion]:
+        return await DBDiscussion.search_discussions_based_on_text(
+            search_term=search_term,
+            skip=skip,
+            limit=limit,
+            db=self.__search_db,
+            fields=fields,
+            text_preview_length=text_preview_length
+        )
+
+    async def search_discussions_based_on_tags(
+        self,
+        search_tags: list[str],
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
+    ) -> list[DBDiscussion]:
+        return await DBDiscussion.search_discussions_based_on_tags(
+            search_tags=search_tags,
+            skip=skip,
+            limit=limit,
+            db=self.__search_db,
+            fields=fields,
+            text_preview_length=text_preview_length
+        )
+
+    async def update_discussion(
+        self,
+        discussion: DBDiscussion,
+        text: str|None = None,
+        tags: list[str]|None = None,
+        image_link: str|None = None
+    ) -> None:
+        await discussion.update_discussion(db=self.__db, text=text, tags=tags, image_link=image_link)
+
+    async def delete_discussion(self, discussion: DBDiscussion) -> None:
+        await discussion.delete_discussion(db=self.__db)
+
+
+class InMemoryDiscussionRepository(AbstractDiscussionRepository):
+
+    def __init__(self):
+        self.__discussions: dict[ObjectId, dict[str, Any]] = dict()
+        self.__tag_index: SortedIndex = SortedIndex()
+        self.__text_index: TokenIndex = TokenIndex()
+
+    async def get_discussion_by_id(self, _id: str, fields: Collection[str]|None = None) -> DBDiscussion|None:
+        discussion: dict[str, Any]|None = self.__discussions.get(ObjectId(_id))
+        if discussion is None:
+            return None
+        return DBDiscussion.hydrate(document=discussion, fields=fields)
+
+    async def get_discussions_by_ids(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None = None
+    ) -> list[DBDiscussion|None]:
+        return [
+            DBDiscussion.hydrate(document=self.__discussions[_id], fields=fields) if _id in self.__discussions else None
+            for _id in ids
+        ]
+
+    async def create_discussion(
+        self,
+        user_id: ObjectId,
+        text: str,
+        tags: list[str],
+        created_on: datetime.datetime,
+        image_link: str|None = None
+    ) -> DBDiscussion:
+        discussion: dict[str, Any] = {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "text": text,
+            "tags": list(tags),
+            "image_link": image_link,
+            "created_on": created_on,
+            "version": 0
+        }
+        self.__index(discussion=discussion)
+        return DBDiscussion.from_document(document=discussion)
+
+    async def search_discussions_based_on_text(
+        self,
+        search_term: str,
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
+    ) -> list[DBDiscussion]:
+        return self.__hydrate_page(
+            ids=page(ids=self.__text_index.search(query=search_term), skip=skip, limit=limit),
+            fields=fields,
+            text_preview_length=text_preview_length
+        )
+
+    async def search_discussions_based_on_tags(
+        self,
+        search_tags: list[str],
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None,
+        text_preview_length: int|None = None
+    ) -> list[DBDiscussion]:
+        return self.__hydrate_page(
+            ids=page(ids=self.__tag_index.ids_with_all(keys=search_tags), skip=skip, limit=limit),
+            fields=fields,
+            text_preview_length=text_preview_length
+        )
+
+    async def update_discussion(
+        self,
+        discussion: DBDiscussion,
+        text: str|None = None,
+        tags: list[str]|None = None,
+        image_link: str|None = None
+    ) -> None:
+        update_dict: dict[str, Any] = dict()
+        if text is not None:
+            update_dict["text"] = text
+        if tags is not None:
+            update_dict["tags"] = list(tags)
+        if image_link is not None:
+            update_dict["image_link"] = image_link
+        if not update_dict:
+            raise NoChangeInResource()
+        current_discussion: dict[str, Any]|None = self.__discussions.get(discussion._id)
+        if current_discussion is None:
+            raise ResourceNotFound()
+        self.__unindex(discussion=current_discussion)
+        updated_discussion: dict[str, Any] = {
+            **current_discussion, **update_dict, "version": current_discussion["version"] + 1
+        }
+        self.__index(discussion=updated_discussion)
+        discussion.text = updated_discussion["text"]
+        discussion.tags = updated_discussion["tags"]
+        discussion.image_link = updated_discussion["image_link"]
+        discussion.version = updated_discussion["version"]
+
+    async def delete_discussion(self, discussion: DBDiscussion) -> None:
+        current_discussion: dict[str, Any]|None = self.__discussions.get(discussion._id)
+        if current_discussion is not None:
+            self.__unindex(discussion=current_discussion)
+
+    def __hydrate_page(
+        self,
+        ids: list[ObjectId],
+        fields: Collection[str]|None,
+        text_preview_length: int|None
+    ) -> list[DBDiscussion]:
+        discussions: list[dict[str, Any]] = [self.__discussions[_id] for _id in ids]
+        if text_preview_length is not None:
+            discussions = [
+                {**discussion, "text": discussion["text"][:text_preview_length]} for discussion in discussions
+            ]
+        return [DBDiscussion.hydrate(document=discussion, fields=fields) for discussion in discussions]
+
+    def __index(self, discussion: dict[str, Any]) -> None:
+        self.__discussions[discussion["_id"]] = discussion
+        for tag in discussion["tags"]:
+            self.__tag_index.add(key=tag, _id=discussion["_id"])
+        self.__text_index.add(text=discussion["text"], _id=discussion["_id"])
+
+    def __unindex(self, discussion: dict[str, Any]) -> None:
+        del self.__discussions[discussion["_id"]]
+        for tag in discussion["tags"]:
+            self.__tag_index.remove(key=tag, _id=discussion["_id"])
+        self.__text_index.remove(text=discussion["text"], _id=discussion["_id"])
@@ -0,0 +1,85 @@
+from abc import ABC, abstractmethod
+from typing import Any, Collection
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.following import DBFollowing, FollowingAlreadyExists
+from src.repositories.common import SortedIndex
+
+
+
+class AbstractFollowingRepository(ABC):
+
+    @abstractmethod
+    async def get_following_by_id(
+        self,
+        following_id: ObjectId,
+        fields: Collection[str]|None = None
+    ) -> DBFollowing|None:
+        pass
+
+    @abstractmethod
+    async def create_following(self, follower_id: ObjectId, followee_id: ObjectId) -> DBFollowing:
+        pass
+
+    @abstractmethod
+    async def delete_following(self, following: DBFollowing) -> None:
+        pass
+
+
+class MotorFollowingRepository(AbstractFollowingRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+
+    async def get_following_by_id(
+        self,
+        following_id: ObjectId,
+        fields: Collection[str]|None = None
+    ) -> DBFollowing|None:
+        return await DBFollowing.get_following_by_id(following_id=following_id, db=self.__db, fields=fields)
+
+    async def create_following(self, follower_id: ObjectId, followee_id: ObjectId) -> DBFollowing:
+        return await DBFollowing.create_following(db=self.__db, follower_id=follower_id, followee_id=followee_id)
+
+    async def delete_following(self, following: DBFollowing) -> None:
+        await following.delete_following(db=self.__db)
+
+
+class InMemoryFollowingRepository(AbstractFollowingRepository):
+
+    def __init__(self):
+        self.__followings: dict[ObjectId, dict[str, Any]] = dict()
+        # Mirrors the unique (follower_id, followee_id) index of the followings collection.
+        self.__ids_by_pair: dict[tuple[ObjectId, ObjectId], ObjectId] = dict()
+        self.__followee_index: SortedIndex = SortedIndex()
+
+    async def get_following_by_id(
+        self,
+        following_id: ObjectId,
+        fields: Collection[str]|None = None
+    ) -> DBFollowing|None:
+        following: dict[str, Any]|None = self.__followings.get(following_id)
+        if following is None:
+            return None
+        return DBFollowing.hydrate(document=following, fields=fields)
+
+    async def create_following(self, follower_id: ObjectId, followee_id: ObjectId) -> DBFollowing:
+        if (follower_id, followee_id) in self.__ids_by_pair:
+            raise FollowingAlreadyExists()
+        following: dict[str, Any] = {
+            "_id": ObjectId(),
+            "follower_id": follower_id,
+            "followee_id": followee_id
+        }
+        self.__followings[following["_id"]] = following
+        self.__ids_by_pair[(follower_id, followee_id)] = following["_id"]
+        self.__followee_index.add(key=followee_id, _id=following["_id"])
+        return DBFollowing.from_document(document=following)
+
+    async def delete_following(self, following: DBFollowing) -> None:
+        current_following: dict[str, Any]|None = self.__followings.pop(following._id, None)
+        if current_following is not None:
+            del self.__ids_by_pair[(current_following["follower_id"], current_following["followee_id"])]
+            self.__followee_index.remove(key=current_following["followee_id"], _id=following._id)
@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from typing import Any, Collection
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.like import DBLike, LikeAlreadyExists
+from src.repositories.common import SortedIndex
+
+
+
+class AbstractLikeRepository(ABC):
+
+    @abstractmethod
+    async def get_like(self, _id: ObjectId, fields: Collection[str]|None = None) -> DBLike|None:
+        pass
+
+    @abstractmethod
+    async def add_like(self, context: str, context_id: ObjectId, user_id: ObjectId) -> DBLike:
+        pass
+
+    @abstractmethod
+    async def delete_like(self, like: DBLike) -> None:
+        pass
+
+
+class MotorLikeRepository(AbstractLikeRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+
+    async def get_like(self, _id: ObjectId, fields: Collection[str]|None = None) -> DBLike|None:
+        return await DBLike.get_like(_id=_id, db=self.__db, fields=fields)
+
+    async def add_like(self, context: str, context_id: ObjectId, user_id: ObjectId) -> DBLike:
+        return await DBLike.add_like(db=self.__db, context=context, context_id=context_id, user_id=user_id)
+
+    async def delete_like(self, like: DBLike) -> None:
+        await like.delete_like(db=self.__db)
+
+
+class InMemoryLikeRepository(AbstractLikeRepository):
+
+    def __init__(self):
+        self.__likes: dict[ObjectId, dict[str, Any]] = dict()
+        # Mirrors the unique (context_id, user_id, context) index of the likes collection.
+        self.__ids_by_key: dict[tuple[ObjectId, ObjectId, str], ObjectId] = dict()
+        self.__context_index: SortedIndex = SortedIndex()
+
+    async def get_like(self, _id: ObjectId, fields: Collection[str]|None = None) -> DBLike|None:
+        like: dict[str, Any]|None = self.__likes.get(_id)
+        if like is None:
+            return None
+        return DBLike.hydrate(document=like, fields=fields)
+
+    async def add_like(self, context: str, context_id: ObjectId, user_id: ObjectId) -> DBLike:
+        key: tuple[ObjectId, ObjectId, str] = (context_id, user_id, context)
+        if key in self.__ids_by_key:
+            raise LikeAlreadyExists()
+        like: dict[str, Any] = {
+            "_id": ObjectId(),
+            "context": context,
+            "context_id": context_id,
+            "user_id": user_id
+        }
+        self.__likes[like["_id"]] = like
+        self.__ids_by_key[key] = like["_id"]
+        self.__context_index.add(key=context_id, _id=like["_id"])
+        return DBLike.from_document(document=like)
+
+    async def delete_like(self, like: DBLike) -> None:
+        current_like: dict[str, Any]|None = self.__likes.pop(like._id, None)
+        if current_like is not None:
+            del self.__ids_by_key[(current_like["context_id"], current_like["user_id"], current_like["context"])]
+            self.__context_index.remove(key=current_like["context_id"], _id=like._id)
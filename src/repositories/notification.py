@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+import asyncio
+import logging
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCursor, AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+
+from src.models.notification import DBNotification
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+
+class AbstractNotificationRepository(ABC):
+
+    @abstractmethod
+    async def publish(self, recipient_ids: list[ObjectId], payload: dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    async def listen(self, deliver: Callable[[DBNotification], None]) -> None:
+        # Delivers what any worker publishes from now on; runs until cancelled.
+        pass
+
+
+# Every worker follows the capped collection with a tailable cursor.
+class MotorNotificationRepository(AbstractNotificationRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase, capped_size_bytes: int, retry_seconds: float = 1.0):
+        self.__db: AsyncIOMotorDatabase = db
+        self.__capped_size_bytes: int = capped_size_bytes
+        self.__retry_seconds: float = retry_seconds
+
+    async def publish(self, recipient_ids: list[ObjectId], payload: dict[str, Any]) -> None:
+        await DBNotification.publish_notifications(recipient_ids=recipient_ids, payload=payload, db=self.__db)
+
+    async def listen(self, deliver: Callable[[DBNotification], None]) -> None:
+        last_id: ObjectId|None = None
+        started: bool = False
+        while True:
+            try:
+                if not started:
+                    await DBNotification.create_capped_collection(size_bytes=self.__capped_size_bytes, db=self.__db)
+                    last_id = await DBNotification.get_latest_notification_id(db=self.__db)
+                    started = True
+                # Ids are generated by the publishing workers, so a worker whose clock lags behind may have
+                # notifications skipped while the cursor is re-created; a live cursor returns every insert.
+                cursor: AsyncIOMotorCursor = DBNotification.tail_notifications(after=last_id, db=self.__db)
+                while cursor.alive:
+                    async for notification in cursor:
+                        last_id = notification["_id"]
+                        deliver(DBNotification.from_document(document=notification))
+            except PyMongoError as e:
+                logger.warning("could not follow the notifications collection: %r", e)
+            # A tailable cursor dies at once while the collection is empty.
+            await asyncio.sleep(self.__retry_seconds)
+
+
+class InMemoryNotificationRepository(AbstractNotificationRepository):
+
+    def __init__(self):
+        self.__published: asyncio.Queue[DBNotification] = asyncio.Queue()
+
+    async def publish(self, recipient_ids: list[ObjectId], payload: dict[str, Any]) -> None:
+        for recipient_id in recipient_ids:
+            self.__published.put_nowait(DBNotification(_id=ObjectId(), recipient_id=recipient_id, payload=payload))
+
+    async def listen(self, deliver: Callable[[DBNotification], None]) -> None:
+        while True:
+            deliver(await self.__published.get())
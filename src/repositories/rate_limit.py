@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+import asyncio
+import dataclasses
+import time
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.rate_limit import DBRateLimitBucket
+
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RateLimit:
+
+    rate_per_second: float
+    burst: int
+
+# `<requests>/<seconds>`, e.g. `10/60`; an empty string means no limit.
+def parse_rate_limit(limit: str) -> RateLimit|None:
+    if not limit:
+        return None
+    requests, seconds = limit.split("/")
+    return RateLimit(rate_per_second=int(requests) / float(seconds), burst=int(requests))
+
+
+
+class AbstractRateLimitRepository(ABC):
+
+    @abstractmethod
+    async def take(self, key: str, limit: RateLimit) -> float:
+        # Returns 0, or the seconds until the empty bucket `key` refills.
+        pass
+
+    @abstractmethod
+    async def compact(self) -> None:
+        pass
+
+    async def run_compaction(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.compact()
+
+
+class MotorRateLimitRepository(AbstractRateLimitRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        bucket: DBRateLimitBucket = await DBRateLimitBucket.take_token(
+            key=key,
+            rate_per_second=limit.rate_per_second,
+            burst=limit.burst,
+            db=self.__db
+        )
+        if bucket.taken:
+            return 0.0
+        return (1 - bucket.tokens) / limit.rate_per_second
+
+    async def compact(self) -> None:
+        # Full buckets are removed by the TTL index on expires_on.
+        pass
+
+
+# Each worker enforces the limits on its own.
+class InMemoryRateLimitRepository(AbstractRateLimitRepository):
+
+    def __init__(self):
+        # key -> (tokens, last refill, time the bucket is full again), all on the monotonic clock.
+        self.__buckets: dict[str, tuple[float, float, float]] = dict()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now: float = time.monotonic()
+        bucket: tuple[float, float, float]|None = self.__buckets.get(key)
+        tokens: float = limit.burst if bucket is None else min(
+            limit.burst, bucket[0] + (now - bucket[1]) * limit.rate_per_second
+        )
+        retry_after: float = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / limit.rate_per_second
+        self.__buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate_per_second)
+        return retry_after
+
+    async def compact(self) -> None:
+        # A full bucket behaves exactly like a missing one, so it can be dropped.
+        now: float = time.monotonic()
+        for key in [key for key, (_, _, full_on) in self.__buckets.items() if full_on <= now]:
+            del self.__buckets[key]
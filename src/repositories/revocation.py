@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from typing import Any
+import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.revocation import DBTokenRevocation
+
+
+
+class AbstractRevocationRepository(ABC):
+
+    @abstractmethod
+    async def revoke_tokens(self, user_id: ObjectId, token_version: int, revoked_on: datetime.datetime) -> None:
+        pass
+
+    @abstractmethod
+    async def get_revocations_since(self, since: datetime.datetime) -> list[DBTokenRevocation]:
+        pass
+
+
+class MotorRevocationRepository(AbstractRevocationRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+
+    async def revoke_tokens(self, user_id: ObjectId, token_version: int, revoked_on: datetime.datetime) -> None:
+        await DBTokenRevocation.revoke_tokens(
+            user_id=user_id,
+            token_version=token_version,
+            revoked_on=revoked_on,
+            db=self.__db
+        )
+
+    async def get_revocations_since(self, since: datetime.datetime) -> list[DBTokenRevocation]:
+        return await DBTokenRevocation.get_revocations_since(since=since, db=self.__db)
+
+
+class InMemoryRevocationRepository(AbstractRevocationRepository):
+
+    def __init__(self):
+        self.__revocations: dict[ObjectId, dict[str, Any]] = dict()
+
+    async def revoke_tokens(self, user_id: ObjectId, token_version: int, revoked_on: datetime.datetime) -> None:
+        current_revocation: dict[str, Any]|None = self.__revocations.get(user_id)
+        if current_revocation is not None:
+            token_version = max(token_version, current_revocation["token_version"])
+        self.__revocations[user_id] = {
+            "_id": user_id,
+            "token_version": token_version,
+            "revoked_on": revoked_on
+        }
+
+    async def get_revocations_since(self, since: datetime.datetime) -> list[DBTokenRevocation]:
+        return [
+            DBTokenRevocation.from_document(document=revocation)
+            for revocation in self.__revocations.values() if revocation["revoked_on"] >= since
+        ]
@@ -0,0 +1,225 @@
+from abc import ABC, abstractmethod
+from typing import Any, Collection
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.models.common import NoChangeInResource, ResourceNotFound
+from src.models.user import DBUser, DuplicateEmailOrPhone, stored_phone_number
+from src.repositories.common import TokenIndex, page
+from src.schemas.user import NewUser
+
+
+
+class AbstractUserRepository(ABC):
+
+    @abstractmethod
+    async def create_new_user(self, new_user: NewUser, hashed_password: str) -> DBUser:
+        pass
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str, fields: Collection[str]|None = None) -> DBUser|None:
+        pass
+
+    @abstractmethod
+    async def get_user_by_id(self, _id: str, fields: Collection[str]|None = None) -> DBUser|None:
+        pass
+
+    @abstractmethod
+    async def get_users_by_ids(self, ids: list[ObjectId], fields: Collection[str]|None = None) -> list[DBUser|None]:
+        pass
+
+    @abstractmethod
+    async def update_user(
+        self,
+        user: DBUser,
+        new_full_name: str|None = None,
+        new_phone_number: str|None = None,
+        new_email: str|None = None,
+        new_pw_hash: str|None = None
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def search_users_by_full_name(
+        self,
+        search_term: str,
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None
+    ) -> list[DBUser]:
+        pass
+
+    @abstractmethod
+    async def delete_user(self, user: DBUser) -> None:
+        pass
+
+
+class MotorUserRepository(AbstractUserRepository):
+
+    def __init__(self, db: AsyncIOMotorDatabase, search_db: AsyncIOMotorDatabase):
+        self.__db: AsyncIOMotorDatabase = db
+        self.__search_db: AsyncIOMotorDatabase = search_db
+
+    async def create_new_user(self, new_user: NewUser, hashed_password: str) -> DBUser:
+        return await DBUser.create_new_user(new_user=new_user, hashed_password=hashed_password, db=self.__db)
+
+    async def get_user_by_email(self, email: str, fields: Collection[str]|None = None) -> DBUser|None:
+        return await DBUser.get_user_by_email(email=email, db=self.__db, fields=fields)
+
+    async def get_user_by_id(self, _id: str, fields: Collection[str]|None = None) -> DBUser|None:
+        return await DBUser.get_user_by_id(_id=_id, db=self.__db, fields=fields)
+
+    async def get_users_by_ids(self, ids: list[ObjectId], fields: Collection[str]|None = None) -> list[DBUser|None]:
+        return await DBUser.get_users_by_ids(ids=ids, db=self.__db, fields=fields)
+
+    async def update_user(
+        self,
+        user: DBUser,
+        new_full_name: str|None = None,
+        new_phone_number: str|None = None,
+        new_email: str|None = None,
+        new_pw_hash: str|None = None
+    ) -> None:
+        await user.update_user(
+            db=self.__db,
+            new_full_name=new_full_name,
+            new_phone_number=new_phone_number,
+            new_email=new_email,
+            new_pw_hash=new_pw_hash
+        )
+
+    async def search_users_by_full_name(
+        self,
+        search_term: str,
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None
+    ) -> list[DBUser]:
+        return await DBUser.search_users_by_full_name(
+            search_term=search_term,
+            skip=skip,
+            limit=limit,
+            db=self.__search_db,
+            fields=fields
+        )
+
+    async def delete_user(self, user: DBUser) -> None:
+        await user.delete_user(db=self.__db)
+
+
+class InMemoryUserRepository(AbstractUserRepository):
+
+    def __init__(self):
+        self.__users: dict[ObjectId, dict[str, Any]] = dict()
+        self.__ids_by_email: dict[str, ObjectId] = dict()
+        self.__ids_by_phone_number: dict[str, ObjectId] = dict()
+        self.__full_name_index: TokenIndex = TokenIndex()
+
+    async def create_new_user(self, new_user: NewUser, hashed_password: str) -> DBUser:
+        user: dict[str, Any] = {
+            "_id": ObjectId(),
+            "full_name": new_user.full_name,
+            "phone_number": stored_phone_number(phone_number=new_user.phone_number),
+            "email": new_user.email,
+            "pw_hash": hashed_password,
+            "token_version": 0
+        }
+        self.__check_unique(user=user)
+        self.__index(user=user)
+        return DBUser(
+            _id=user["_id"],
+            full_name=new_user.full_name,
+            phone_number=new_user.phone_number,
+            email=new_user.email,
+            pw_hash=hashed_password
+        )
+
+    async def get_user_by_email(self, email: str, fields: Collection[str]|None = None) -> DBUser|None:
+        _id: ObjectId|None = self.__ids_by_email.get(email)
+        if _id is None:
+            return None
+        return DBUser.hydrate(document=self.__users[_id], fields=fields)
+
+    async def get_user_by_id(self, _id: str, fields: Collection[str]|None = None) -> DBUser|None:
+        user: dict[str, Any]|None = self.__users.get(ObjectId(_id))
+        if user is None:
+            return None
+        return DBUser.hydrate(document=user, fields=fields)
+
+    async def get_users_by_ids(self, ids: list[ObjectId], fields: Collection[str]|None = None) -> list[DBUser|None]:
+        return [
+            DBUser.hydrate(document=self.__users[_id], fields=fields) if _id in self.__users else None
+            for _id in ids
+        ]
+
+    async def update_user(
+        self,
+        user: DBUser,
+        new_full_name: str|None = None,
+        new_phone_number: str|None = None,
+        new_email: str|None = None,
+        new_pw_hash: str|None = None
+    ) -> None:
+        update_dict: dict[str, str] = dict()
+        if new_full_name is not None:
+            update_dict["full_name"] = new_full_name
+        if new_phone_number is not None:
+            update_dict["phone_number"] = new_phone_number
+        if new_email is not None:
+            update_dict["email"] = new_email
+        if new_pw_hash is not None:
+            update_dict["pw_hash"] = new_pw_hash
+        if not update_dict:
+            raise NoChangeInResource()
+        current_user: dict[str, Any]|None = self.__users.get(user._id)
+        if current_user is None:
+            raise ResourceNotFound()
+        updated_user: dict[str, Any] = {**current_user, **update_dict}
+        if new_pw_hash is not None:
+            updated_user["token_version"] = current_user["token_version"] + 1
+        self.__unindex(user=current_user)
+        try:
+            self.__check_unique(user=updated_user)
+        except DuplicateEmailOrPhone:
+            self.__index(user=current_user)
+            raise
+        self.__index(user=updated_user)
+        user.full_name = updated_user["full_name"]
+        user.phone_number = updated_user["phone_number"]
+        user.email = updated_user["email"]
+        user.pw_hash = updated_user["pw_hash"]
+        user.token_version = updated_user["token_version"]
+
+    async def search_users_by_full_name(
+        self,
+        search_term: str,
+        skip: int,
+        limit: int,
+        fields: Collection[str]|None = None
+    ) -> list[DBUser]:
+        return [
+            DBUser.hydrate(document=self.__users[_id], fields=fields)
+            for _id in page(ids=self.__full_name_index.search(query=search_term), skip=skip, limit=limit)
+        ]
+
+    async def delete_user(self, user: DBUser) -> None:
+        current_user: dict[str, Any]|None = self.__users.get(user._id)
+        if current_user is not None:
+            self.__unindex(user=current_user)
+
+    def __check_unique(self, user: dict[str, Any]) -> None:
+        if user["email"] in self.__ids_by_email or user["phone_number"] in self.__ids_by_phone_number:
+            raise DuplicateEmailOrPhone("the email or phone number is already in use")
+
+    def __index(self, user: dict[str, Any]) -> None:
+        self.__users[user["_id"]] = user
+        self.__ids_by_email[user["email"]] = user["_id"]
+        self.__ids_by_phone_number[user["phone_number"]] = user["_id"]
+        self.__full_name_index.add(text=user["full_name"], _id=user["_id"])
+
+    def __unindex(self, user: dict[str, Any]) -> None:
+        del self.__users[user["_id"]]
+        del self.__ids_by_email[user["email"]]
+        del self.__ids_by_phone_number[user["phone_number"]]
+        self.__full_name_index.remove(text=user["full_name"], _id=user["_id"])
@@ -0,0 +1,29 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+
+class SlowQuery(BaseModel):
+
+    recorded_on: str
+    duration_ms: float
+    database: str
+    collection: str
+    command_name: str
+    query_site: str|None = None
+    query_shape: dict[str, Any]
+    explained: bool
+    plan_summary: str|None = None
+    docs_examined: int|None = None
+    n_returned: int|None = None
+    flags: list[str]
+
+
+class EventLoopStall(BaseModel):
+
+    call_site: str
+    count: int
+    total_seconds: float
+    max_seconds: float
+    last_stack: list[str]
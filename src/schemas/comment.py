@@ -11,6 +11,12 @@ class Comment(BaseModel):
     parent_comment_id: str|None = None
 
 
+class CommentBatch(BaseModel):
+
+    comments: list[Comment]
+    missing_ids: list[str]
+
+
 class NewComment(BaseModel):
 
     discussion_id: str
@@ -12,6 +12,12 @@ class Discussion(BaseModel):
     hashtags: list[str]
     image_link: Optional[str] = None
     created_on: str
+
+
+class DiscussionBatch(BaseModel):
+
+    discussions: list[Discussion]
+    missing_ids: list[str]
     
 
 
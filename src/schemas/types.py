@@ -0,0 +1,38 @@
+# Stand-ins for EmailStr and PhoneNumber that import email_validator and the phonenumbers metadata on the
+# first validation, which the startup warm-up triggers, instead of at boot.
+from typing import Annotated
+
+from pydantic import AfterValidator, StringConstraints, WithJsonSchema
+from pydantic.networks import validate_email
+from pydantic_core import PydanticCustomError
+
+
+
+def _validate_email(email: str) -> str:
+    return validate_email(email)[1]
+
+def _validate_phone_number(phone_number: str) -> str:
+    import phonenumbers
+
+    try:
+        parsed_number: phonenumbers.PhoneNumber = phonenumbers.parse(phone_number, None)
+    except phonenumbers.NumberParseException as e:
+        raise PydanticCustomError("value_error", "value is not a valid phone number") from e
+    if not phonenumbers.is_valid_number(parsed_number):
+        raise PydanticCustomError("value_error", "value is not a valid phone number")
+    return phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.RFC3966)
+
+
+
+EmailStr = Annotated[
+    str,
+    AfterValidator(_validate_email),
+    WithJsonSchema({"type": "string", "format": "email"})
+]
+
+PhoneNumber = Annotated[
+    str,
+    StringConstraints(min_length=7, max_length=64),
+    AfterValidator(_validate_phone_number),
+    WithJsonSchema({"type": "string", "minLength": 7, "maxLength": 64, "format": "phone"})
+]
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from pydantic_extra_types.phone_numbers import PhoneNumber
+from pydantic import BaseModel
+
+from src.schemas.types import EmailStr, PhoneNumber
 
 
 
@@ -25,6 +26,12 @@ class UserPublic(BaseModel):
     full_name: str
 
 
+class UserPublicBatch(BaseModel):
+
+    users: list[UserPublic]
+    missing_ids: list[str]
+
+
 class UserUpdate(BaseModel):
 
     full_name: str|None = None
@@ -1,12 +1,17 @@
 from abc import ABC, abstractmethod
 from typing import Any
 import datetime
+import logging
 import time
 
-import argon2
+import anyio
 import jwt
 
-from src.config import JWT_SECRET, JWT_VALIDITY_DAYS
+from src.utils.tracing import traced
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
 
 
 
@@ -22,25 +27,28 @@ class AbstractPasswordHash(ABC):
 
 class Argon2PasswordHash(AbstractPasswordHash):
 
-    __password_hasher: argon2.PasswordHasher = argon2.PasswordHasher()
+    def __init__(self):
+        # Imported here so that argon2 is only loaded by processes that hash passwords.
+        import argon2
+
+        self.__password_hasher: argon2.PasswordHasher = argon2.PasswordHasher()
+        self.__verification_errors: tuple[type[Exception], ...] = (
+            argon2.exceptions.VerificationError,
+            argon2.exceptions.VerifyMismatchError
+        )
 
+    # Argon2 runs in a worker thread with the GIL released, so hashing does not stall the event loop.
+    @traced(name="argon2.hash")
     async def hash(self, password: str) -> str:
-        return self.__password_hasher.hash(password=password)
+        return await anyio.to_thread.run_sync(self.__password_hasher.hash, password)
 
+    @traced(name="argon2.verify")
     async def verify(self, password: str, hash: str) -> bool:
         try:
-            return self.__password_hasher.verify(
-                hash=hash,
-                password=password
-            )
-        except (
-            argon2.exceptions.VerificationError,
-            argon2.exceptions.VerifyMismatchError,
-            argon2.exceptions.VerifyMismatchError
-        ):
+            return await anyio.to_thread.run_sync(self.__password_hasher.verify, hash, password)
+        except self.__verification_errors:
             return False
 
-_password_hasher: AbstractPasswordHash = Argon2PasswordHash()
 
 
 
@@ -60,18 +68,21 @@ class HS256JWT(AbstractTokenGenerator):
         self.__secret: str = secret
         self.__token_validity_days: int = token_validity_days
 
+    @traced(name="jwt.encode")
     async def create_token(self, payload: dict[str, Any]) -> str:
         time_now_utc_seconds: int = int(time.time())
+        # exp and iat are registered claims: jwt.decode only enforces exp when it is in the payload.
         return jwt.encode(
-            payload=payload,
-            key=self.__secret,
-            algorithm="HS256",
-            headers={
+            payload={
+                **payload,
                 "exp": time_now_utc_seconds + int(self.__token_validity_days * 86400),
                 "iat": time_now_utc_seconds
-            }
+            },
+            key=self.__secret,
+            algorithm="HS256"
         )
 
+    @traced(name="jwt.decode")
     async def decode_token(self, token: str) -> dict[str, Any]:
         try:
             return jwt.decode(
@@ -80,13 +91,8 @@ class HS256JWT(AbstractTokenGenerator):
                 algorithms=["HS256"]
             )
         except jwt.PyJWTError as e:
-            print(str(e))
+            logger.info("rejected token: %s", e)
             raise InvalidToken()
 
 class InvalidToken(Exception):
     pass
-
-_token_generator: AbstractTokenGenerator = HS256JWT(
-    secret=JWT_SECRET,
-    token_validity_days=JWT_VALIDITY_DAYS
-)
@@ -0,0 +1,124 @@
+from abc import ABC, abstractmethod
+import gzip
+import zlib
+
+import brotli
+import zstandard
+
+
+
+class StreamEncoder(ABC):
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        # Flushed, so the client can decode everything sent so far.
+        pass
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        pass
+
+
+class Encoder(ABC):
+
+    @abstractmethod
+    def compress(self, data: bytes, level: int) -> bytes:
+        pass
+
+    @abstractmethod
+    def stream(self, level: int) -> StreamEncoder:
+        pass
+
+
+class GzipStreamEncoder(StreamEncoder):
+
+    def __init__(self, level: int):
+        self.__compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.compress(data) + self.__compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.__compressor.flush(zlib.Z_FINISH)
+
+
+class GzipEncoder(Encoder):
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+    def stream(self, level: int) -> StreamEncoder:
+        return GzipStreamEncoder(level=level)
+
+
+class BrotliStreamEncoder(StreamEncoder):
+
+    def __init__(self, level: int):
+        self.__compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.process(data) + self.__compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.__compressor.finish()
+
+
+class BrotliEncoder(Encoder):
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        return brotli.compress(data, quality=level)
+
+    def stream(self, level: int) -> StreamEncoder:
+        return BrotliStreamEncoder(level=level)
+
+
+class ZstdStreamEncoder(StreamEncoder):
+
+    def __init__(self, level: int):
+        self.__compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.__compressor.compress(data) + self.__compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.__compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class ZstdEncoder(Encoder):
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def stream(self, level: int) -> StreamEncoder:
+        return ZstdStreamEncoder(level=level)
+
+
+
+ENCODERS: dict[str, Encoder] = {
+    "gzip": GzipEncoder(),
+    "br": BrotliEncoder(),
+    "zstd": ZstdEncoder()
+}
+
+
+
+# `encodings` is in order of preference; None when the header accepts none of them.
+def negotiate_encoding(accept_encoding: str, encodings: list[str]) -> str|None:
+    weights: dict[str, float] = dict()
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.partition(";")
+        weight: float = 1.0
+        parameter_name, _, value = parameters.partition("=")
+        if parameter_name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best_encoding: str|None = None
+    best_weight: float = 0.0
+    for encoding in encodings:
+        encoding_weight: float = weights.get(encoding, weights.get("*", 0.0))
+        if encoding_weight > best_weight:
+            best_encoding, best_weight = encoding, encoding_weight
+    return best_encoding
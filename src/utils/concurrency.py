@@ -0,0 +1,50 @@
+import time
+
+
+
+# Only used from the event loop thread, so no locking is needed.
+class ConcurrencyLimiter:
+
+    def __init__(self, limit: int):
+        self.limit: float = limit
+        self.in_flight: int = 0
+
+    def try_acquire(self, share: float = 1.0) -> bool:
+        # Admits a request while fewer than `share` of the limit are in flight.
+        if self.in_flight >= max(1, int(self.limit * share)):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, started: float, latency_seconds: float) -> None:
+        self.in_flight -= 1
+
+
+# A request slower than the target cuts the limit by `backoff`, once per generation of requests; every other
+# request grows it by 1/limit while at least half of it is in use.
+class AIMDConcurrencyLimiter(ConcurrencyLimiter):
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target_seconds: float,
+        backoff: float = 0.9
+    ):
+        super().__init__(limit=initial_limit)
+        self.__min_limit: int = min_limit
+        self.__max_limit: int = max_limit
+        self.__latency_target_seconds: float = latency_target_seconds
+        self.__backoff: float = backoff
+        self.__last_decrease: float = float("-inf")
+
+    def release(self, started: float, latency_seconds: float) -> None:
+        in_flight: int = self.in_flight
+        super().release(started=started, latency_seconds=latency_seconds)
+        if latency_seconds > self.__latency_target_seconds:
+            if started >= self.__last_decrease:
+                self.limit = max(self.__min_limit, self.limit * self.__backoff)
+                self.__last_decrease = time.perf_counter()
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(self.__max_limit, self.limit + 1 / self.limit)
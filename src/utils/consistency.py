@@ -0,0 +1,58 @@
+# Consistency tokens carry the time of a client's last write between requests. They are signed, short lived
+# and bound to the Authorization header of the request they were issued to.
+from typing import Any, Mapping
+import base64
+import hashlib
+import hmac
+import time
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from bson.timestamp import Timestamp
+
+
+
+# The cluster time is sent back to the server as it was received, so its signature's field types must survive.
+_RAW_CODEC_OPTIONS: CodecOptions = CodecOptions(document_class=RawBSONDocument)
+
+
+
+def caller_digest(authorization: bytes|None) -> bytes:
+    return b"" if authorization is None else hashlib.sha256(authorization).digest()[:16]
+
+def create_consistency_token(
+    operation_time: Timestamp,
+    cluster_time: Mapping[str, Any],
+    caller: bytes,
+    key: bytes,
+    validity_seconds: int
+) -> str:
+    payload: bytes = bson.encode({
+        "operation_time": operation_time,
+        "cluster_time": cluster_time,
+        "caller": caller,
+        "expires": int(time.time()) + validity_seconds
+    })
+    signature: bytes = hmac.new(key=key, msg=payload, digestmod=hashlib.sha256).digest()
+    return f"{_encode(data=payload)}.{_encode(data=signature)}"
+
+def read_consistency_token(token: str, caller: bytes, key: bytes) -> tuple[Timestamp, Mapping[str, Any]]|None:
+    try:
+        encoded_payload, encoded_signature = token.split(".")
+        payload: bytes = _decode(data=encoded_payload)
+        signature: bytes = _decode(data=encoded_signature)
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, hmac.new(key=key, msg=payload, digestmod=hashlib.sha256).digest()):
+        return None
+    claims: RawBSONDocument = bson.decode(payload, codec_options=_RAW_CODEC_OPTIONS)
+    if claims["expires"] < time.time() or not hmac.compare_digest(claims["caller"], caller):
+        return None
+    return claims["operation_time"], claims["cluster_time"]
+
+def _encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
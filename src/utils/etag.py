@@ -0,0 +1,22 @@
+def strong_etag(*parts: object) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+# Weak comparison, as If-None-Match requires.
+def if_none_match(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+# The strong ETag of the representation encoded with `encoding`, e.g. `"<id>-<version>-gzip"`.
+def encoded_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"'
+
+# The ETag an encoded ETag was derived from, or None when it does not end in one of `encodings`.
+def decoded_etag(etag: str, encodings: list[str]) -> str|None:
+    weak: str = "W/" if etag.startswith("W/") else ""
+    opaque_tag: str = etag.removeprefix("W/")
+    for encoding in encodings:
+        suffix: str = f'-{encoding}"'
+        if opaque_tag.endswith(suffix) and len(opaque_tag) > len(suffix) + 1:
+            return f'{weak}{opaque_tag.removesuffix(suffix)}"'
+    return None
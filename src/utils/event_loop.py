@@ -0,0 +1,129 @@
+import asyncio
+import dataclasses
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from src.config import LOOP_WATCHDOG_THRESHOLD_MS
+from src.utils.metrics import event_loop_lag_seconds, event_loop_stall_seconds
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_SOURCE_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+
+async def monitor_event_loop_lag(interval_seconds: float = 0.5) -> None:
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    while True:
+        expected_wakeup: float = loop.time() + interval_seconds
+        await asyncio.sleep(interval_seconds)
+        event_loop_lag_seconds.observe(max(0.0, loop.time() - expected_wakeup))
+
+
+
+@dataclasses.dataclass
+class StallSite:
+
+    call_site: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_stack: list[str] = dataclasses.field(default_factory=list)
+
+
+# A heartbeat stamps the time; when the stamp goes stale, a helper thread captures the loop thread's stack.
+class LoopWatchdog:
+
+    def __init__(self, threshold_seconds: float, stack_depth: int = 32):
+        self.__threshold_seconds: float = threshold_seconds
+        self.__heartbeat_interval: float = threshold_seconds / 4
+        self.__stack_depth: int = stack_depth
+        self.__last_heartbeat: float = time.monotonic()
+        self.__loop_thread_id: int|None = None
+        self.__stop: threading.Event = threading.Event()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__sites: dict[str, StallSite] = dict()
+
+    def stall_sites(self) -> list[StallSite]:
+        with self.__lock:
+            return sorted(
+                (dataclasses.replace(site, last_stack=list(site.last_stack)) for site in self.__sites.values()),
+                key=lambda site: site.total_seconds,
+                reverse=True
+            )
+
+    async def run(self) -> None:
+        self.__loop_thread_id = threading.get_ident()
+        self.__last_heartbeat = time.monotonic()
+        self.__stop.clear()
+        watcher: threading.Thread = threading.Thread(
+            target=self.__watch,
+            name="event-loop-watchdog",
+            daemon=True
+        )
+        watcher.start()
+        try:
+            while True:
+                self.__last_heartbeat = time.monotonic()
+                await asyncio.sleep(self.__heartbeat_interval)
+        finally:
+            self.__stop.set()
+
+    def __watch(self) -> None:
+        stalled_heartbeat: float|None = None
+        call_site: str = ""
+        stack: list[str] = list()
+        while not self.__stop.wait(self.__heartbeat_interval):
+            last_heartbeat: float = self.__last_heartbeat
+            if stalled_heartbeat is not None:
+                if last_heartbeat != stalled_heartbeat:
+                    self.__record(
+                        call_site=call_site,
+                        stack=stack,
+                        stall_seconds=last_heartbeat - stalled_heartbeat - self.__heartbeat_interval
+                    )
+                    stalled_heartbeat = None
+                continue
+            if time.monotonic() - last_heartbeat - self.__heartbeat_interval > self.__threshold_seconds:
+                frame = sys._current_frames().get(self.__loop_thread_id)
+                if frame is None:
+                    continue
+                stalled_heartbeat = last_heartbeat
+                call_site, stack = self.__capture(frame=frame)
+
+    def __capture(self, frame) -> tuple[str, list[str]]:
+        summary: traceback.StackSummary = traceback.extract_stack(f=frame, limit=self.__stack_depth)
+        call_site: traceback.FrameSummary = summary[-1]
+        for frame_summary in reversed(summary):
+            if frame_summary.filename.startswith(_SOURCE_ROOT):
+                call_site = frame_summary
+                break
+        return (
+            f"{os.path.relpath(call_site.filename)}:{call_site.lineno} in {call_site.name}",
+            summary.format()
+        )
+
+    def __record(self, call_site: str, stack: list[str], stall_seconds: float) -> None:
+        with self.__lock:
+            site: StallSite = self.__sites.setdefault(call_site, StallSite(call_site=call_site))
+            site.count += 1
+            site.total_seconds += stall_seconds
+            site.max_seconds = max(site.max_seconds, stall_seconds)
+            site.last_stack = stack
+        event_loop_stall_seconds.labels(call_site=call_site).observe(stall_seconds)
+        logger.warning(
+            "event loop blocked for %.1fms at %s\n%s",
+            stall_seconds * 1000,
+            call_site,
+            "".join(stack)
+        )
+
+_loop_watchdog: LoopWatchdog|None = LoopWatchdog(
+    threshold_seconds=LOOP_WATCHDOG_THRESHOLD_MS / 1000
+) if LOOP_WATCHDOG_THRESHOLD_MS > 0 else None
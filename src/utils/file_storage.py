@@ -3,7 +3,7 @@ from uuid import uuid4
 
 import aiofiles
 
-from src.config import LOCAL_STORAGE_STATIC_FILES_PATH, LOCAL_STORAGE_BASE_URL
+from src.utils.tracing import traced
 
 
 
@@ -20,6 +20,7 @@ class LocalFileStorage(AbstractFileStorage):
         self.__root: str = root
         self.__base_url: str = base_url
 
+    @traced(name="file_storage.create_file")
     async def create_file(self, content: bytes, file_type: str, file_name: str|None = None, file_path: str|None = None) -> str:
         file_name = str(uuid4()) if file_name is None else file_name
         relative_path: str = f"/{file_path}" if file_path else "" + f"/{file_name}.{file_type.lstrip('.')}"
@@ -30,8 +31,3 @@ class LocalFileStorage(AbstractFileStorage):
         ) as handle:
             await handle.write(content)
         return f"{self.__base_url}{relative_path}"
-
-_file_storage: AbstractFileStorage = LocalFileStorage(
-    root=LOCAL_STORAGE_STATIC_FILES_PATH,
-    base_url=LOCAL_STORAGE_BASE_URL
-)
@@ -0,0 +1,138 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+import copy
+import datetime
+import logging
+import queue
+import sys
+import threading
+import time
+
+import orjson
+
+
+
+request_id: ContextVar[str|None] = ContextVar("request_id", default=None)
+
+_RECORD_ATTRIBUTES: frozenset[str] = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__.keys()
+) | {"message", "request_id", "suppressed"}
+
+
+
+class RequestIdFilter(logging.Filter):
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+# At most `limit` records per logger, level and template in every window; the number dropped is attached to
+# the next record let through.
+class RateLimitFilter(logging.Filter):
+
+    def __init__(self, limit: int, window_seconds: float, max_keys: int = 10_000):
+        super().__init__()
+        self.__limit: int = limit
+        self.__window_seconds: float = window_seconds
+        self.__max_keys: int = max_keys
+        self.__lock: threading.Lock = threading.Lock()
+        self.__windows: dict[tuple[str, int, str], list] = dict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now: float = time.monotonic()
+        key: tuple[str, int, str] = (record.name, record.levelno, str(record.msg))
+        with self.__lock:
+            window: list|None = self.__windows.get(key)
+            if window is None or now - window[0] >= self.__window_seconds:
+                suppressed: int = window[2] if window is not None else 0
+                if window is None and len(self.__windows) >= self.__max_keys:
+                    self.__windows.clear()
+                self.__windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.__limit:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class DroppingQueueHandler(QueueHandler):
+
+    def __init__(self, queue: queue.Queue):
+        super().__init__(queue)
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JSONFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict = {
+            "timestamp": datetime.datetime.fromtimestamp(
+                record.created,
+                tz=datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        suppressed: int|None = getattr(record, "suppressed", None)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        for attribute, value in record.__dict__.items():
+            if attribute not in _RECORD_ATTRIBUTES:
+                entry[attribute] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+
+# The returned listener must be started, and stopped on shutdown to flush the queue.
+def configure_logging(
+    level: str,
+    json: bool,
+    queue_size: int,
+    rate_limit: int,
+    rate_limit_window_seconds: float
+) -> QueueListener:
+    stream_handler: logging.StreamHandler = logging.StreamHandler(stream=sys.stdout)
+    stream_handler.setFormatter(
+        JSONFormatter() if json else logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        )
+    )
+    queue_handler: DroppingQueueHandler = DroppingQueueHandler(queue=queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(RequestIdFilter())
+    if rate_limit > 0:
+        queue_handler.addFilter(
+            RateLimitFilter(limit=rate_limit, window_seconds=rate_limit_window_seconds)
+        )
+    root_logger: logging.Logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(level)
+    return QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
@@ -0,0 +1,263 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+import bisect
+import math
+import threading
+
+
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+
+class Metric(ABC):
+
+    metric_type: str
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = tuple(label_names)
+        self._lock: threading.Lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = dict()
+        if not self.label_names:
+            self._children[()] = self._new_child()
+
+    @abstractmethod
+    def _new_child(self) -> object:
+        pass
+
+    @abstractmethod
+    def _render_child(self, label_values: tuple[str, ...], child: object) -> list[str]:
+        pass
+
+    def labels(self, **label_values: str):
+        key: tuple[str, ...] = tuple(str(label_values[name]) for name in self.label_names)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self) -> str:
+        lines: list[str] = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for label_values, child in list(self._children.items()):
+            lines.extend(self._render_child(label_values, child))
+        return "\n".join(lines)
+
+    def _format_labels(self, label_values: tuple[str, ...], extra: dict[str, str]|None = None) -> str:
+        pairs: list[tuple[str, str]] = list(zip(self.label_names, label_values))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        escaped: str = ",".join(
+            f'{name}="{_escape_label_value(value)}"' for name, value in pairs
+        )
+        return "{" + escaped + "}"
+
+
+class _CounterChild:
+
+    def __init__(self):
+        self._lock: threading.Lock = threading.Lock()
+        self.value: float = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+class Counter(Metric):
+
+    metric_type: str = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def _render_child(self, label_values: tuple[str, ...], child: _CounterChild) -> list[str]:
+        return [f"{self.name}{self._format_labels(label_values)} {_format_value(child.value)}"]
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+
+class _GaugeChild:
+
+    def __init__(self):
+        self._lock: threading.Lock = threading.Lock()
+        self.value: float = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Gauge(Metric):
+
+    metric_type: str = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def _render_child(self, label_values: tuple[str, ...], child: _GaugeChild) -> list[str]:
+        return [f"{self.name}{self._format_labels(label_values)} {_format_value(child.value)}"]
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+
+class _HistogramChild:
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self._lock: threading.Lock = threading.Lock()
+        self.buckets: tuple[float, ...] = buckets
+        self.bucket_counts: list[int] = [0] * len(buckets)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        index: int = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.bucket_counts):
+                self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+class Histogram(Metric):
+
+    metric_type: str = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        super().__init__(name=name, documentation=documentation, label_names=label_names)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(buckets=self.buckets)
+
+    def _render_child(self, label_values: tuple[str, ...], child: _HistogramChild) -> list[str]:
+        with child._lock:
+            bucket_counts: list[int] = list(child.bucket_counts)
+            count: int = child.count
+            total: float = child.sum
+        lines: list[str] = list()
+        cumulative: int = 0
+        for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+            cumulative += bucket_count
+            labels: str = self._format_labels(label_values, {"le": _format_value(upper_bound)})
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = self._format_labels(label_values, {"le": "+Inf"})
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        lines.append(f"{self.name}_sum{self._format_labels(label_values)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._format_labels(label_values)} {count}")
+        return lines
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.__metrics: dict[str, Metric] = dict()
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.__metrics:
+            raise ValueError(f"a metric named '{metric.name}' is already registered")
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(
+            metric.render() for metric in self.__metrics.values()
+        ) + "\n"
+
+_metrics_registry: MetricsRegistry = MetricsRegistry()
+
+
+
+http_request_duration_seconds: Histogram = _metrics_registry.register(Histogram(
+    name="http_request_duration_seconds",
+    documentation="HTTP request latency by route template, method and status code.",
+    label_names=("route", "method", "status")
+))
+http_requests_in_flight: Gauge = _metrics_registry.register(Gauge(
+    name="http_requests_in_flight",
+    documentation="HTTP requests currently being served, by route template.",
+    label_names=("route", "method")
+))
+http_requests_shed_total: Counter = _metrics_registry.register(Counter(
+    name="http_requests_shed_total",
+    documentation="HTTP requests rejected with 503 by the concurrency limiter, by route template and priority.",
+    label_names=("route", "priority")
+))
+http_concurrency_limit: Gauge = _metrics_registry.register(Gauge(
+    name="http_concurrency_limit",
+    documentation="Current in-flight request limit, by limiter.",
+    label_names=("limiter",)
+))
+mongo_command_duration_seconds: Histogram = _metrics_registry.register(Histogram(
+    name="mongo_command_duration_seconds",
+    documentation="MongoDB command latency by collection, command and outcome.",
+    label_names=("collection", "command", "outcome")
+))
+mongo_pool_checkout_wait_seconds: Histogram = _metrics_registry.register(Histogram(
+    name="mongo_pool_checkout_wait_seconds",
+    documentation="Time spent waiting to check a connection out of the MongoDB pool.",
+    label_names=("outcome",)
+))
+mongo_pool_connections_checked_out: Gauge = _metrics_registry.register(Gauge(
+    name="mongo_pool_connections_checked_out",
+    documentation="MongoDB connections currently checked out of the pool."
+))
+websocket_connections: Gauge = _metrics_registry.register(Gauge(
+    name="websocket_connections",
+    documentation="Open notification WebSocket connections."
+))
+notifications_dropped_total: Counter = _metrics_registry.register(Counter(
+    name="notifications_dropped_total",
+    documentation="Notifications dropped from full connection queues because the client did not keep up."
+))
+event_loop_lag_seconds: Histogram = _metrics_registry.register(Histogram(
+    name="event_loop_lag_seconds",
+    documentation="Delay between when the event loop should have woken a timer and when it did."
+))
+event_loop_stall_seconds: Histogram = _metrics_registry.register(Histogram(
+    name="event_loop_stall_seconds",
+    documentation="Duration of event loop stalls above the watchdog threshold, by blocking call site.",
+    label_names=("call_site",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+))
+
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
@@ -0,0 +1,131 @@
+from typing import Any
+import threading
+
+from pymongo import monitoring
+
+from src.utils.metrics import (
+    mongo_command_duration_seconds, mongo_pool_checkout_wait_seconds,
+    mongo_pool_connections_checked_out
+)
+from src.utils.tracing import Span, Tracer
+
+
+
+class MongoCommandMetricsListener(monitoring.CommandListener):
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__in_flight: dict[tuple[Any, int], str] = dict()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        with self.__lock:
+            self.__in_flight[(event.connection_id, event.request_id)] = command_collection(
+                command_name=event.command_name,
+                command=event.command
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.__observe(event=event, outcome="success")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.__observe(event=event, outcome="failure")
+
+    def __observe(
+        self,
+        event: monitoring.CommandSucceededEvent|monitoring.CommandFailedEvent,
+        outcome: str
+    ) -> None:
+        with self.__lock:
+            collection: str = self.__in_flight.pop((event.connection_id, event.request_id), "")
+        mongo_command_duration_seconds.labels(
+            collection=collection,
+            command=event.command_name,
+            outcome=outcome
+        ).observe(event.duration_micros / 1_000_000)
+
+
+class MongoTracingListener(monitoring.CommandListener):
+
+    def __init__(self, tracer: Tracer):
+        self.__tracer: Tracer = tracer
+        self.__lock: threading.Lock = threading.Lock()
+        self.__spans: dict[tuple[Any, int], Span] = dict()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        span: Span = self.__tracer.start_span(
+            name=f"mongodb.{event.command_name}",
+            attributes={
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": command_collection(
+                    command_name=event.command_name,
+                    command=event.command
+                ),
+                "net.peer.name": event.connection_id[0],
+                "net.peer.port": event.connection_id[1]
+            }
+        )
+        with self.__lock:
+            self.__spans[(event.connection_id, event.request_id)] = span
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        with self.__lock:
+            span: Span|None = self.__spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            self.__tracer.end_span(span=span)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        with self.__lock:
+            span: Span|None = self.__spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.status = "ERROR"
+            span.status_message = str(event.failure.get("errmsg", ""))
+            self.__tracer.end_span(span=span)
+
+
+class MongoPoolMetricsListener(monitoring.ConnectionPoolListener):
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        mongo_pool_connections_checked_out.inc()
+        if event.duration is not None:
+            mongo_pool_checkout_wait_seconds.labels(outcome="success").observe(event.duration)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        if event.duration is not None:
+            mongo_pool_checkout_wait_seconds.labels(outcome="failure").observe(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        mongo_pool_connections_checked_out.dec()
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        pass
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+
+
+def command_collection(command_name: str, command: dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target: Any = command.get(command_name)
+    return target if isinstance(target, str) else ""
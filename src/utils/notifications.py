@@ -0,0 +1,86 @@
+from collections import deque
+from typing import Any
+import asyncio
+import logging
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+import orjson
+
+from src.models.notification import DBNotification
+from src.repositories.notification import AbstractNotificationRepository
+from src.utils.metrics import notifications_dropped_total
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+
+# Holds at most `queue_size` messages and drops the oldest when a slow client falls behind.
+class Subscription:
+
+    __slots__ = ("user_id", "dropped", "__messages", "__ready")
+
+    def __init__(self, user_id: ObjectId, queue_size: int):
+        self.user_id: ObjectId = user_id
+        self.dropped: int = 0
+        self.__messages: deque[str] = deque(maxlen=queue_size)
+        self.__ready: asyncio.Event = asyncio.Event()
+
+    def put(self, message: str) -> None:
+        if len(self.__messages) == self.__messages.maxlen:
+            self.dropped += 1
+            notifications_dropped_total.inc()
+        self.__messages.append(message)
+        self.__ready.set()
+
+    async def get(self) -> str:
+        while not self.__messages:
+            self.__ready.clear()
+            await self.__ready.wait()
+        return self.__messages.popleft()
+
+
+# `run` delivers what any worker published to the subscriptions of this worker's users.
+class NotificationHub:
+
+    def __init__(self, notifications: AbstractNotificationRepository, queue_size: int):
+        self.__notifications: AbstractNotificationRepository = notifications
+        self.__queue_size: int = queue_size
+        self.__subscriptions: dict[ObjectId, set[Subscription]] = dict()
+
+    def subscribe(self, user_id: ObjectId) -> Subscription:
+        subscription: Subscription = Subscription(user_id=user_id, queue_size=self.__queue_size)
+        self.__subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions: set[Subscription]|None = self.__subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self.__subscriptions[subscription.user_id]
+
+    async def publish(self, recipient_ids: list[ObjectId], actor_id: ObjectId, payload: dict[str, Any]) -> None:
+        # Best effort: a notification never fails the request.
+        recipient_ids = [recipient_id for recipient_id in dict.fromkeys(recipient_ids) if recipient_id != actor_id]
+        if not recipient_ids:
+            return
+        try:
+            await self.__notifications.publish(recipient_ids=recipient_ids, payload=payload)
+        except PyMongoError as e:
+            logger.warning("could not publish a notification: %r", e)
+
+    async def run(self) -> None:
+        await self.__notifications.listen(deliver=self.__deliver)
+
+    def __deliver(self, notification: DBNotification) -> None:
+        subscriptions: set[Subscription]|None = self.__subscriptions.get(notification.recipient_id)
+        if not subscriptions:
+            return
+        # Serialized once and shared by all of the recipient's connections.
+        message: str = orjson.dumps({"notification_id": str(notification._id), **notification.payload}).decode()
+        for subscription in subscriptions:
+            subscription.put(message=message)
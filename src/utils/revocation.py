@@ -0,0 +1,72 @@
+import asyncio
+import datetime
+import logging
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from src.models.revocation import DBTokenRevocation
+from src.repositories.revocation import AbstractRevocationRepository
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Revocations written by other workers are re-read this far back to absorb clock skew between hosts.
+_CLOCK_SKEW: datetime.timedelta = datetime.timedelta(seconds=60)
+
+
+
+# The lowest accepted token version of every user with revocations in the last token validity period.
+# Revocations by other workers apply once `refresh` has run.
+class RevocationList:
+
+    def __init__(self, revocations: AbstractRevocationRepository, retention: datetime.timedelta):
+        self.__revocations: AbstractRevocationRepository = revocations
+        self.__retention: datetime.timedelta = retention
+        self.__min_token_versions: dict[ObjectId, tuple[int, datetime.datetime]] = dict()
+        self.__refreshed_on: datetime.datetime|None = None
+
+    def is_revoked(self, user_id: ObjectId, token_version: int) -> bool:
+        entry: tuple[int, datetime.datetime]|None = self.__min_token_versions.get(user_id)
+        return entry is not None and token_version < entry[0]
+
+    async def revoke(self, user_id: ObjectId, token_version: int) -> None:
+        revoked_on: datetime.datetime = datetime.datetime.now(tz=datetime.timezone.utc)
+        await self.__revocations.revoke_tokens(user_id=user_id, token_version=token_version, revoked_on=revoked_on)
+        self.__apply(user_id=user_id, token_version=token_version, revoked_on=revoked_on)
+
+    async def refresh(self) -> None:
+        now: datetime.datetime = datetime.datetime.now(tz=datetime.timezone.utc)
+        since: datetime.datetime = (
+            now - self.__retention if self.__refreshed_on is None else self.__refreshed_on - _CLOCK_SKEW
+        )
+        revocations: list[DBTokenRevocation] = await self.__revocations.get_revocations_since(since=since)
+        for revocation in revocations:
+            self.__apply(
+                user_id=revocation._id,
+                token_version=revocation.token_version,
+                revoked_on=revocation.revoked_on
+            )
+        # Every token issued before a revocation has expired once the retention has passed.
+        expired_before: datetime.datetime = now - self.__retention
+        for user_id in [
+            user_id for user_id, (_, revoked_on) in self.__min_token_versions.items() if revoked_on < expired_before
+        ]:
+            del self.__min_token_versions[user_id]
+        self.__refreshed_on = now
+
+    async def run(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.refresh()
+            except PyMongoError as e:
+                logger.warning("could not refresh the token revocation list: %r", e)
+
+    def __apply(self, user_id: ObjectId, token_version: int, revoked_on: datetime.datetime) -> None:
+        current_entry: tuple[int, datetime.datetime]|None = self.__min_token_versions.get(user_id)
+        if current_entry is not None:
+            token_version = max(token_version, current_entry[0])
+            revoked_on = max(revoked_on, current_entry[1])
+        self.__min_token_versions[user_id] = (token_version, revoked_on)
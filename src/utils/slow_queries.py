@@ -0,0 +1,190 @@
+from collections import deque
+from typing import Any
+import asyncio
+import dataclasses
+import datetime
+import random
+import threading
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from src.config import (
+    SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN_SAMPLE_RATE, SLOW_QUERY_LOG_SIZE,
+    SLOW_QUERY_DOCS_EXAMINED_RATIO
+)
+from src.models.common import current_query_site
+from src.utils.mongo_monitoring import command_collection
+
+
+
+EXPLAINABLE_COMMANDS: frozenset[str] = frozenset({
+    "find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"
+})
+# Fields added by the driver to the original command that explain rejects or ignores.
+_DRIVER_FIELDS: frozenset[str] = frozenset({
+    "lsid", "$clusterTime", "$db", "txnNumber", "$readPreference", "readConcern",
+    "writeConcern", "startTransaction", "autocommit"
+})
+_QUERY_SHAPE_FIELDS: tuple[str, ...] = ("filter", "pipeline", "query", "updates", "deletes", "sort")
+_MAX_CONCURRENT_EXPLAINS: int = 2
+
+
+
+@dataclasses.dataclass
+class SlowQuery:
+
+    recorded_on: datetime.datetime
+    duration_ms: float
+    database: str
+    collection: str
+    command_name: str
+    query_site: str|None
+    query_shape: dict[str, Any]
+    explained: bool = False
+    plan_summary: str|None = None
+    docs_examined: int|None = None
+    n_returned: int|None = None
+    flags: list[str] = dataclasses.field(default_factory=list)
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain_sample_rate: float,
+        capacity: int,
+        docs_examined_ratio: float
+    ):
+        self.__threshold_ms: float = threshold_ms
+        self.__explain_sample_rate: float = explain_sample_rate
+        self.__docs_examined_ratio: float = docs_examined_ratio
+        self.__records: deque[SlowQuery] = deque(maxlen=capacity)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__in_flight: dict[tuple[Any, int], tuple[dict[str, Any], str, str|None]] = dict()
+        self.__client: AsyncIOMotorClient|None = None
+        self.__loop: asyncio.AbstractEventLoop|None = None
+        self.__explain_tasks: set[asyncio.Task] = set()
+
+    def attach(self, client: AsyncIOMotorClient, loop: asyncio.AbstractEventLoop) -> None:
+        self.__client = client
+        self.__loop = loop
+
+    def detach(self) -> None:
+        self.__client = None
+        self.__loop = None
+
+    def records(self) -> list[SlowQuery]:
+        return list(reversed(self.__records))
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name == "explain":
+            return
+        with self.__lock:
+            self.__in_flight[(event.connection_id, event.request_id)] = (
+                event.command, event.database_name, current_query_site.get()
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.__finish(event=event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.__finish(event=event)
+
+    def __finish(self, event: monitoring.CommandSucceededEvent|monitoring.CommandFailedEvent) -> None:
+        with self.__lock:
+            in_flight = self.__in_flight.pop((event.connection_id, event.request_id), None)
+        if in_flight is None:
+            return
+        duration_ms: float = event.duration_micros / 1000
+        if duration_ms < self.__threshold_ms:
+            return
+        command, database, site = in_flight
+        slow_query: SlowQuery = SlowQuery(
+            recorded_on=datetime.datetime.now(tz=datetime.timezone.utc),
+            duration_ms=duration_ms,
+            database=database,
+            collection=command_collection(command_name=event.command_name, command=command),
+            command_name=event.command_name,
+            query_site=site,
+            query_shape=_query_shape(command=command)
+        )
+        self.__records.append(slow_query)
+        loop: asyncio.AbstractEventLoop|None = self.__loop
+        if (
+            loop is not None
+            and event.command_name in EXPLAINABLE_COMMANDS
+            and random.random() < self.__explain_sample_rate
+        ):
+            loop.call_soon_threadsafe(self.__schedule_explain, slow_query, command)
+
+    def __schedule_explain(self, slow_query: SlowQuery, command: dict[str, Any]) -> None:
+        if self.__client is None or len(self.__explain_tasks) >= _MAX_CONCURRENT_EXPLAINS:
+            return
+        explain_task: asyncio.Task = asyncio.ensure_future(
+            self.__explain(slow_query=slow_query, command=command)
+        )
+        self.__explain_tasks.add(explain_task)
+        explain_task.add_done_callback(self.__explain_tasks.discard)
+
+    async def __explain(self, slow_query: SlowQuery, command: dict[str, Any]) -> None:
+        try:
+            explain_output: dict[str, Any] = await self.__client[slow_query.database].command(
+                {
+                    "explain": {
+                        key: value for key, value in command.items() if key not in _DRIVER_FIELDS
+                    },
+                    "verbosity": "executionStats"
+                }
+            )
+        except Exception as e:
+            slow_query.flags.append(f"EXPLAIN_FAILED: {e}")
+            return
+        slow_query.explained = True
+        winning_plan: Any = next(_find_values(document=explain_output, key="winningPlan"), None)
+        stages: list[str] = list(_find_values(document=winning_plan, key="stage"))
+        slow_query.plan_summary = " -> ".join(reversed(stages)) or None
+        slow_query.docs_examined = next(_find_values(document=explain_output, key="totalDocsExamined"), None)
+        slow_query.n_returned = next(_find_values(document=explain_output, key="nReturned"), None)
+        if "COLLSCAN" in stages:
+            slow_query.flags.append("COLLSCAN")
+        if (
+            slow_query.docs_examined is not None
+            and slow_query.n_returned is not None
+            and slow_query.docs_examined / max(slow_query.n_returned, 1) > self.__docs_examined_ratio
+        ):
+            slow_query.flags.append("HIGH_DOCS_EXAMINED_RATIO")
+
+_slow_query_recorder: SlowQueryRecorder = SlowQueryRecorder(
+    threshold_ms=SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate=SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    capacity=SLOW_QUERY_LOG_SIZE,
+    docs_examined_ratio=SLOW_QUERY_DOCS_EXAMINED_RATIO
+)
+
+
+
+# Values are replaced by their type, so that no emails, phone numbers or documents end up in the log.
+def _query_shape(command: dict[str, Any]) -> dict[str, Any]:
+    return {field: _value_shape(value=command[field]) for field in _QUERY_SHAPE_FIELDS if field in command}
+
+def _value_shape(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _value_shape(value=item) for key, item in value.items()}
+    if isinstance(value, list):
+        items: list[Any] = [_value_shape(value=item) for item in value]
+        # Arrays of values, such as the ones of $in, collapse to their distinct types.
+        return list(dict.fromkeys(items)) if all(isinstance(item, str) for item in items) else items
+    return "<null>" if value is None else f"<{type(value).__name__}>"
+
+def _find_values(document: Any, key: str):
+    if isinstance(document, dict):
+        for document_key, value in document.items():
+            if document_key == key:
+                yield value
+            else:
+                yield from _find_values(document=value, key=key)
+    elif isinstance(document, list):
+        for item in document:
+            yield from _find_values(document=item, key=key)
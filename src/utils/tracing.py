@@ -0,0 +1,270 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, TextIO, TypeVar
+import asyncio
+import dataclasses
+import functools
+import queue
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+import orjson
+
+from src.config import TRACING_EXPORTER, TRACING_FILE_PATH, TRACING_SAMPLE_RATE
+
+
+
+_TRACEPARENT_PATTERN: re.Pattern = re.compile(
+    r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+
+
+
+@dataclasses.dataclass
+class Span:
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str|None
+    sampled: bool
+    start_time_ns: int = dataclasses.field(default_factory=time.time_ns)
+    end_time_ns: int|None = None
+    attributes: dict[str, Any] = dataclasses.field(default_factory=dict)
+    status: str = "UNSET"
+    status_message: str|None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self)
+
+current_span: ContextVar[Span|None] = ContextVar("current_span", default=None)
+# The span a TracedAPIRoute's `dependencies` span was started under.
+_route_request_span: ContextVar[Span|None] = ContextVar("route_request_span", default=None)
+
+
+
+class AbstractSpanExporter(ABC):
+
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+class StreamSpanExporter(AbstractSpanExporter):
+
+    def __init__(self, stream: TextIO):
+        self.__stream: TextIO = stream
+
+    def export(self, spans: list[Span]) -> None:
+        self.__stream.write(
+            "".join(orjson.dumps(span.to_dict(), default=str).decode() + "\n" for span in spans)
+        )
+        self.__stream.flush()
+
+class FileSpanExporter(StreamSpanExporter):
+
+    def __init__(self, path: str):
+        self.__file: TextIO = open(path, mode="a", encoding="utf-8")
+        super().__init__(stream=self.__file)
+
+    def shutdown(self) -> None:
+        self.__file.close()
+
+
+
+# Sampled spans are exported in batches from a background thread. The exporter is created by `start` and closed
+# by `shutdown`, so that every lifespan gets its own.
+class Tracer:
+
+    def __init__(
+        self,
+        exporter_factory: Callable[[], AbstractSpanExporter]|None,
+        sample_rate: float = 1.0,
+        batch_size: int = 512,
+        flush_interval_seconds: float = 1.0,
+        queue_size: int = 10_000
+    ):
+        self.__exporter_factory: Callable[[], AbstractSpanExporter]|None = exporter_factory
+        self.__exporter: AbstractSpanExporter|None = None
+        self.__sample_rate: float = sample_rate
+        self.__batch_size: int = batch_size
+        self.__flush_interval_seconds: float = flush_interval_seconds
+        self.__queue: queue.Queue[Span|None] = queue.Queue(maxsize=queue_size)
+        self.__worker: threading.Thread|None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.__exporter_factory is not None
+
+    def start(self) -> None:
+        if self.__exporter_factory is None or self.__worker is not None:
+            return
+        self.__exporter = self.__exporter_factory()
+        self.__worker = threading.Thread(target=self.__export_loop, name="span-exporter", daemon=True)
+        self.__worker.start()
+
+    def shutdown(self) -> None:
+        if self.__worker is None:
+            return
+        self.__queue.put(None)
+        self.__worker.join()
+        self.__worker = None
+        self.__exporter.shutdown()
+        self.__exporter = None
+
+    def start_span(
+        self,
+        name: str,
+        attributes: dict[str, Any]|None = None,
+        parent: Span|None = None,
+        traceparent: str|None = None
+    ) -> Span:
+        parent = parent if parent is not None else current_span.get()
+        if parent is not None:
+            trace_id, parent_span_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        elif traceparent is not None and (remote_parent := parse_traceparent(traceparent)) is not None:
+            trace_id, parent_span_id, sampled = remote_parent
+            sampled = sampled and self.enabled
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+            sampled = self.enabled and random.random() < self.__sample_rate
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent_span_id,
+            sampled=sampled,
+            attributes=dict(attributes) if attributes else dict()
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end_time_ns = time.time_ns()
+        if span.status == "UNSET":
+            span.status = "OK"
+        if span.sampled and self.__worker is not None:
+            try:
+                self.__queue.put_nowait(span)
+            except queue.Full:
+                pass
+
+    @contextmanager
+    def span(self, name: str, attributes: dict[str, Any]|None = None) -> Iterator[Span]:
+        span: Span = self.start_span(name=name, attributes=attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(error=e)
+            raise
+        finally:
+            current_span.reset(token)
+            self.end_span(span=span)
+
+    def __export_loop(self) -> None:
+        batch: list[Span] = list()
+        stopping: bool = False
+        while not stopping:
+            deadline: float = time.monotonic() + self.__flush_interval_seconds
+            while len(batch) < self.__batch_size:
+                try:
+                    span: Span|None = self.__queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.__exporter.export(spans=batch)
+                except Exception:
+                    pass
+                batch = list()
+
+_tracer: Tracer = Tracer(
+    exporter_factory={
+        "console": lambda: StreamSpanExporter(stream=sys.stdout),
+        "file": lambda: FileSpanExporter(path=TRACING_FILE_PATH)
+    }.get(TRACING_EXPORTER),
+    sample_rate=TRACING_SAMPLE_RATE
+)
+
+
+
+_Return = TypeVar("_Return")
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[_Return]]], Callable[..., Awaitable[_Return]]]:
+    def decorator(function: Callable[..., Awaitable[_Return]]) -> Callable[..., Awaitable[_Return]]:
+        @functools.wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> _Return:
+            if not _tracer.enabled:
+                return await function(*args, **kwargs)
+            with _tracer.span(name=name):
+                return await function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Wraps each traced request's dependency resolution in a `dependencies` span.
+class TracedAPIRoute(APIRoute):
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        endpoint: Callable[..., Any] = self.dependant.call
+        if not _tracer.enabled or not asyncio.iscoroutinefunction(endpoint):
+            return super().get_route_handler()
+        @functools.wraps(endpoint)
+        async def traced_endpoint(**values: Any) -> Any:
+            # Dependencies are resolved once the endpoint is called; it runs under the request span again.
+            dependencies_span: Span|None = current_span.get()
+            if dependencies_span is not None and dependencies_span.end_time_ns is None:
+                _tracer.end_span(span=dependencies_span)
+            current_span.set(_route_request_span.get())
+            return await endpoint(**values)
+
+        self.dependant.call = traced_endpoint
+        handler: Callable[[Request], Awaitable[Response]] = super().get_route_handler()
+
+        async def traced_handler(request: Request) -> Response:
+            if current_span.get() is None:
+                # Only requests traced by the tracing middleware, not the startup warm-up.
+                return await handler(request)
+            span: Span = _tracer.start_span(name="dependencies", attributes={"http.route": self.path})
+            request_span_token = _route_request_span.set(current_span.get())
+            span_token = current_span.set(span)
+            try:
+                return await handler(request)
+            except BaseException as e:
+                if span.end_time_ns is None:
+                    span.record_error(error=e)
+                raise
+            finally:
+                current_span.reset(span_token)
+                _route_request_span.reset(request_span_token)
+                if span.end_time_ns is None:
+                    _tracer.end_span(span=span)
+
+        return traced_handler
+
+def parse_traceparent(traceparent: str) -> tuple[str, str, bool]|None:
+    match: re.Match|None = _TRACEPARENT_PATTERN.match(traceparent.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
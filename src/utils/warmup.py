@@ -0,0 +1,104 @@
+from typing import Any
+import asyncio
+import logging
+import re
+import time
+
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from src.schemas.user import NewUser
+from src.utils.auth import AbstractPasswordHash
+
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_PATH_PARAMETER_PATTERN: re.Pattern = re.compile(r"{[^}]+}")
+
+
+
+# Mongo connections are opened in the background while the CPU-bound steps run.
+async def warm_up(
+    app: FastAPI,
+    client: AsyncIOMotorClient|None,
+    password_hasher: AbstractPasswordHash,
+    mongo_connections: int,
+    timeout_seconds: float
+) -> None:
+    start: float = time.perf_counter()
+    connections_task: asyncio.Task|None = None
+    if client is not None and mongo_connections > 0:
+        connections_task = asyncio.create_task(
+            open_mongo_connections(client=client, connections=mongo_connections)
+        )
+    # Imports email_validator and loads the phone number metadata.
+    NewUser.model_validate({
+        "full_name": "warm up",
+        "phone_number": "+16502000000",
+        "email": "warm-up@example.com",
+        "password": "warm-up"
+    })
+    # The first hash allocates argon2's working memory.
+    await password_hasher.hash(password="warm-up")
+    app.openapi()
+    await exercise_route_validation(app=app)
+    if connections_task is not None:
+        try:
+            await asyncio.wait_for(connections_task, timeout=timeout_seconds)
+        except (asyncio.TimeoutError, PyMongoError) as e:
+            logger.warning("could not open mongo connections during warm-up: %r", e)
+    logger.info("warm-up finished in %.0f ms", (time.perf_counter() - start) * 1000)
+
+async def open_mongo_connections(client: AsyncIOMotorClient, connections: int) -> None:
+    # Concurrent commands each check out a connection, so the pool grows to `connections`.
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
+# Goes straight to the router, bypassing the middleware. Validation rejects the empty request, so no
+# endpoint or dependency with side effects runs.
+async def exercise_route_validation(app: FastAPI) -> None:
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not has_required_input(route=route):
+            continue
+        path: str = _PATH_PARAMETER_PATTERN.sub("0" * 24, route.path)
+        scope: dict[str, Any] = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": sorted(route.methods)[0],
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": None,
+            "server": None,
+            "app": app
+        }
+        try:
+            await app.router(scope, _receive_empty_body, _discard)
+        except RequestValidationError:
+            pass
+        except Exception as e:
+            logger.warning("warm-up request to %s %s failed: %r", scope["method"], route.path, e)
+
+def has_required_input(route: APIRoute) -> bool:
+    dependant: Dependant = get_flat_dependant(route.dependant)
+    if route.body_field is not None and route.body_field.required:
+        return True
+    return any(
+        parameter.required
+        for parameter in (*dependant.query_params, *dependant.header_params, *dependant.cookie_params)
+    )
+
+async def _receive_empty_body() -> dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def _discard(message: dict[str, Any]) -> None:
+    pass
@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+
+
+# Importing anything under src builds the app, which reads the required settings; these tests never connect.
+os.environ.setdefault("MONGO_CONNECTION_STRING", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DATABASE_NAME", "tests")
+os.environ.setdefault("JWT_SECRET", "tests")
+os.environ.setdefault("JWT_VALIDITY_DAYS", "1")
+os.environ.setdefault("LOCAL_STORAGE_STATIC_FILES_PATH", tempfile.mkdtemp())
+os.environ.setdefault("LOCAL_STORAGE_BASE_URL", "/static")
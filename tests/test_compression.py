@@ -0,0 +1,23 @@
+from src.utils.compression import negotiate_encoding
+
+
+
+ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+
+def test_the_first_configured_encoding_wins_a_tie():
+    assert negotiate_encoding(accept_encoding="gzip, br, zstd", encodings=ENCODINGS) == "zstd"
+    assert negotiate_encoding(accept_encoding="gzip, br", encodings=ENCODINGS) == "br"
+
+def test_q_values_rank_the_encodings():
+    assert negotiate_encoding(accept_encoding="zstd;q=0.5, br;q=0.8, gzip", encodings=ENCODINGS) == "gzip"
+    assert negotiate_encoding(accept_encoding="GZIP; q=0.9, br;q=0.1", encodings=ENCODINGS) == "gzip"
+
+def test_q_zero_and_unknown_codings_are_refused():
+    assert negotiate_encoding(accept_encoding="gzip;q=0, deflate", encodings=ENCODINGS) is None
+    assert negotiate_encoding(accept_encoding="br;q=oops", encodings=ENCODINGS) is None
+    assert negotiate_encoding(accept_encoding="", encodings=ENCODINGS) is None
+    assert negotiate_encoding(accept_encoding="identity", encodings=ENCODINGS) is None
+
+def test_the_wildcard_covers_codings_not_listed():
+    assert negotiate_encoding(accept_encoding="*", encodings=ENCODINGS) == "zstd"
+    assert negotiate_encoding(accept_encoding="zstd;q=0, *;q=0.5", encodings=ENCODINGS) == "br"
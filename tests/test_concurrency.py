@@ -0,0 +1,62 @@
+import pytest
+
+from src.utils import concurrency
+from src.utils.concurrency import AIMDConcurrencyLimiter, ConcurrencyLimiter
+
+
+
+def test_try_acquire_admits_up_to_the_share_of_the_limit():
+    limiter: ConcurrencyLimiter = ConcurrencyLimiter(limit=10)
+    assert all(limiter.try_acquire(share=0.5) for _ in range(5))
+    assert not limiter.try_acquire(share=0.5)
+    assert limiter.try_acquire()
+    limiter.release(started=0.0, latency_seconds=0.0)
+    assert limiter.in_flight == 5
+
+def test_try_acquire_always_admits_one_request():
+    limiter: ConcurrencyLimiter = ConcurrencyLimiter(limit=1)
+    assert limiter.try_acquire(share=0.1)
+    assert not limiter.try_acquire(share=0.1)
+
+
+def aimd(initial_limit: int = 10) -> AIMDConcurrencyLimiter:
+    return AIMDConcurrencyLimiter(initial_limit=initial_limit, min_limit=2, max_limit=12, latency_target_seconds=0.1)
+
+def test_fast_requests_increase_the_limit_additively():
+    limiter: AIMDConcurrencyLimiter = aimd()
+    for _ in range(5):
+        limiter.try_acquire()
+    limiter.release(started=0.0, latency_seconds=0.01)
+    assert limiter.limit == pytest.approx(10.1)
+
+def test_fast_requests_leave_an_underused_limit_alone():
+    limiter: AIMDConcurrencyLimiter = aimd()
+    limiter.try_acquire()
+    limiter.release(started=0.0, latency_seconds=0.01)
+    assert limiter.limit == 10
+
+def test_the_limit_never_grows_past_the_maximum():
+    limiter: AIMDConcurrencyLimiter = aimd(initial_limit=12)
+    for _ in range(12):
+        limiter.try_acquire()
+    limiter.release(started=0.0, latency_seconds=0.01)
+    assert limiter.limit == 12
+
+def test_slow_requests_decrease_the_limit_once_per_generation(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(concurrency.time, "perf_counter", lambda: 5.0)
+    limiter: AIMDConcurrencyLimiter = aimd()
+    for _ in range(3):
+        limiter.try_acquire()
+    limiter.release(started=1.0, latency_seconds=1.0)
+    assert limiter.limit == pytest.approx(9)
+    # Started before the decrease, so it saw the old limit and must not cut it again.
+    limiter.release(started=2.0, latency_seconds=1.0)
+    assert limiter.limit == pytest.approx(9)
+    limiter.release(started=5.0, latency_seconds=1.0)
+    assert limiter.limit == pytest.approx(8.1)
+
+def test_the_limit_never_drops_below_the_minimum():
+    limiter: AIMDConcurrencyLimiter = aimd(initial_limit=2)
+    limiter.try_acquire()
+    limiter.release(started=float("inf"), latency_seconds=1.0)
+    assert limiter.limit == 2
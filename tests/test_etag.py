@@ -0,0 +1,28 @@
+from src.utils.etag import decoded_etag, encoded_etag, if_none_match, strong_etag
+
+
+
+def test_strong_etag_joins_the_parts():
+    assert strong_etag("discussion", 3, "abc") == '"discussion-3-abc"'
+
+def test_if_none_match_compares_weakly():
+    etag: str = strong_etag("a", 1)
+    assert if_none_match(header='"a-1"', etag=etag)
+    assert if_none_match(header='W/"a-1"', etag=etag)
+    assert if_none_match(header='"a-1"', etag=f"W/{etag}")
+    assert not if_none_match(header='"a-2"', etag=etag)
+
+def test_if_none_match_accepts_lists_and_wildcards():
+    etag: str = strong_etag("a", 1)
+    assert if_none_match(header='"x", W/"a-1" ,"y"', etag=etag)
+    assert not if_none_match(header='"x", "y"', etag=etag)
+    assert if_none_match(header=" * ", etag=etag)
+    assert not if_none_match(header="", etag=etag)
+
+def test_encoded_etags_stay_strong_and_map_back():
+    etag: str = strong_etag("a", 1)
+    assert encoded_etag(etag=etag, encoding="gzip") == '"a-1-gzip"'
+    assert decoded_etag(etag='"a-1-gzip"', encodings=["gzip", "br"]) == etag
+    assert decoded_etag(etag='W/"a-1-br"', encodings=["gzip", "br"]) == f"W/{etag}"
+    assert decoded_etag(etag=etag, encodings=["gzip", "br"]) is None
+    assert decoded_etag(etag='"-gzip"', encodings=["gzip"]) is None
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.repositories import rate_limit
+from src.repositories.rate_limit import InMemoryRateLimitRepository, RateLimit, parse_rate_limit
+
+
+
+class Clock:
+
+    def __init__(self):
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock: Clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit(limit="10/60") == RateLimit(rate_per_second=10 / 60, burst=10)
+    assert parse_rate_limit(limit="") is None
+
+def test_a_bucket_starts_full_and_empties(clock: Clock):
+    repository: InMemoryRateLimitRepository = InMemoryRateLimitRepository()
+    limit: RateLimit = RateLimit(rate_per_second=1.0, burst=3)
+    assert [asyncio.run(repository.take(key="ip", limit=limit)) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert asyncio.run(repository.take(key="ip", limit=limit)) == pytest.approx(1.0)
+    assert asyncio.run(repository.take(key="other", limit=limit)) == 0.0
+
+def test_retry_after_is_the_time_until_the_next_token(clock: Clock):
+    repository: InMemoryRateLimitRepository = InMemoryRateLimitRepository()
+    limit: RateLimit = RateLimit(rate_per_second=0.5, burst=1)
+    asyncio.run(repository.take(key="ip", limit=limit))
+    clock.now += 1.5
+    assert asyncio.run(repository.take(key="ip", limit=limit)) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert asyncio.run(repository.take(key="ip", limit=limit)) == 0.0
+
+def test_tokens_refill_over_time_up_to_the_burst(clock: Clock):
+    repository: InMemoryRateLimitRepository = InMemoryRateLimitRepository()
+    limit: RateLimit = RateLimit(rate_per_second=2.0, burst=2)
+    for _ in range(2):
+        asyncio.run(repository.take(key="ip", limit=limit))
+    clock.now += 60
+    assert [asyncio.run(repository.take(key="ip", limit=limit)) for _ in range(3)] == [0.0, 0.0, pytest.approx(0.5)]
+
+def test_compact_drops_only_full_buckets(clock: Clock):
+    repository: InMemoryRateLimitRepository = InMemoryRateLimitRepository()
+    limit: RateLimit = RateLimit(rate_per_second=1.0, burst=1)
+    asyncio.run(repository.take(key="ip", limit=limit))
+    asyncio.run(repository.compact())
+    assert asyncio.run(repository.take(key="ip", limit=limit)) > 0
+    clock.now += 10
+    asyncio.run(repository.compact())
+    assert asyncio.run(repository.take(key="ip", limit=limit)) == 0.0
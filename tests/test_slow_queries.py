@@ -0,0 +1,31 @@
+import datetime
+
+from bson import ObjectId
+
+from src.utils.slow_queries import _query_shape
+
+
+
+def test_query_shapes_keep_no_values():
+    command: dict = {
+        "find": "users",
+        "filter": {"email": "someone@example.com", "_id": {"$in": [ObjectId(), ObjectId()]}, "deleted_on": None},
+        "sort": {"created_on": -1},
+        "limit": 10
+    }
+    assert _query_shape(command=command) == {
+        "filter": {"email": "<str>", "_id": {"$in": ["<ObjectId>"]}, "deleted_on": "<null>"},
+        "sort": {"created_on": "<int>"}
+    }
+
+def test_update_documents_are_reduced_to_their_shape():
+    command: dict = {
+        "update": "users",
+        "updates": [{
+            "q": {"phone_number": "+16505550100"},
+            "u": {"$set": {"full_name": "Someone", "updated_on": datetime.datetime.now()}}
+        }]
+    }
+    assert _query_shape(command=command) == {
+        "updates": [{"q": {"phone_number": "<str>"}, "u": {"$set": {"full_name": "<str>", "updated_on": "<datetime>"}}}]
+    }
@@ -0,0 +1,37 @@
+from src.utils.tracing import AbstractSpanExporter, Span, Tracer
+
+
+
+class ListSpanExporter(AbstractSpanExporter):
+
+    def __init__(self):
+        self.spans: list[Span] = list()
+        self.closed: bool = False
+
+    def export(self, spans: list[Span]) -> None:
+        assert not self.closed
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        self.closed = True
+
+
+def test_every_start_gets_its_own_exporter():
+    exporters: list[ListSpanExporter] = list()
+    tracer: Tracer = Tracer(exporter_factory=lambda: exporters.append(ListSpanExporter()) or exporters[-1])
+    assert tracer.enabled and exporters == []
+    for name in ("first", "second"):
+        tracer.start()
+        with tracer.span(name=name):
+            pass
+        tracer.shutdown()
+    assert [[span.name for span in exporter.spans] for exporter in exporters] == [["first"], ["second"]]
+    assert all(exporter.closed for exporter in exporters)
+
+def test_a_tracer_without_exporter_is_disabled():
+    tracer: Tracer = Tracer(exporter_factory=None)
+    tracer.start()
+    with tracer.span(name="request") as span:
+        assert not span.sampled
+    tracer.shutdown()
+    assert not tracer.enabled